@@ -2,17 +2,67 @@ import warnings
 # Suppress Python 3.9 FutureWarnings from Google Auth
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-from flask import Flask, render_template, request, jsonify, Response, make_response
-from datetime import datetime
+from flask import Flask, render_template, request, jsonify, Response, make_response, stream_with_context, url_for
+from datetime import datetime, timedelta
 import pytz
 from engines.factory import EngineFactory
 import os
 import base64
 from utils.ai_engine import ai_engine
+from utils.tutor_sessions import SessionExpiredError
+from utils.feeds import encode_feed_token, decode_feed_token, feed_cache, state_occurrences, load_secret_key
+from utils.ical_gen import stream_ical_content
+from utils.moment import resolve_moment
+from utils.astronomy import PRECISE, FAST, TABLE
+from panchanga.recurrence import max_recurrence_count, recurrence_last_year
+from panchanga.search import CRITERIA as SEARCH_CRITERIA
+from panchanga.udaya import MODES, INSTANT
+from utils.samvatsara_cycle import get_samvatsara_cycle
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+import hashlib
 import traceback
 import json
+import sys
 
 app = Flask(__name__)
+# Signs feed tokens; set SECRET_KEY in production, otherwise a key file is created once under cache/
+app.secret_key = os.environ.get('SECRET_KEY') or load_secret_key()
+
+MAX_BULK_EVENTS = 500
+# Upper bound for columnar date-range conversions (20 years covers a full K'atun)
+MAX_RANGE_DAYS = 7305
+# Upper bound for Panchanga reverse-lookup windows
+MAX_REVERSE_YEARS = 50
+# Range search: longest date span for /api/v2/search
+MAX_SEARCH_DAYS = 3653
+# Daily time segments: longest date span for /api/v2/segments
+MAX_SEGMENT_DAYS = 366
+# Vakra/Asta finder: longest date span for /api/v2/graha-events (a century)
+MAX_GRAHA_EVENT_DAYS = 36525
+# Eclipse finder: longest year span for /api/v2/eclipses (the whole limb index)
+MAX_ECLIPSE_YEARS = 150
+# Batch endpoint: rows per computed/streamed chunk and per request
+BATCH_CHUNK_ROWS = 1000
+MAX_BATCH_ROWS = 50000
+
+def _ical_count(value, mode=INSTANT):
+    """
+    Validated recurrence count for the iCal routes: (count, None), or (None, error message) when it
+    is not a number or exceeds what `mode` can supply (about one recurrence per year left in the
+    ephemeris, or in the transition index for udaya).
+    """
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        return None, "count must be a whole number"
+    last_year = recurrence_last_year(mode)
+    if last_year is None:
+        return None, f"{mode} recurrences are unavailable: the transition index is not built"
+    limit = max_recurrence_count(mode)
+    if not 1 <= count <= limit:
+        return None, f"count must be between 1 and {limit} ({mode} recurrences end in {last_year})"
+    return count, None
 
 @app.route('/')
 def index():
@@ -34,26 +84,124 @@ def generate_ical():
     calendar_type = data.get('calendar', 'panchanga')
     title = data.get('title', f'{calendar_type.capitalize()} Event')
     lang = data.get('lang', 'EN')
+    count = data.get('count', 20)
+    mode = data.get('mode', INSTANT)
 
     if not all([date_str, time_str, location_name]):
         return jsonify({"error": "Missing required fields"}), 400
+    if mode not in MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(MODES)}"}), 400
+    # Validated before streaming: once the headers are out, an error would truncate the .ics
+    count, count_error = _ical_count(count, mode)
+    if count_error:
+        return jsonify({"error": count_error}), 400
 
     try:
         # Resolve engine
         engine = EngineFactory.get_engine(calendar_type)
         
-        # Generate iCal using the engine (Logic moved to spoke)
-        ical_data = engine.generate_ical(date_str, time_str, location_name, title, lang)
+        # Stream iCal from the engine (Logic moved to spoke): VEVENTs go out as they are found
+        ical_stream = engine.stream_ical(date_str, time_str, location_name, title, lang, num_entries=count, mode=mode)
         
-        response = make_response(ical_data)
+        response = Response(stream_with_context(ical_stream), mimetype="text/calendar")
         response.headers["Content-Disposition"] = f"attachment; filename={title.replace(' ', '_')}.ics"
-        response.headers["Content-Type"] = "text/calendar"
         
         return response
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/v2/generate-ical-bulk', methods=['POST'])
+def api_v2_generate_ical_bulk():
+    """
+    One combined iCal calendar for many events (a family or community) in one batched pass.
+    Body: {"events": [{"date", "time", "location", "title"}], "title", "calendar", "lang", "count",
+           "mode": "instant" | "udaya"}
+    """
+    data = request.get_json() or {}
+    events = data.get('events') or []
+    calendar_type = data.get('calendar', 'panchanga')
+    title = data.get('title', 'Family Calendar')
+    lang = data.get('lang', 'EN')
+    mode = data.get('mode', INSTANT)
+
+    if not events or not all(isinstance(e, dict) and all([e.get('date'), e.get('time'), e.get('location')]) for e in events):
+        return jsonify({"status": "error", "message": "Each event needs date, time and location"}), 400
+    if len(events) > MAX_BULK_EVENTS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BULK_EVENTS} events per calendar"}), 400
+    if mode not in MODES:
+        return jsonify({"status": "error", "message": f"mode must be one of: {', '.join(MODES)}"}), 400
+    count, count_error = _ical_count(data.get('count', 20), mode)
+    if count_error:
+        return jsonify({"status": "error", "message": count_error}), 400
+
+    try:
+        engine = EngineFactory.get_engine(calendar_type)
+        ical_stream = engine.stream_bulk_ical(events, title, lang, num_entries=count, mode=mode)
+
+        response = Response(stream_with_context(ical_stream), mimetype="text/calendar")
+        response.headers["Content-Disposition"] = f"attachment; filename={title.replace(' ', '_')}.ics"
+        return response
+
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/v2/feeds', methods=['POST'])
+def api_v2_create_feed():
+    """
+    Creates a subscribable calendar feed (webcal) URL encoding the event parameters.
+    """
+    data = request.get_json() or {}
+    params = {key: data.get(key) for key in ('calendar', 'date', 'time', 'location', 'title', 'lang')}
+
+    if not all([params['date'], params['time'], params['location']]):
+        return jsonify({"status": "error", "message": "Missing required fields"}), 400
+
+    try:
+        token = encode_feed_token(params, app.secret_key)
+        EngineFactory.get_engine(decode_feed_token(token, app.secret_key)['calendar'])
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    feed_url = url_for('api_v2_feed', token=token, _external=True)
+    return jsonify({
+        "status": "success",
+        "feed_url": feed_url,
+        "webcal_url": "webcal://" + feed_url.split("://", 1)[1]
+    })
+
+@app.route('/api/v2/feeds/<token>.ics', methods=['GET'])
+def api_v2_feed(token):
+    """
+    Serves a subscription feed. Occurrences come from the persistent feed cache and are
+    only recomputed when the horizon advances; ETag/Last-Modified give pollers a 304.
+    """
+    try:
+        params = decode_feed_token(token, app.secret_key)
+        engine = EngineFactory.get_engine(params['calendar'])
+        feed_id, state = feed_cache.get_state(params, engine)
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    last_modified = datetime.fromisoformat(state['last_modified'])
+    etag = hashlib.sha1(f"{feed_id}|{state['last_modified']}|{len(state['occurrences'])}".encode('utf-8')).hexdigest()
+
+    ical_stream = stream_ical_content(
+        params['title'], state_occurrences(state), dtstamp=last_modified, calendar_name=params['title']
+    )
+    response = Response(stream_with_context(ical_stream), mimetype="text/calendar")
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
+
 @app.route('/api/skyshot', methods=['POST'])
 def get_skyshot():
     """
@@ -124,16 +272,19 @@ def get_panchanga():
     location_name = data.get('location')
     title = data.get('title', 'Event') # Added title support
     lang = data.get('lang', 'EN')
+    mode = data.get('mode', INSTANT) # 'udaya': limbs at the sunrise opening the day (v6.1)
 
     if not all([date_str, time_str, location_name]):
         return jsonify({"error": "Missing required fields"}), 400
+    if mode not in MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(MODES)}"}), 400
 
     try:
         # Resolve engine (defaults to panchanga for this legacy route)
         engine = EngineFactory.get_engine("panchanga")
         
         # Calculate data using the verified modular engine
-        result_data = engine.calculate_data(date_str, time_str, location_name, lang=lang)
+        result_data = engine.calculate_data(date_str, time_str, location_name, lang=lang, mode=mode)
 
         return jsonify({
             "success": True,
@@ -151,6 +302,25 @@ def get_panchanga():
 # API v2 - HEADLESS UNIFIED ENDPOINTS
 # ==============================================================================
 
+def civilization_specific(calendar_type, raw_results):
+    """
+    The `civilization_specific` block of the v2 contract.
+    ZERO MUTATION: Ensure Panchanga specific block stays identical to v2.0
+    """
+    if calendar_type == 'panchanga':
+        return {
+            "samvatsara": raw_results.get("samvatsara"),
+            "masa": raw_results.get("masa"),
+            "paksha": raw_results.get("paksha"),
+            "tithi": raw_results.get("tithi"),
+            "vara": raw_results.get("vara"),
+            "nakshatra": raw_results.get("nakshatra"),
+            "yoga": raw_results.get("yoga"),
+            "karana": raw_results.get("karana"),
+            "saka_year": raw_results.get("saka_year")
+        }
+    return raw_results
+
 @app.route('/api/v2/calculate', methods=['POST'])
 def api_v2_calculate():
     """
@@ -165,16 +335,19 @@ def api_v2_calculate():
     lang = input_data.get('lang', 'EN')
     title = input_data.get('title', 'Event')
     client_profile = input_data.get('client_profile', {})
+    mode = input_data.get('mode', INSTANT)
 
     if not all([date_str, time_str, location_name]):
         return jsonify({"status": "error", "message": "Missing required fields"}), 400
+    if mode not in MODES:
+        return jsonify({"status": "error", "message": f"mode must be one of: {', '.join(MODES)}"}), 400
 
     try:
         # 1. Get appropriate engine
         engine = EngineFactory.get_engine(calendar_type)
         
         # 2. Perform raw calculation (Proven logic)
-        raw_results = engine.calculate_data(date_str, time_str, location_name, lang=lang)
+        raw_results = engine.calculate_data(date_str, time_str, location_name, lang=lang, mode=mode)
         
         # 3. Get metadata and AI context
         visual_configs = engine.get_visual_configs(raw_results)
@@ -184,21 +357,7 @@ def api_v2_calculate():
         rich_visuals = engine.get_rich_visuals(date_str, time_str, location_name, title)
 
         # 5. Construct v2.0 Response (The Contract)
-        # ZERO MUTATION: Ensure Panchanga specific block stays identical to v2.0
-        if calendar_type == 'panchanga':
-            civ_specific = {
-                "samvatsara": raw_results.get("samvatsara"),
-                "masa": raw_results.get("masa"),
-                "paksha": raw_results.get("paksha"),
-                "tithi": raw_results.get("tithi"),
-                "vara": raw_results.get("vara"),
-                "nakshatra": raw_results.get("nakshatra"),
-                "yoga": raw_results.get("yoga"),
-                "karana": raw_results.get("karana"),
-                "saka_year": raw_results.get("saka_year")
-            }
-        else:
-            civ_specific = raw_results
+        civ_specific = civilization_specific(calendar_type, raw_results)
 
         response = {
             "status": "success",
@@ -218,7 +377,8 @@ def api_v2_calculate():
                     "sunrise": raw_results.get("sunrise"),
                     "sunset": raw_results.get("sunset"),
                     "angular_data": raw_results.get("angular_data"),
-                    "next_birthday": raw_results.get("next_birthday")
+                    "next_birthday": raw_results.get("next_birthday"),
+                    "udaya": raw_results.get("udaya")
                 }
             },
             "visuals": {
@@ -238,6 +398,459 @@ def api_v2_calculate():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route('/api/v2/mayan/range', methods=['POST'])
+def api_v2_mayan_range():
+    """
+    Columnar Mayan conversion for every day of a Gregorian range in one vectorized call.
+    Body: {"start", "end"} (YYYY-MM-DD), or {"year": 2025}, or {"katun": "13.0"}.
+    """
+    data = request.get_json() or {}
+    engine = EngineFactory.get_engine('mayan')
+
+    try:
+        if data.get('katun'):
+            baktun, katun = (int(part) for part in str(data['katun']).split('.')[:2])
+            start, end = engine.katun_date_range(baktun, katun)
+        elif data.get('year'):
+            year = int(data['year'])
+            start, end = f"{year:04d}-01-01", f"{year:04d}-12-31"
+        elif data.get('start') and data.get('end'):
+            start, end = data['start'], data['end']
+        else:
+            return jsonify({"status": "error", "message": "Provide start/end, year or katun"}), 400
+
+        # Size check before any array is allocated (numpy accepts years far outside any sensible range)
+        count = engine.count_range_days(start, end)
+        if not 1 <= count <= MAX_RANGE_DAYS:
+            return jsonify({"status": "error", "message": f"Range must cover 1 to {MAX_RANGE_DAYS} days"}), 400
+        columns = engine.calculate_date_range(start, end)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    return jsonify({
+        "status": "success",
+        "count": count,
+        "columns": engine.format_columns(columns)
+    })
+
+@app.route('/api/v2/mayan/reverse', methods=['POST'])
+def api_v2_mayan_reverse():
+    """
+    Reverse lookup: Gregorian dates matching a Tzolk'in, Haab' and/or Long Count date.
+    Body: {"tzolkin": "4 Ajaw", "haab": "8 Kumk'u", "long_count": "13.0", "start", "end", "limit"}
+    """
+    data = request.get_json() or {}
+
+    try:
+        limit = max(1, min(int(data.get('limit', 100)), MAX_RANGE_DAYS))
+        matches = EngineFactory.get_engine('mayan').find_dates(
+            tzolkin=data.get('tzolkin'),
+            haab=data.get('haab'),
+            long_count=data.get('long_count'),
+            start_date=data.get('start'),
+            end_date=data.get('end'),
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    return jsonify({
+        "status": "success",
+        "count": len(matches),
+        "matches": matches
+    })
+
+@app.route('/api/v2/search', methods=['POST'])
+def api_v2_search():
+    """
+    Range search over combined Panchanga criteria, e.g. Ekadashi in Shravana nakshatra.
+    Body: {"location", "start_date", "end_date", "masa", "paksha", "tithi", "nakshatra", "yoga",
+           "karana", "vara", "lang", "limit"}; each criterion is a name, a 1-based number or a list of them.
+    """
+    data = request.get_json() or {}
+    location_name = data.get('location')
+    if not location_name or not data.get('start_date') or not data.get('end_date'):
+        return jsonify({"status": "error", "message": "Missing required fields"}), 400
+
+    try:
+        start_date = datetime.strptime(data['start_date'], "%Y-%m-%d").date()
+        end_date = datetime.strptime(data['end_date'], "%Y-%m-%d").date()
+        limit = max(1, min(int(data.get('limit', 500)), 5000))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if not 0 <= (end_date - start_date).days <= MAX_SEARCH_DAYS:
+        return jsonify({"status": "error", "message": f"Date range must span 0 to {MAX_SEARCH_DAYS} days"}), 400
+
+    criteria = {name: data[name] for name in SEARCH_CRITERIA if data.get(name) not in (None, "", [])}
+
+    try:
+        matches = EngineFactory.get_engine('panchanga').search_days(
+            location_name, start_date, end_date, criteria, lang=data.get('lang', 'EN'), limit=limit
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({
+        "status": "success",
+        "count": len(matches),
+        "days": sorted({match["date"] for match in matches}),
+        "matches": matches
+    })
+
+@app.route('/api/v2/segments', methods=['POST'])
+def api_v2_segments():
+    """
+    Day and night time segments (Rahu Kalam, Yamaganda, Gulika, Choghadiya, Muhurta) at a location.
+    Body: {"location", "lang"} plus one of "date" (YYYY-MM-DD), "month" (YYYY-MM) or "start_date"/"end_date".
+    """
+    data = request.get_json() or {}
+    location_name = data.get('location')
+    if not location_name or not any(data.get(key) for key in ('date', 'month', 'start_date')):
+        return jsonify({"status": "error", "message": "Missing required fields"}), 400
+
+    try:
+        if data.get('date'):
+            start_date = end_date = datetime.strptime(data['date'], "%Y-%m-%d").date()
+        elif data.get('month'):
+            start_date = datetime.strptime(data['month'], "%Y-%m").date()
+            end_date = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        else:
+            start_date = datetime.strptime(data['start_date'], "%Y-%m-%d").date()
+            end_date = datetime.strptime(data.get('end_date') or data['start_date'], "%Y-%m-%d").date()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if not 0 <= (end_date - start_date).days < MAX_SEGMENT_DAYS:
+        return jsonify({"status": "error", "message": f"Date range must span 1 to {MAX_SEGMENT_DAYS} days"}), 400
+
+    try:
+        days = EngineFactory.get_engine('panchanga').time_segments(
+            location_name, start_date, end_date, lang=data.get('lang', 'EN')
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({"status": "success", "count": len(days), "days": days})
+
+@app.route('/api/v2/graha-events', methods=['POST'])
+def api_v2_graha_events():
+    """
+    Retrograde stations/periods (vakra) and combustion windows (asta) of Mars, Mercury, Jupiter,
+    Venus and Saturn over a date range.
+    Body: {"start_date", "end_date"} (YYYY-MM-DD) plus optional "planets" (list) and "timezone" (default UTC).
+    """
+    data = request.get_json() or {}
+    if not data.get('start_date') or not data.get('end_date'):
+        return jsonify({"status": "error", "message": "Missing required fields"}), 400
+
+    try:
+        start_date = datetime.strptime(data['start_date'], "%Y-%m-%d").date()
+        end_date = datetime.strptime(data['end_date'], "%Y-%m-%d").date()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if not 0 <= (end_date - start_date).days < MAX_GRAHA_EVENT_DAYS:
+        return jsonify({"status": "error", "message": f"Date range must span 1 to {MAX_GRAHA_EVENT_DAYS} days"}), 400
+
+    try:
+        planets = EngineFactory.get_engine('panchanga').graha_events(
+            start_date, end_date, planets=data.get('planets'), timezone_str=data.get('timezone', 'UTC')
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({"status": "success", "start_date": start_date.isoformat(), "end_date": end_date.isoformat(),
+                    "planets": planets})
+
+@app.route('/api/v2/eclipses', methods=['POST'])
+def api_v2_eclipses():
+    """
+    Solar and lunar eclipses in a range of years.
+    Body: {"start_year", "end_year"} plus optional "kinds" (["solar", "lunar"]) and "timezone" (default UTC).
+    """
+    data = request.get_json() or {}
+    if not data.get('start_year'):
+        return jsonify({"status": "error", "message": "Missing required fields"}), 400
+
+    try:
+        start_year = int(data['start_year'])
+        end_year = int(data.get('end_year') or start_year)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "start_year and end_year must be integers"}), 400
+    if not 0 <= end_year - start_year < MAX_ECLIPSE_YEARS:
+        return jsonify({"status": "error", "message": f"Year range must span 1 to {MAX_ECLIPSE_YEARS} years"}), 400
+
+    try:
+        eclipses = EngineFactory.get_engine('panchanga').eclipses(
+            start_year, end_year, kinds=data.get('kinds'), timezone_str=data.get('timezone', 'UTC')
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({"status": "success", "count": len(eclipses), "eclipses": eclipses})
+
+@app.route('/api/v2/samvatsara-cycle', methods=['GET'])
+def api_v2_samvatsara_cycle():
+    """
+    Jupiter-Saturn great conjunctions and Jupiter's sidereal sign ingresses (Barhaspatya cycle)
+    from the precomputed table, for the /visuals/samvatsara view.
+    Query: ?start_year=&end_year=&lang= (default: the whole table, EN).
+    """
+    try:
+        start_year = request.args.get('start_year', type=int)
+        end_year = request.args.get('end_year', type=int)
+        cycle = get_samvatsara_cycle(start_year, end_year, lang=request.args.get('lang', 'EN'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({"status": "success", **cycle})
+
+@app.route('/api/v2/panchanga/reverse', methods=['POST'])
+def api_v2_panchanga_reverse():
+    """
+    Reverse lookup: Gregorian dates of a Masa / Paksha / Tithi (/ Samvatsara).
+    Body: {"location", "masa", "paksha", "tithi", "samvatsara", "start_year", "end_year", "lang", "limit"}
+    Without a year range: the next 10 years, or the surrounding 60-year cycle when a Samvatsara is given.
+    """
+    data = request.get_json() or {}
+    location_name = data.get('location')
+    if not location_name:
+        return jsonify({"status": "error", "message": "Missing required fields"}), 400
+
+    try:
+        current_year = datetime.now(pytz.utc).year
+        if data.get('samvatsara') and not data.get('start_year'):
+            default_start, default_end = current_year - 60, current_year + 60
+        else:
+            default_start, default_end = current_year, current_year + 10
+        start_year = int(data.get('start_year') or default_start)
+        end_year = int(data.get('end_year') or max(start_year, default_end))
+        limit = max(1, min(int(data.get('limit', 100)), 1000))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    # The 60-year default only searches the (at most 3) years that carry the Samvatsara
+    if end_year < start_year or (end_year - start_year > MAX_REVERSE_YEARS and not data.get('samvatsara')):
+        return jsonify({"status": "error", "message": f"Year range must span 0 to {MAX_REVERSE_YEARS} years"}), 400
+
+    try:
+        matches = EngineFactory.get_engine('panchanga').find_dates(
+            location_name, start_year, end_year,
+            masa=data.get('masa'), paksha=data.get('paksha'), tithi=data.get('tithi'),
+            samvatsara=data.get('samvatsara'), lang=data.get('lang', 'EN'), limit=limit
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({
+        "status": "success",
+        "count": len(matches),
+        "matches": matches
+    })
+
+@app.route('/api/v2/convert-all', methods=['POST'])
+def api_v2_convert_all():
+    """
+    Converts one moment into every registered calendar.
+    Location and instant are resolved once and shared; engines then run concurrently,
+    so each added calendar costs only its own computation.
+    Body: {"date", "time", "location", "lang", "calendars": [optional subset], "mode"}
+    """
+    data = request.get_json() or {}
+    date_str = data.get('date')
+    time_str = data.get('time')
+    location_name = data.get('location')
+    lang = data.get('lang', 'EN')
+    mode = data.get('mode', INSTANT)
+
+    if not all([date_str, time_str, location_name]):
+        return jsonify({"status": "error", "message": "Missing required fields"}), 400
+    if mode not in MODES:
+        return jsonify({"status": "error", "message": f"mode must be one of: {', '.join(MODES)}"}), 400
+
+    names = data.get('calendars') or EngineFactory.list_engines()
+    try:
+        engines = {name: EngineFactory.get_engine(name) for name in names}
+        moment = resolve_moment(date_str, time_str, location_name)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    def convert(engine):
+        raw_results = engine.calculate_resolved(moment, lang=lang, mode=mode)
+        return raw_results, engine.get_visual_configs(raw_results)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(engines)) as pool:
+        futures = {name: pool.submit(convert, engine) for name, engine in engines.items()}
+        for name, future in futures.items():
+            try:
+                raw_results, visual_configs = future.result()
+                results[name] = {
+                    "status": "success",
+                    "civilization_specific": civilization_specific(name, raw_results),
+                    "render_hints": visual_configs.get("modules", [])
+                }
+            except Exception as e:
+                traceback.print_exc()
+                results[name] = {"status": "error", "message": str(e)}
+
+    return jsonify({
+        "status": "success",
+        "metadata": {
+            "engine_version": "2.0",
+            "timestamp_utc": datetime.now(pytz.utc).isoformat(),
+            "input_datetime": moment["local_dt"].strftime('%Y-%m-%d %H:%M:%S'),
+            "timezone": moment["loc"]["timezone"],
+            "address": moment["loc"]["address"],
+            "julian_day": moment["julian_day"]
+        },
+        "results": results
+    })
+
+def iter_batch_rows():
+    """
+    Yields request rows from an NDJSON body (read lazily, one object per line)
+    or from a JSON array / {"rows": [...]} body.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield {"_error": f"Invalid JSON line: {e}"}
+        return
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('rows')
+    if not isinstance(data, list):
+        raise ValueError("Body must be a JSON array, {\"rows\": [...]} or NDJSON")
+    yield from data
+
+def process_batch_chunk(chunk, default_calendar, default_lang, include_visuals=False, precision=None):
+    """
+    Computes one chunk of (index, row) pairs. Rows are grouped by engine and language and run
+    through each engine's calculate_batch; each distinct location is geocoded once (cached).
+    Returns the output rows in input order, with per-row errors.
+    """
+    out = [None] * len(chunk)
+    groups = {}
+
+    for pos, (index, row) in enumerate(chunk):
+        try:
+            if not isinstance(row, dict) or row.get('_error'):
+                raise ValueError(row.get('_error') if isinstance(row, dict) else "Row must be a JSON object")
+            if not all([row.get('date'), row.get('time'), row.get('location')]):
+                raise ValueError("Missing required fields")
+            calendar_type = (row.get('calendar') or default_calendar).lower()
+            EngineFactory.get_engine(calendar_type)
+            moment = resolve_moment(row['date'], row['time'], row['location'])
+            groups.setdefault((calendar_type, row.get('lang') or default_lang), []).append((pos, moment))
+        except Exception as e:
+            out[pos] = {"index": index, "id": row.get('id') if isinstance(row, dict) else None,
+                        "status": "error", "message": str(e)}
+
+    for (calendar_type, lang), members in groups.items():
+        engine = EngineFactory.get_engine(calendar_type)
+        try:
+            batch_results = engine.calculate_batch([moment for _, moment in members], lang=lang, precision=precision)
+        except Exception:
+            traceback.print_exc()
+            batch_results = None
+
+        for k, (pos, moment) in enumerate(members):
+            index, row = chunk[pos]
+            try:
+                # A failing group falls back to per-row calculation so one bad row cannot sink the rest
+                raw_results = batch_results[k] if batch_results is not None else engine.calculate_resolved(moment, lang=lang)
+                result = {
+                    "index": index,
+                    "id": row.get('id'),
+                    "status": "success",
+                    "calendar": calendar_type,
+                    "civilization_specific": civilization_specific(calendar_type, raw_results),
+                    "coordinates": {"rashi": raw_results.get("rashi"), "lagna": raw_results.get("lagna")},
+                    "astronomy": {"sunrise": raw_results.get("sunrise"), "sunset": raw_results.get("sunset")}
+                }
+                if include_visuals:
+                    visuals = engine.get_rich_visuals(row['date'], row['time'], row['location'], row.get('title', 'Event'))
+                    result["visuals"] = {
+                        "sky_shot_base64": visuals.get("skyshot"),
+                        "solar_system_base64": visuals.get("solar_system")
+                    }
+                out[pos] = result
+            except Exception as e:
+                out[pos] = {"index": index, "id": row.get('id'), "status": "error", "message": str(e)}
+
+    return out
+
+@app.route('/api/v2/batch', methods=['POST'])
+def api_v2_batch():
+    """
+    Batch conversion for data pipelines (e.g. genealogy records).
+    Accepts a JSON array or NDJSON of {"calendar", "date", "time", "location", "lang", "id"} rows and
+    streams one NDJSON result line per row, in input order, chunk by chunk.
+    Query: ?calendar=panchanga&lang=EN (row defaults), ?visuals=1 to include rich visuals (slow),
+    ?precision=fast for the analytic Sun/Moon series (limbs identical, longitudes within ~0.015 deg),
+    ?precision=table for the prebuilt Chebyshev tables (utils.sidereal_tables).
+    """
+    default_calendar = request.args.get('calendar', 'panchanga')
+    default_lang = request.args.get('lang', 'EN')
+    include_visuals = request.args.get('visuals') in ('1', 'true')
+    precision = request.args.get('precision')
+    if precision not in (None, PRECISE, FAST, TABLE):
+        return jsonify({"status": "error", "message": f"precision must be '{PRECISE}', '{FAST}' or '{TABLE}'"}), 400
+
+    try:
+        rows = iter_batch_rows()
+        first = next(rows, None)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if first is None:
+        return jsonify({"status": "error", "message": "No rows"}), 400
+
+    def generate():
+        chunk = []
+        count = 0
+        for row in chain([first], rows):
+            if count >= MAX_BATCH_ROWS:
+                yield json.dumps({"index": count, "status": "error",
+                                  "message": f"Row limit of {MAX_BATCH_ROWS} reached; remaining rows ignored"}) + "\n"
+                break
+            chunk.append((count, row))
+            count += 1
+            if len(chunk) >= BATCH_CHUNK_ROWS:
+                for result in process_batch_chunk(chunk, default_calendar, default_lang, include_visuals, precision):
+                    yield json.dumps(result, ensure_ascii=False) + "\n"
+                chunk = []
+        if chunk:
+            for result in process_batch_chunk(chunk, default_calendar, default_lang, include_visuals, precision):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route('/api/v2/ai-explain', methods=['POST'])
 def api_v2_ai_explain():
     """
@@ -248,14 +861,14 @@ def api_v2_ai_explain():
         if not data:
             return jsonify({"status": "error", "message": "No data received."}), 400
             
-        raw_output = ai_engine.get_explanation(data)
+        raw_output, provider = ai_engine.explain(data)
         
         # Clean potential JSON wrapping from AI
         clean_markdown = raw_output.replace('```json', '').replace('```', '').strip()
         
         return jsonify({
             "status": "success",
-            "metadata": { "engine": ai_engine.provider },
+            "metadata": { "engine": provider },
             "education": {
                 "format": "markdown",
                 "content": clean_markdown
@@ -269,25 +882,44 @@ def api_v2_ai_explain():
 def api_v2_ai_chat():
     """
     Headless AI Chat for v2.0.
+    Send `context` on the first turn; afterwards only `message` + `session_id`.
     """
     try:
         data = request.get_json()
         message = data.get('message')
-        context = data.get('context', {})
+        context = data.get('context')
+        session_id = data.get('session_id')
 
         if not message:
             return jsonify({"status": "error", "message": "Missing message"}), 400
+        if context is None and not session_id:
+            context = {}
             
-        response = ai_engine.chat_with_tutor(message, context)
+        response, session_id = ai_engine.chat_in_session(
+            message, session_id=session_id, context_data=context, ai_mode=data.get('ai_mode')
+        )
         
         return jsonify({
             "status": "success",
-            "response": response
+            "response": response,
+            "session_id": session_id
         })
+    except SessionExpiredError as e:
+        return jsonify({"status": "error", "message": str(e), "session_expired": True}), 410
     except Exception as e:
         traceback.print_exc()
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/v2/ai-metrics', methods=['GET'])
+def api_v2_ai_metrics():
+    """
+    AI request metrics: coalescing ratio, upstream queue wait times and pool state.
+    """
+    return jsonify({
+        "status": "success",
+        "metrics": ai_engine.get_metrics()
+    })
+
 @app.route('/explore')
 def explore():
     """
@@ -415,20 +1047,26 @@ def ai_chat():
         data = request.get_json()
         print(f"DEBUG: Request Data: {data}", flush=True) # Debug Print
         message = data.get('message')
-        context = data.get('context', {}) # Contains Tithi, Nakshatra etc.
+        context = data.get('context') # Contains Tithi, Nakshatra etc. (first turn only)
+        session_id = data.get('session_id')
 
         if not message:
             print("DEBUG: No message found in request", flush=True) # Debug Print
             return jsonify({"success": False, "error": "Missing message"}), 400
+        if context is None and not session_id:
+            context = {}
             
         print("DEBUG: Calling AI Engine...", flush=True) # Debug Print
-        response = ai_engine.chat_with_tutor(message, context)
+        response, session_id = ai_engine.chat_in_session(message, session_id=session_id, context_data=context)
         print(f"DEBUG: AI Response Length: {len(response)}", flush=True) # Debug Print
         
         return jsonify({
             "success": True,
-            "response": response
+            "response": response,
+            "session_id": session_id
         })
+    except SessionExpiredError as e:
+        return jsonify({"success": False, "error": str(e), "session_expired": True}), 410
     except Exception as e:
         print(f"DEBUG: CRITICAL ERROR in /api/ai-chat: {str(e)}", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
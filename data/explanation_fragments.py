@@ -0,0 +1,108 @@
+# Content fragments for the local (template) explanation engine.
+# One short, scientifically-framed sentence per calendar value. Keyed by index,
+# matching the ordering of the lists in data/panchanga_data.py and engines/mayan/engine.py.
+
+# 12 Masas (Chaitra..Phalguna): nakshatra near the Full Moon that names the month + season
+MASA_FRAGMENTS = [
+    ("Chitra", "Spica", "spring (Vasanta), when the Sun has just crossed the equinox point"),
+    ("Vishakha", "Alpha Librae", "late spring, as days keep lengthening in the northern hemisphere"),
+    ("Jyeshtha", "Antares", "early summer (Grishma), the hottest stretch before the monsoon"),
+    ("Purva Ashadha", "Delta Sagittarii", "the summer solstice season, when the Sun turns south (Dakshinayana)"),
+    ("Shravana", "Altair", "the monsoon (Varsha), when rain clouds often hide the night sky"),
+    ("Purva Bhadrapada", "Alpha Pegasi", "late monsoon, with the Great Square of Pegasus rising in the evening"),
+    ("Ashwini", "Beta Arietis", "early autumn (Sharad), around the autumnal equinox"),
+    ("Krittika", "the Pleiades", "mid-autumn, when the Pleiades cluster shines all night"),
+    ("Mrigashira", "Lambda Orionis", "late autumn (Hemanta), as Orion climbs the evening sky"),
+    ("Pushya", "Delta Cancri", "early winter, around the winter solstice"),
+    ("Magha", "Regulus", "deep winter (Shishira), after the Sun has turned north (Uttarayana)"),
+    ("Uttara Phalguni", "Denebola", "late winter, just before the spring equinox closes the solar year"),
+]
+
+# 27 Nakshatras: an observable fact about the marker star/asterism
+NAKSHATRA_FRAGMENTS = [
+    "Its marker stars are Beta and Gamma Arietis, the 'horns' of the Ram, right where the sidereal zodiac begins.",
+    "Its marker is a tight triangle around 41 Arietis, a faint group that needs a dark sky to see.",
+    "Its marker is the Pleiades (M45), an open cluster of young hot stars about 440 light-years away.",
+    "Its marker is Aldebaran, an orange giant about 65 light-years away that sits in front of the Hyades cluster.",
+    "Its marker is Lambda Orionis, the small triangle that forms Orion's head.",
+    "Its marker is Betelgeuse, a red supergiant so large it would swallow the orbit of Mars.",
+    "Its markers are Castor and Pollux, the Twins; Pollux is the closest giant star to the Sun.",
+    "Its marker is Delta Cancri, beside the Beehive Cluster (M44), visible as a misty patch to the naked eye.",
+    "Its markers form the head of Hydra, the longest constellation in the sky.",
+    "Its marker is Regulus, a fast-spinning blue star lying almost exactly on the ecliptic.",
+    "Its marker is Delta Leonis (Zosma), in the back of the Lion.",
+    "Its marker is Denebola, the Lion's tail, a young star surrounded by a dusty disk.",
+    "Its markers are the four bright stars of Corvus, which ancient observers pictured as an open hand.",
+    "Its marker is Spica, a close binary of two hot stars orbiting each other every four days.",
+    "Its marker is Arcturus, the brightest star in the northern celestial hemisphere, well north of the ecliptic.",
+    "Its markers are Alpha and Beta Librae, the old 'claws' of the Scorpion.",
+    "Its marker is Delta Scorpii, in the head of the Scorpion.",
+    "Its marker is Antares, a red supergiant whose name means 'rival of Mars' because of its colour.",
+    "Its markers form the curled tail of the Scorpion, pointing toward the centre of our galaxy.",
+    "Its marker is Delta Sagittarii, in the bow of the Archer, inside the bright Milky Way star clouds.",
+    "Its marker is Sigma Sagittarii (Nunki), part of the 'Teapot' asterism.",
+    "Its marker is Altair, one of the fastest-spinning stars known, completing a rotation in about 9 hours.",
+    "Its markers form the small diamond of Delphinus, the Dolphin.",
+    "Its marker is Lambda Aquarii, in a region of many faint stars: the name means 'a hundred physicians'.",
+    "Its markers are Markab and Scheat, the western side of the Great Square of Pegasus.",
+    "Its markers are Algenib and Alpheratz, the eastern side of the Great Square of Pegasus.",
+    "Its marker is Zeta Piscium, a faint double star near the point where the sidereal circle closes.",
+]
+
+# 7 Varas (Ravivara..Shanivara): body the weekday is named after
+VARA_FRAGMENTS = [
+    ("the Sun", "the star at the centre of the solar system"),
+    ("the Moon", "the fastest-moving body against the stars"),
+    ("Mars", "the red planet, with a 687-day orbit"),
+    ("Mercury", "the innermost planet, with an 88-day orbit"),
+    ("Jupiter", "the giant planet, taking ~11.86 years per orbit"),
+    ("Venus", "the brightest planet, with a 225-day orbit"),
+    ("Saturn", "the slowest naked-eye planet, taking ~29.5 years per orbit"),
+]
+
+# 20 Tzolk'in day signs (Imix..Ajaw): common gloss
+TZOLKIN_FRAGMENTS = [
+    "commonly glossed as 'water lily' or the earth-crocodile, the first day sign",
+    "glossed as 'wind' or 'breath'",
+    "glossed as 'night' or 'darkness'",
+    "glossed as 'ripe maize' or 'seed'",
+    "glossed as 'serpent'",
+    "glossed as 'death', marking transformation in the count",
+    "glossed as 'deer'",
+    "glossed as 'star' and often linked to Venus in the codices",
+    "glossed as 'water' or 'jade'",
+    "glossed as 'dog'",
+    "glossed as 'monkey', the patron of artisans",
+    "glossed as 'road' or 'tooth'",
+    "glossed as 'reed' or 'green maize'",
+    "glossed as 'jaguar', the creature of the night sun",
+    "glossed as 'eagle'",
+    "glossed as 'wax' or 'owl'",
+    "glossed as 'earth' and earthquake",
+    "glossed as 'flint'",
+    "glossed as 'storm'",
+    "glossed as 'lord' or 'sun', the last day sign; period endings of the Long Count always fall on Ajaw",
+]
+
+# 19 Haab' months (Pop..Wayeb'): common gloss
+HAAB_FRAGMENTS = [
+    "glossed as 'mat', the symbol of authority, opening the 365-day year",
+    "glossed as 'black conjunction'",
+    "glossed as 'red conjunction'",
+    "glossed as 'bat'",
+    "of uncertain meaning, possibly 'skull'",
+    "glossed as 'dog'",
+    "glossed as 'new sun'",
+    "glossed as 'water' or 'gathering'",
+    "glossed as 'black storm' or 'cave'",
+    "glossed as 'green storm'",
+    "glossed as 'white storm'",
+    "glossed as 'red storm' or 'deer'",
+    "glossed as 'enclosed'",
+    "glossed as 'yellow sun'",
+    "glossed as 'owl' or 'cloud'",
+    "glossed as 'drum' or 'planting time'",
+    "glossed as 'turtle'",
+    "glossed as 'granary' or 'dark god'",
+    "the five unnamed days that close the year (5 days instead of 20)",
+]
@@ -93,6 +93,35 @@ VARAS = {
     "SA": ["रविवासरः", "सोमवासरः", "मङ्गलवासरः", "बुधवासरः", "गुरुवासरः", "शुक्रवासरः", "शनिवासरः"]
 }
 
+# Day-segment names (v6.1): Choghadiya in the cycle order Udvega, Chara, Labha, Amrita, Kala,
+# Shubha, Roga; Muhurtas as 15 of the day followed by 15 of the night
+CHOGHADIYAS = {
+    "EN": ["Udvega", "Chara", "Labha", "Amrita", "Kala", "Shubha", "Roga"],
+    "KN": ["ಉದ್ವೇಗ", "ಚರ", "ಲಾಭ", "ಅಮೃತ", "ಕಾಲ", "ಶುಭ", "ರೋಗ"],
+    "SA": ["उद्वेगः", "चरः", "लाभः", "अमृतम्", "कालः", "शुभः", "रोगः"]
+}
+
+MUHURTAS = {
+    "EN": [
+        "Rudra", "Ahi", "Mitra", "Pitri", "Vasu", "Varaha", "Vishvedeva", "Vidhi (Abhijit)", "Satamukhi",
+        "Puruhuta", "Vahni", "Naktanakara", "Varuna", "Aryama", "Bhaga",
+        "Girisha", "Ajapada", "Ahirbudhnya", "Pushya", "Ashvini", "Yama", "Agni", "Vidhata", "Kanda",
+        "Aditi", "Jiva", "Vishnu", "Dyumadgadyuti", "Brahma", "Samudra"
+    ],
+    "KN": [
+        "ರುದ್ರ", "ಅಹಿ", "ಮಿತ್ರ", "ಪಿತೃ", "ವಸು", "ವರಾಹ", "ವಿಶ್ವೇದೇವ", "ವಿಧಿ (ಅಭಿಜಿತ್)", "ಸತಮುಖಿ",
+        "ಪುರುಹೂತ", "ವಹ್ನಿ", "ನಕ್ತನಕರ", "ವರುಣ", "ಅರ್ಯಮ", "ಭಗ",
+        "ಗಿರೀಶ", "ಅಜಪಾದ", "ಅಹಿರ್ಬುಧ್ನ್ಯ", "ಪುಷ್ಯ", "ಅಶ್ವಿನಿ", "ಯಮ", "ಅಗ್ನಿ", "ವಿಧಾತೃ", "ಕಂಡ",
+        "ಅದಿತಿ", "ಜೀವ", "ವಿಷ್ಣು", "ದ್ಯುಮದ್ಗದ್ಯುತಿ", "ಬ್ರಹ್ಮ", "ಸಮುದ್ರ"
+    ],
+    "SA": [
+        "रुद्रः", "अहिः", "मित्रः", "पितृ", "वसुः", "वराहः", "विश्वेदेवाः", "विधिः (अभिजित्)", "सतमुखी",
+        "पुरुहूतः", "वह्निः", "नक्तनकरः", "वरुणः", "अर्यमा", "भगः",
+        "गिरीशः", "अजपादः", "अहिर्बुध्न्यः", "पुष्यः", "अश्विनी", "यमः", "अग्निः", "विधाता", "कण्डः",
+        "अदितिः", "जीवः", "विष्णुः", "द्युमद्गद्युतिः", "ब्रह्मा", "समुद्रः"
+    ]
+}
+
 RASIS = {
     "EN": ["Mesha", "Vrishabha", "Mithuna", "Karka", "Simha", "Kanya", "Tula", "Vrishchika", "Dhanu", "Makara", "Kumbha", "Meena"],
     "KN": ["ಮೇಷ", "ವೃಷಭ", "ಮಿಥುನ", "ಕರ್ಕ", "ಸಿಂಹ", "ಕನ್ಯಾ", "ತುಲಾ", "ವೃಶ್ಚಿಕ", "ಧನು", "ಮಕರ", "ಕುಂಭ", "ಮೀನ"],
@@ -111,6 +111,11 @@ if ! sudo -u $CURRENT_USER ./venv/bin/python3 -m py_compile $DEPLOY_DIR/gateway.
 fi
 echo "🛰️  Pre-downloading astronomical data files..."
 sudo -u $CURRENT_USER ./venv/bin/python3 -c "from skyfield.api import load; load('de421.bsp'); load.timescale()"
+echo "📐 Building sidereal Chebyshev tables, the limb-transition, lunation and Jupiter-Saturn indexes..."
+sudo -u $CURRENT_USER ./venv/bin/python3 -m utils.sidereal_tables
+sudo -u $CURRENT_USER ./venv/bin/python3 -m utils.limb_index
+sudo -u $CURRENT_USER ./venv/bin/python3 -m utils.lunation_index
+sudo -u $CURRENT_USER ./venv/bin/python3 -m utils.samvatsara_cycle
 
 # 6. FIX PERMISSIONS (Layered Strategy - Final)
 echo "🔒 Applying Layered Permission Strategy..."
@@ -8,13 +8,30 @@ class BaseCalendar(ABC):
     """
 
     @abstractmethod
-    def calculate_data(self, date_str, time_str, location_name, lang='EN'):
+    def calculate_data(self, date_str, time_str, location_name, lang='EN', mode='instant'):
         """
         Performs the core astronomical/calendar calculations based on input strings.
         Returns a dictionary containing the primary results.
+        `mode` ('instant' / 'udaya') selects the day reckoning for calendars whose day starts at
+        sunrise; others ignore it.
         """
         pass
 
+    def calculate_resolved(self, moment, lang='EN', mode='instant'):
+        """
+        Same as calculate_data, from an already resolved moment (utils.moment.resolve_moment).
+        Engines override this so multi-engine requests geocode and localize only once.
+        """
+        return self.calculate_data(moment["date"], moment["time"], moment["location"], lang=lang, mode=mode)
+
+    def calculate_batch(self, moments, lang='EN', precision=None):
+        """
+        calculate_resolved for many moments at once, results in input order.
+        Engines override this with vectorized paths; visuals and other heavy extras may be omitted.
+        `precision` ('precise' / 'fast') is a hint for ephemeris-based engines; others ignore it.
+        """
+        return [self.calculate_resolved(moment, lang=lang) for moment in moments]
+
     @abstractmethod
     def get_visual_configs(self, calculated_data):
         """
@@ -37,12 +54,32 @@ class BaseCalendar(ABC):
         pass
 
     @abstractmethod
-    def generate_ical(self, date_str, time_str, location_name, title, lang):
+    def generate_ical(self, date_str, time_str, location_name, title, lang, mode='instant'):
         """
         Generates iCal (.ics) content for the calendar.
         """
         pass
 
+    def stream_ical(self, date_str, time_str, location_name, title, lang, num_entries=20, mode='instant'):
+        """
+        Returns an iterator of iCal (.ics) chunks for streaming responses.
+        Engines override this to stream long recurrence horizons with constant memory.
+        """
+        return iter([self.generate_ical(date_str, time_str, location_name, title, lang, mode=mode)])
+
+    def stream_bulk_ical(self, events, title, lang, num_entries=20, mode='instant'):
+        """
+        Streams one combined iCal calendar for many events (dicts with date, time, location, title).
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support bulk iCal generation")
+
+    def feed_occurrences(self, date_str, time_str, location_name, lang, from_year, to_year):
+        """
+        Returns the occurrences (dicts with 'datetime' and 'report') falling in [from_year, to_year].
+        Subscription feeds call this only for the years not yet cached.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support subscription feeds")
+
     @abstractmethod
     def get_rich_visuals(self, date_str, time_str, location_name, title):
         """
@@ -1,5 +1,6 @@
 import math
-from datetime import datetime
+from datetime import datetime, timedelta
+import numpy as np
 from engines.base import BaseCalendar
 
 class MayanEngine(BaseCalendar):
@@ -25,6 +26,16 @@ class MayanEngine(BaseCalendar):
     # GMT Correlation (Goodman-Martinez-Thompson)
     GMT_CORRELATION = 584283
 
+    # JD of 1970-01-01 00:00:00 UTC
+    UNIX_EPOCH_JD = 2440587.5
+
+    # One Calendar Round = LCM(260, 365) days = 52 Haab' years
+    CALENDAR_ROUND_DAYS = 18980
+    KATUN_DAYS = 7200
+
+    # Day count (since 13.0.0.0.0) of 1970-01-01: JDN 2440588 - GMT
+    UNIX_EPOCH_DAYS = 2440588 - 584283
+
     def _get_julian_day(self, dt):
         """Standard Julian Day calculation from datetime object."""
         y, m, d = dt.year, dt.month, dt.day
@@ -36,32 +47,48 @@ class MayanEngine(BaseCalendar):
         jd = math.floor(365.25 * (y + 4716)) + math.floor(30.6001 * (m + 1)) + d + b - 1524.5
         return jd
 
-    def calculate_data(self, date_str, time_str, location_name, lang='EN'):
+    def calculate_data(self, date_str, time_str, location_name, lang='EN', mode='instant'):
         """
         Calculates Mayan data from input strings.
         Resolves location to ensure localized datetime is correctly converted to UTC for JD.
         """
-        from utils.location import get_location_details
-        import pytz
+        from utils.moment import resolve_moment
 
-        # 1. Resolve Location & Timezone
-        loc = get_location_details(location_name)
-        local_tz = pytz.timezone(loc["timezone"])
-        
-        # 2. Parse DateTime
-        dt_str = f"{date_str} {time_str}"
-        naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        local_dt = local_tz.localize(naive_dt)
-        utc_dt = local_dt.astimezone(pytz.utc)
+        return self.calculate_resolved(resolve_moment(date_str, time_str, location_name), lang=lang)
+
+    def calculate_resolved(self, moment, lang='EN', mode='instant'):
+        """
+        Mayan data for a moment resolved once by utils.moment.resolve_moment (only its Julian Day is needed).
+        """
+        jd = moment["julian_day"]
+
+        # Perform Mayan Arithmetic (floor, not truncation: a moment before 13.0.0.0.0 belongs to the previous day)
+        days_since_epoch = math.floor(jd - self.GMT_CORRELATION)
 
-        # 3. Calculate Julian Day (JD) from Unix Timestamp
-        # JD 2440587.5 is 1970-01-01 00:00:00 UTC
-        timestamp = utc_dt.timestamp()
-        jd = 2440587.5 + (timestamp / 86400.0)
+        result = self._calendar_from_days(days_since_epoch)
+        result["julian_day"] = jd
+        result["days_since_epoch"] = days_since_epoch
+        return result
 
-        # 4. Perform Mayan Arithmetic
-        days_since_epoch = int(jd - self.GMT_CORRELATION)
+    def calculate_batch(self, moments, lang='EN', precision=None):
+        """
+        calculate_resolved for many moments: day counts come from one vectorized pass.
+        """
+        jds = [moment["julian_day"] for moment in moments]
+        days = self.calculate_bulk(jds)["days_since_epoch"].tolist() if jds else []
+
+        results = []
+        for jd, day in zip(jds, days):
+            result = self._calendar_from_days(day)
+            result["julian_day"] = jd
+            result["days_since_epoch"] = day
+            results.append(result)
+        return results
 
+    def _calendar_from_days(self, days_since_epoch):
+        """
+        Pure integer arithmetic: Long Count, Tzolk'in and Haab' for a day count since 13.0.0.0.0.
+        """
         # 1. Long Count Calculation
         baktun = days_since_epoch // 144000
         rem = days_since_epoch % 144000
@@ -113,9 +140,7 @@ class MayanEngine(BaseCalendar):
                 "day": haab_day_val,
                 "month": haab_month_name,
                 "formatted": haab_full
-            },
-            "julian_day": jd,
-            "days_since_epoch": days_since_epoch
+            }
         }
 
     def get_visual_configs(self, calculated_data):
@@ -172,49 +197,303 @@ class MayanEngine(BaseCalendar):
         Focus exclusively on mathematical elegance and astronomical precision.
         """
 
-    def generate_ical(self, date_str, time_str, location_name, title, lang):
+    def calculate_bulk(self, julian_days):
         """
-        Generates iCal content with the next 20 occurrences of the Calendar Round.
-        18,980 days = 52 Haab years.
+        Vectorized counterpart of _calendar_from_days for an array of Julian Days.
+        Returns columnar int arrays (no per-day dicts); a million days converts in a few ms.
+        """
+        days = np.floor(np.asarray(julian_days, dtype=np.float64) - self.GMT_CORRELATION).astype(np.int64)
+        return self._columns_from_days(days)
+
+    def count_range_days(self, start_date, end_date):
+        """Number of days in [start_date, end_date], computed without materialising the range."""
+        return int((np.datetime64(end_date, "D") - np.datetime64(start_date, "D")).astype(np.int64)) + 1
+
+    def calculate_date_range(self, start_date, end_date):
+        """
+        Columnar Mayan data for every Gregorian day in [start_date, end_date] (ISO strings or dates).
+        Each civil date maps to the Mayan day starting at its noon (JDN), as in the monuments' correlation.
+        """
+        dates = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+        days = dates.astype(np.int64) + self.UNIX_EPOCH_DAYS
+        columns = self._columns_from_days(days)
+        columns["date"] = dates
+        columns["julian_day"] = days + self.GMT_CORRELATION
+        return columns
+
+    def _columns_from_days(self, days):
+        """Long Count, Tzolk'in and Haab' as parallel int arrays for an int64 day-count array."""
+        baktun, rem = np.divmod(days, 144000)
+        katun, rem = np.divmod(rem, 7200)
+        tun, rem = np.divmod(rem, 360)
+        uinal, kin = np.divmod(rem, 20)
+
+        haab_days = (days + 348) % 365
+        haab_month = np.minimum(haab_days // 20, 18)  # 18 = Wayeb'
+        haab_day = haab_days - haab_month * 20
+
+        return {
+            "days_since_epoch": days,
+            "baktun": baktun,
+            "katun": katun,
+            "tun": tun,
+            "uinal": uinal,
+            "kin": kin,
+            "tzolkin_number": (days + 3) % 13 + 1,
+            "tzolkin_name": (days + 19) % 20,
+            "haab_day": haab_day,
+            "haab_month": haab_month
+        }
+
+    def format_columns(self, columns):
+        """Converts columnar arrays into JSON-ready lists, including the formatted strings."""
+        tzolkin_names = np.array(self.TZOLKIN_NAMES, dtype=object)[columns["tzolkin_name"]]
+        haab_months = np.array(self.HAAB_MONTHS, dtype=object)[columns["haab_month"]]
+        lc = zip(columns["baktun"].tolist(), columns["katun"].tolist(), columns["tun"].tolist(),
+                 columns["uinal"].tolist(), columns["kin"].tolist())
+
+        out = {key: value.tolist() for key, value in columns.items() if key not in ("date", "tzolkin_name", "haab_month")}
+        if "date" in columns:
+            out["date"] = np.datetime_as_string(columns["date"], unit="D").tolist()
+        out["tzolkin_name"] = tzolkin_names.tolist()
+        out["haab_month"] = haab_months.tolist()
+        out["long_count"] = [f"{b}.{k}.{t}.{u}.{d}" for b, k, t, u, d in lc]
+        out["tzolkin"] = [f"{n} {name}" for n, name in zip(out["tzolkin_number"], out["tzolkin_name"])]
+        out["haab"] = [f"{d} {month}" for d, month in zip(out["haab_day"], out["haab_month"])]
+        return out
+
+    def katun_date_range(self, baktun, katun):
+        """Gregorian (start, end) dates of the K'atun baktun.katun.0.0.0 - baktun.katun.19.17.19."""
+        first = baktun * 144000 + katun * 7200 - self.UNIX_EPOCH_DAYS
+        start = np.datetime64(0, "D") + first
+        return start, start + (self.KATUN_DAYS - 1)
+
+    def _normalize_name(self, name):
+        return str(name).strip().lower().replace("'", "").replace("\u2019", "")
+
+    def _parse_tzolkin(self, text):
+        """'4 Ajaw' -> residue of the day count modulo 260."""
+        parts = str(text).split(None, 1)
+        names = [self._normalize_name(n) for n in self.TZOLKIN_NAMES]
+        if len(parts) != 2 or not parts[0].isdigit() or self._normalize_name(parts[1]) not in names:
+            raise ValueError(f"Invalid Tzolk'in date: {text}")
+        number, name_idx = int(parts[0]), names.index(self._normalize_name(parts[1]))
+        if not 1 <= number <= 13:
+            raise ValueError(f"Invalid Tzolk'in number: {number}")
+        # Solve d + 3 = number - 1 (mod 13) and d + 19 = name_idx (mod 20)
+        return self._crt(number - 4, 13, name_idx - 19, 20)
+
+    def _parse_haab(self, text):
+        """'8 Kumk'u' -> residue of the day count modulo 365."""
+        parts = str(text).split(None, 1)
+        months = [self._normalize_name(m) for m in self.HAAB_MONTHS]
+        if len(parts) != 2 or not parts[0].isdigit() or self._normalize_name(parts[1]) not in months:
+            raise ValueError(f"Invalid Haab' date: {text}")
+        day, month_idx = int(parts[0]), months.index(self._normalize_name(parts[1]))
+        if day >= (5 if month_idx == 18 else 20):
+            raise ValueError(f"Invalid Haab' day: {text}")
+        return (month_idx * 20 + day - 348) % 365
+
+    def _crt(self, r1, m1, r2, m2):
+        """
+        Chinese Remainder Theorem for x = r1 (mod m1), x = r2 (mod m2), moduli not necessarily coprime.
+        Returns (residue, lcm) or None when the congruences are incompatible.
+        """
+        g = math.gcd(m1, m2)
+        if (r2 - r1) % g:
+            return None
+        lcm = m1 // g * m2
+        k = ((r2 - r1) // g * pow(m1 // g, -1, m2 // g)) % (m2 // g)
+        return (r1 + k * m1) % lcm, lcm
+
+    def _long_count_range(self, text):
+        """
+        '13.0.0.0.0' -> that single day; a prefix such as '13.0' -> the whole K'atun.
+        Returns inclusive (first_day, last_day) day counts.
+        """
+        try:
+            parts = [int(p) for p in str(text).split(".") if p.strip() != ""]
+        except ValueError:
+            raise ValueError(f"Invalid Long Count: {text}")
+        limits = [None, 20, 20, 18, 20]
+        units = [144000, 7200, 360, 20, 1]
+        if not 1 <= len(parts) <= 5 or any(p < 0 or (lim and p >= lim) for p, lim in zip(parts, limits)):
+            raise ValueError(f"Invalid Long Count: {text}")
+        first = sum(p * u for p, u in zip(parts, units))
+        return first, first + units[len(parts) - 1] - 1
+
+    def find_dates(self, tzolkin=None, haab=None, long_count=None, start_date=None, end_date=None, limit=500):
+        """
+        Reverse lookup: Gregorian dates in a window matching a Tzolk'in and/or Haab' date and/or Long Count.
+        The cycle constraints are solved in closed form (CRT over 260/365, an 18,980-day Calendar Round when
+        combined), so results are enumerated by stepping the modulus: constant time per result, no day scan.
+        Without a Long Count the window defaults to 1900-01-01..2100-12-31; a Long Count bounds it on its own.
+        """
+        if not any([tzolkin, haab, long_count]):
+            raise ValueError("Provide a Tzolk'in, Haab' or Long Count date")
+
+        # 1. Window as day counts since 13.0.0.0.0 (JDN - GMT correlation)
+        start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
+        if long_count is None:
+            start = start or datetime(1900, 1, 1)
+            end = end or datetime(2100, 12, 31)
+        lo = int(self._get_julian_day(start or datetime.min) + 0.5) - self.GMT_CORRELATION
+        hi = int(self._get_julian_day(end or datetime.max) + 0.5) - self.GMT_CORRELATION
+        if long_count:
+            lc_lo, lc_hi = self._long_count_range(long_count)
+            lo, hi = max(lo, lc_lo), min(hi, lc_hi)
+
+        # 2. Combine cycle congruences
+        residue, modulus = 0, 1
+        for constraint in (self._parse_tzolkin(tzolkin) if tzolkin else None,
+                           (self._parse_haab(haab), 365) if haab else None):
+            if constraint is None:
+                continue
+            combined = self._crt(residue, modulus, *constraint)
+            if combined is None:
+                # e.g. '4 Ajaw 9 Kumk'u' can never occur in a Calendar Round
+                raise ValueError(f"{tzolkin} {haab} never occurs in the Calendar Round")
+            residue, modulus = combined
+
+        # 3. Enumerate matches in the window
+        results = []
+        day = lo + (residue - lo) % modulus
+        while day <= hi and len(results) < limit:
+            data = self._calendar_from_days(day)
+            # Proleptic Gregorian ordinal = JDN - 1721425
+            gregorian = datetime.fromordinal(day + self.GMT_CORRELATION - 1721425)
+            results.append({
+                "date": gregorian.date().isoformat(),
+                "julian_day": day + self.GMT_CORRELATION,
+                "long_count": data["long_count"]["formatted"],
+                "tzolkin": data["tzolkin"]["formatted"],
+                "haab": data["haab"]["formatted"]
+            })
+            day += modulus
+        return results
+
+    def _resolve_moment(self, date_str, time_str, location_name, timezone_name=None):
+        """
+        Resolves location/timezone once and returns (local_tz, julian_day).
+        Callers that already know the timezone pass `timezone_name` to skip geocoding.
         """
         from utils.location import get_location_details
         import pytz
-        from utils.ical_gen import create_ical_content
 
-        # 1. Get Initial JD
-        loc = get_location_details(location_name)
-        local_tz = pytz.timezone(loc["timezone"])
+        if timezone_name is None:
+            timezone_name = get_location_details(location_name)["timezone"]
+        local_tz = pytz.timezone(timezone_name)
         naive_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-        local_dt = local_tz.localize(naive_dt)
-        utc_dt = local_dt.astimezone(pytz.utc)
-        initial_jd = 2440587.5 + (utc_dt.timestamp() / 86400.0)
-
-        # 2. Find next 20 matches (52-year cycle)
-        # One Calendar Round = 18,980 days
-        matches = []
-        for i in range(1, 21):
-            target_jd = initial_jd + (i * 18980)
-            # Convert JD back to datetime
-            # timestamp = (jd - 2440587.5) * 86400
-            target_ts = (target_jd - 2440587.5) * 86400
-            match_utc = datetime.fromtimestamp(target_ts, tz=pytz.utc)
-            match_local = match_utc.astimezone(local_tz)
-            
-            # Formulate description
-            mayan_data = self.calculate_data(match_local.strftime("%Y-%m-%d"), 
-                                            match_local.strftime("%H:%M"), 
-                                            location_name)
-            
-            description = (f"Mayan Anniversary: {mayan_data['tzolkin']['formatted']} {mayan_data['haab']['formatted']}\n"
-                           f"Long Count: {mayan_data['long_count']['formatted']}")
-            
-            matches.append({
-                "date": match_local.date(),
-                "time": match_local.time(),
-                "description": description
-            })
+        utc_dt = local_tz.localize(naive_dt).astimezone(pytz.utc)
+        return local_tz, self.UNIX_EPOCH_JD + (utc_dt.timestamp() / 86400.0)
+
+    def iter_anniversaries(self, initial_jd, local_tz, num_entries=20, title=None, milestones=True):
+        """
+        Generator of upcoming Calendar Round anniversaries ({'datetime', 'report'}), in date order.
+        Pure integer arithmetic: one Calendar Round is 18,980 days (LCM of 260 and 365), so no
+        per-occurrence geocoding or re-conversion is needed. With `milestones`, K'atun and B'ak'tun
+        period endings within the same span are interleaved (tagged with their own title).
+        Stops at the last date a datetime can represent (year 9999).
+        """
+        import heapq
+        import pytz
+
+        epoch_utc = datetime(1970, 1, 1, tzinfo=pytz.utc)
+        max_jd = self.UNIX_EPOCH_JD + (datetime.max.toordinal() - epoch_utc.toordinal())
+        days_since_epoch = int(initial_jd - self.GMT_CORRELATION)
+        last_day = days_since_epoch + num_entries * self.CALENDAR_ROUND_DAYS
+
+        def occurrence(day, report):
+            # Same time of day as the original moment, shifted by whole days
+            jd = initial_jd + (day - days_since_epoch)
+            if jd >= max_jd:
+                return None
+            match_dt = (epoch_utc + timedelta(seconds=round((jd - self.UNIX_EPOCH_JD) * 86400))).astimezone(local_tz)
+            return {"datetime": match_dt, "report": report}
+
+        def calendar_rounds():
+            for i in range(1, num_entries + 1):
+                day = days_since_epoch + i * self.CALENDAR_ROUND_DAYS
+                data = self._calendar_from_days(day)
+                occ = occurrence(day, f"Mayan Anniversary: {data['tzolkin']['formatted']} {data['haab']['formatted']}\n"
+                                      f"Long Count: {data['long_count']['formatted']}")
+                if occ is None:
+                    return
+                yield occ
+
+        def period_endings():
+            day = (days_since_epoch // self.KATUN_DAYS + 1) * self.KATUN_DAYS
+            while day <= last_day:
+                data = self._calendar_from_days(day)
+                period = "B'ak'tun" if day % 144000 == 0 else "K'atun"
+                occ = occurrence(day, f"{period} Ending: {data['long_count']['formatted']}\n"
+                                      f"{data['tzolkin']['formatted']} {data['haab']['formatted']}")
+                if occ is None:
+                    return
+                if title:
+                    occ["title"] = f"{title} ({period} {data['long_count']['formatted']})"
+                yield occ
+                day += self.KATUN_DAYS
+
+        if not milestones:
+            return calendar_rounds()
+        return heapq.merge(calendar_rounds(), period_endings(), key=lambda occ: occ["datetime"])
+
+    def generate_ical(self, date_str, time_str, location_name, title, lang, mode='instant'):
+        """
+        Generates iCal content with the next 20 occurrences of the Calendar Round.
+        18,980 days = 52 Haab years.
+        """
+        return "".join(self.stream_ical(date_str, time_str, location_name, title, lang))
+
+    def stream_ical(self, date_str, time_str, location_name, title, lang, num_entries=20, mode='instant'):
+        """
+        Streams the next `num_entries` Calendar Round anniversaries plus Long Count period endings.
+        """
+        from utils.ical_gen import stream_ical_content
+
+        local_tz, initial_jd = self._resolve_moment(date_str, time_str, location_name)
+        return stream_ical_content(title, self.iter_anniversaries(initial_jd, local_tz, num_entries, title=title))
+
+    def stream_bulk_ical(self, events, title, lang, num_entries=20, mode='instant'):
+        """
+        Streams one combined calendar for many events; each distinct location is geocoded once.
+        """
+        import heapq
+        from utils.location import get_location_details
+        from utils.ical_gen import stream_ical_content
+
+        timezones = {}
+        streams = []
+        for event in events:
+            name = event["location"]
+            if name not in timezones:
+                timezones[name] = get_location_details(name)["timezone"]
+            local_tz, initial_jd = self._resolve_moment(event["date"], event["time"], name, timezones[name])
+            event_title = event.get("title") or title
+            streams.append(({**occ, "title": occ.get("title", event_title)}
+                            for occ in self.iter_anniversaries(initial_jd, local_tz, num_entries, title=event_title)))
+
+        combined = heapq.merge(*streams, key=lambda occ: occ["datetime"])
+        return stream_ical_content(title, combined, calendar_name=title)
+
+    def feed_occurrences(self, date_str, time_str, location_name, lang, from_year, to_year):
+        """
+        Anniversaries and period endings falling in [from_year, to_year] (incremental feed regeneration).
+        """
+        local_tz, initial_jd = self._resolve_moment(date_str, time_str, location_name)
+        base_year = int(date_str[:4])
+        num_entries = max(1, math.ceil((to_year - base_year + 1) * 365.25 / self.CALENDAR_ROUND_DAYS))
 
-        return create_ical_content(matches, title)
+        occurrences = []
+        for occ in self.iter_anniversaries(initial_jd, local_tz, num_entries):
+            year = occ["datetime"].year
+            if year > to_year:
+                break
+            if year >= from_year:
+                occurrences.append(occ)
+        return occurrences
 
     def get_rich_visuals(self, date_str, time_str, location_name, title):
         """
@@ -2,52 +2,79 @@ from engines.base import BaseCalendar
 from datetime import datetime
 import pytz
 from utils.location import get_location_details
+from utils.moment import resolve_moment
 from panchanga.calculations import (
     calculate_vara, calculate_tithi, calculate_nakshatra, 
     calculate_yoga, calculate_karana, calculate_masa_samvatsara,
-    calculate_saka_year, format_panchanga_report
+    calculate_saka_year, format_panchanga_report, lookup_masa_samvatsara
 )
 from utils.astronomy import get_sidereal_longitude, get_sunrise_sunset, sun, moon, get_previous_new_moon, get_angular_data
-from panchanga.recurrence import find_recurrences
+from panchanga.recurrence import find_recurrences, iter_recurrences, find_recurrences_bulk
+from panchanga.reverse import find_panchanga_dates
+from panchanga.search import search_panchanga
+from panchanga.segments import calculate_time_segments
+from panchanga.batch import calculate_batch
+from utils.graha_events import find_graha_events
+from utils.eclipses import find_eclipses
+from panchanga.udaya import INSTANT, UDAYA, check_mode, udaya_day
+from data.panchanga_data import TITHIS
 from utils.zodiac import get_zodiac_name, ZODIAC_SIGNS
-from utils.astronomy import get_rashi, get_lagna
-from utils.ical_gen import create_ical_content
+from utils.astronomy import get_rashi, get_lagna, DEFAULT_PRECISION
+from utils.limb_index import get_limb_periods
+from utils.ical_gen import stream_ical_content
 from utils.skyshot import generate_skymap, get_cache_key as get_sky_cache, get_cached_image as get_sky_cached
 from utils.solar_system import generate_solar_system, get_cache_key as get_solar_cache, get_cached_image as get_solar_cached
 import base64
 import os
+from itertools import islice
 
 class PanchangaEngine(BaseCalendar):
-    def calculate_data(self, date_str, time_str, location_name, lang='EN'):
+    # 'precise' (DE421), 'fast' (analytic series) or 'table' (Chebyshev tables) for the batched paths;
+    # ASTRONOMY_PRECISION sets the default
+    precision = DEFAULT_PRECISION
+
+    def calculate_data(self, date_str, time_str, location_name, lang='EN', mode=INSTANT):
         """
         Calculates Panchanga data. Logic moved verbatim from app.py:get_panchanga().
         """
-        # 1. Resolve Location
-        loc = get_location_details(location_name)
-        
-        # 2. Parse DateTime
-        dt_str = f"{date_str} {time_str}"
-        naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        local_tz = pytz.timezone(loc["timezone"])
-        local_dt = local_tz.localize(naive_dt)
-        utc_dt = local_dt.astimezone(pytz.utc)
+        return self.calculate_resolved(resolve_moment(date_str, time_str, location_name), lang=lang, mode=mode)
+
+    def calculate_resolved(self, moment, lang='EN', mode=INSTANT):
+        """
+        Panchanga data for a moment resolved once by utils.moment.resolve_moment.
+        mode='udaya' reports the limbs prevailing at the sunrise that opens the moment's Panchanga
+        day (the civil almanac convention), plus an 'udaya' block with kshaya/adhika Tithi flags.
+        """
+        # 1-2. Location and DateTime come pre-resolved
+        loc = moment["loc"]
+        local_dt = moment["local_dt"]
+        utc_dt = moment["utc_dt"]
+
+        # Udaya mode (v6.1): limbs are taken at the sunrise opening the Panchanga day
+        udaya = udaya_day(local_dt, loc) if check_mode(mode) == UDAYA else None
+        limb_utc = udaya["sunrise"].astimezone(pytz.utc) if udaya else utc_dt
+        limb_date = udaya["date"] if udaya else local_dt
 
         # 3. Get Astronomical Data
-        sun_lon = get_sidereal_longitude(utc_dt, sun)
-        moon_lon = get_sidereal_longitude(utc_dt, moon)
+        sun_lon = get_sidereal_longitude(limb_utc, sun)
+        moon_lon = get_sidereal_longitude(limb_utc, moon)
         sunrise, sunset = get_sunrise_sunset(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
         
-        # New Moon for Masa
-        prev_nm_utc = get_previous_new_moon(utc_dt)
-        sun_lon_at_nm = get_sidereal_longitude(prev_nm_utc, sun)
-        
         # 4. Calculate Panchanga Elements
         vara = calculate_vara(local_dt, sunrise, lang=lang)
         tithi, paksha = calculate_tithi(sun_lon, moon_lon, lang=lang)
         nakshatra, nak_pada = calculate_nakshatra(moon_lon, lang=lang)
         yoga = calculate_yoga(sun_lon, moon_lon, lang=lang)
         karana_num = calculate_karana(sun_lon, moon_lon)
-        masa, samvatsara = calculate_masa_samvatsara(local_dt.year, sun_lon_at_nm, sun_lon, lang=lang)
+
+        # Masa and Samvatsara from the Sankranti/lunation index (v6.1); New Moon search outside it
+        lunar = lookup_masa_samvatsara(limb_utc, lang=lang)
+        if lunar:
+            masa, samvatsara, masa_info = lunar
+        else:
+            sun_lon_at_nm = get_sidereal_longitude(get_previous_new_moon(limb_utc), sun)
+            masa, samvatsara = calculate_masa_samvatsara(limb_date, sun_lon_at_nm, sun_lon, lang=lang)
+            masa_info = None
         
         # 5. Calculate Rashi and Lagna (v3.2)
         rashi_idx = get_rashi(moon_lon)
@@ -58,6 +85,9 @@ class PanchangaEngine(BaseCalendar):
         lagna_name = get_zodiac_name(lagna_idx, lang)
         lagna_code = ZODIAC_SIGNS[lagna_idx]["code"]
 
+        # 5b. Start/end of the active limbs, from the global transition index (v6.1)
+        limb_periods = get_limb_periods(limb_utc, loc["timezone"])
+
         report = format_panchanga_report(
             local_dt, loc["address"], loc["timezone"],
             sunrise, sunset, samvatsara, masa, paksha, tithi,
@@ -65,7 +95,7 @@ class PanchangaEngine(BaseCalendar):
         )
 
         # 6. Calculate Next Birthday (Feature v4.1)
-        next_bdays = find_recurrences(local_dt, loc, num_entries=1, lang=lang)
+        next_bdays = find_recurrences(local_dt, loc, num_entries=1, lang=lang, mode=mode)
         next_bday = next_bdays[0]["datetime"].strftime('%A, %B %d, %Y') if next_bdays else "N/A"
 
         # Construct payload (verbatim from app.py)
@@ -78,6 +108,7 @@ class PanchangaEngine(BaseCalendar):
             "samvatsara": samvatsara,
             "saka_year": calculate_saka_year(local_dt),
             "masa": masa,
+            "masa_info": masa_info,
             "paksha": paksha,
             "tithi": tithi,
             "vara": vara,
@@ -86,13 +117,30 @@ class PanchangaEngine(BaseCalendar):
             "karana": karana_num,
             "rashi": {"name": rashi_name, "code": rashi_code},
             "lagna": {"name": lagna_name, "code": lagna_code},
+            "limb_periods": limb_periods,
             "angular_data": get_angular_data(local_dt, loc["latitude"], loc["longitude"], loc["timezone"]),
             "next_birthday": next_bday,
             "report": report,
             "lat_lon": {"lat": loc["latitude"], "lon": loc["longitude"]} # Useful for visuals
         }
+        if udaya:
+            kshaya = udaya["kshaya_tithis"]
+            result_data["mode"] = UDAYA
+            result_data["udaya"] = {
+                "date": udaya["date"].strftime('%Y-%m-%d'),
+                "sunrise": udaya["sunrise"].strftime('%Y-%m-%d %H:%M:%S'),
+                "next_sunrise": udaya["next_sunrise"].strftime('%Y-%m-%d %H:%M:%S'),
+                "kshaya_tithis": [TITHIS[lang][i] for i in kshaya] if kshaya is not None else None,
+                "adhika_tithi": udaya["adhika_tithi"],
+            }
         return result_data
 
+    def calculate_batch(self, moments, lang='EN', precision=None):
+        """
+        Vectorized Panchanga for many moments (see panchanga.batch); no angular data, next birthday or report.
+        """
+        return calculate_batch(moments, lang=lang, precision=precision or self.precision)
+
     def get_visual_configs(self, data):
         """
         Specific for Panchanga - specifies which 3D modules to enable.
@@ -157,18 +205,102 @@ class PanchangaEngine(BaseCalendar):
         Tone: "Cool Science YouTuber" - high energy, fascinating, and precise.
         """
 
-    def generate_ical(self, date_str, time_str, location_name, title, lang):
+    def generate_ical(self, date_str, time_str, location_name, title, lang, mode=INSTANT):
         """
         Generates iCal content for 20 years of recurrences.
         """
+        return "".join(self.stream_ical(date_str, time_str, location_name, title, lang, num_entries=20, mode=mode))
+
+    def stream_ical(self, date_str, time_str, location_name, title, lang, num_entries=20, mode=INSTANT):
+        """
+        Streams iCal content for the next `num_entries` recurrences.
+        Location and input are resolved eagerly (so errors surface before streaming starts);
+        each VEVENT is written as soon as its recurrence is found.
+        """
         loc = get_location_details(location_name)
         dt_str = f"{date_str} {time_str}"
         naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
         local_tz = pytz.timezone(loc["timezone"])
         local_dt = local_tz.localize(naive_dt)
 
-        occurrences = find_recurrences(local_dt, loc, num_entries=20, lang=lang)
-        return create_ical_content(title, occurrences)
+        occurrences = iter_recurrences(local_dt, loc, lang=lang, max_years=num_entries * 2, mode=check_mode(mode))
+        return stream_ical_content(title, islice(occurrences, num_entries))
+
+    def stream_bulk_ical(self, events, title, lang, num_entries=20, mode=INSTANT):
+        """
+        Streams one combined calendar for many events (e.g. 50 family birthdays).
+        Each distinct location is geocoded once and all recurrences come from one batched pass
+        (find_recurrences_bulk), so cost grows with distinct locations/targets, not with events.
+        Udaya mode searches each event through the transition index instead (a few sunrises per match).
+        """
+        locations = {}
+        batch = []
+        for event in events:
+            name = event["location"]
+            if name not in locations:
+                locations[name] = get_location_details(name)
+            loc = locations[name]
+            naive_dt = datetime.strptime(f"{event['date']} {event['time']}", "%Y-%m-%d %H:%M")
+            batch.append((pytz.timezone(loc["timezone"]).localize(naive_dt), loc))
+
+        if check_mode(mode) == UDAYA:
+            per_event = [find_recurrences(base_dt, loc, num_entries=num_entries, lang=lang, mode=UDAYA)
+                         for base_dt, loc in batch]
+        else:
+            per_event = find_recurrences_bulk(batch, num_entries=num_entries, lang=lang, precision=self.precision)
+
+        combined = []
+        for event, occurrences in zip(events, per_event):
+            event_title = event.get("title") or title
+            combined.extend({**occ, "title": event_title} for occ in occurrences)
+        combined.sort(key=lambda occ: occ["datetime"])
+
+        return stream_ical_content(title, combined, calendar_name=title)
+
+    def feed_occurrences(self, date_str, time_str, location_name, lang, from_year, to_year):
+        """
+        Recurrences whose search window falls in [from_year, to_year] (incremental feed regeneration).
+        """
+        loc = get_location_details(location_name)
+        naive_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+        local_dt = pytz.timezone(loc["timezone"]).localize(naive_dt)
+
+        return list(iter_recurrences(local_dt, loc, lang=lang, max_years=to_year - from_year, from_year=from_year))
+
+    def find_dates(self, location_name, start_year, end_year, masa=None, paksha=None, tithi=None,
+                   samvatsara=None, lang='EN', limit=500):
+        """
+        Reverse lookup: Gregorian dates of a Masa / Paksha / Tithi (/ Samvatsara) at a location.
+        """
+        loc = get_location_details(location_name)
+        return find_panchanga_dates(loc, start_year, end_year, masa=masa, paksha=paksha, tithi=tithi,
+                                    samvatsara=samvatsara, lang=lang, limit=limit)
+
+    def search_days(self, location_name, start_date, end_date, criteria, lang='EN', limit=500):
+        """
+        Range search: every interval between two local dates where the combined criteria hold.
+        """
+        loc = get_location_details(location_name)
+        return search_panchanga(loc, start_date, end_date, criteria, lang=lang, limit=limit)
+
+    def time_segments(self, location_name, start_date, end_date, lang='EN'):
+        """
+        Rahu Kalam, Yamaganda, Gulika, Choghadiya and Muhurta spans for every local date in the range.
+        """
+        loc = get_location_details(location_name)
+        return calculate_time_segments(loc, start_date, end_date, lang=lang)
+
+    def graha_events(self, start_date, end_date, planets=None, timezone_str='UTC'):
+        """
+        Vakra (retrograde) stations and periods and Asta (combustion) windows of the tara-grahas.
+        """
+        return find_graha_events(start_date, end_date, planets=planets, timezone_str=timezone_str)
+
+    def eclipses(self, start_year, end_year, kinds=None, timezone_str='UTC'):
+        """
+        Solar and lunar eclipses (Grahana) in a range of years, classified at greatest eclipse.
+        """
+        return find_eclipses(start_year, end_year, kinds=kinds, timezone_str=timezone_str)
 
     def get_rich_visuals(self, date_str, time_str, location_name, title):
         """
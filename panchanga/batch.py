@@ -0,0 +1,84 @@
+from utils.astronomy import (
+    get_sidereal_longitudes, get_sun_moon_longitudes, get_sunrise_sunset, get_previous_new_moons, sun, get_rashi, get_lagna
+)
+from utils.zodiac import get_zodiac_name, ZODIAC_SIGNS
+from utils.lunation_index import get_lunation_index
+from data.panchanga_data import MASAS, SAMVATSARAS
+from panchanga.calculations import (
+    calculate_tithi, calculate_masa_samvatsara, calculate_vara, calculate_nakshatra,
+    calculate_yoga, calculate_karana, calculate_saka_year
+)
+
+# Batched Panchanga (v6.1)
+# Converts many resolved moments at once: Sun/Moon longitudes for all rows in one vectorized
+# Skyfield call each, the preceding New Moons of all rows from one vectorized solve
+# (get_previous_new_moons), and sunrise/sunset once per (location, day).
+# Masa/Samvatsara come from one binary search into the lunation index (utils.lunation_index)
+# when it covers every row; the New Moon solve is the fallback.
+# precision='fast' swaps the DE421 longitudes for the analytic series (utils.astronomy fast mode).
+# Visual/heavy extras (angular data, next birthday, report) are left to calculate_data.
+
+def _lunation_rows(utc_times):
+    """Lunation index rows for every instant, or None if the index does not cover them all."""
+    try:
+        index = get_lunation_index()
+        if not (index.covers(min(utc_times)) and index.covers(max(utc_times))):
+            return None
+        return index.lunations[index.positions([t.timestamp() for t in utc_times])]
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"⚠️ Lunation index unavailable: {e}")
+        return None
+
+def calculate_batch(moments, lang='EN', precision=None):
+    """
+    Panchanga results for a list of resolved moments (utils.moment.resolve_moment), in order.
+    Each result carries the calculate_data keys used by the v2 contract (no visuals, no report).
+    """
+    if not moments:
+        return []
+
+    utc_times = [m["utc_dt"] for m in moments]
+    sun_lons, moon_lons = get_sun_moon_longitudes(utc_times, precision)
+    lunations = _lunation_rows(utc_times)
+    if lunations is None:
+        nm_lons = get_sidereal_longitudes(get_previous_new_moons(utc_times), sun, precision)
+
+    sun_times = {}
+    results = []
+    for i, moment in enumerate(moments):
+        loc, local_dt = moment["loc"], moment["local_dt"]
+        sun_key = (loc["latitude"], loc["longitude"], local_dt.date())
+        if sun_key not in sun_times:
+            sun_times[sun_key] = get_sunrise_sunset(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
+        sunrise, sunset = sun_times[sun_key]
+
+        s_lon, m_lon = float(sun_lons[i]), float(moon_lons[i])
+        tithi, paksha = calculate_tithi(s_lon, m_lon, lang=lang)
+        nakshatra, nak_pada = calculate_nakshatra(m_lon, lang=lang)
+        if lunations is not None:
+            masa, samvatsara = MASAS[lang][lunations["masa"][i]], SAMVATSARAS[lang][lunations["samvatsara"][i]]
+        else:
+            masa, samvatsara = calculate_masa_samvatsara(local_dt, nm_lons[i], s_lon, lang=lang)
+
+        rashi_idx = get_rashi(m_lon)
+        lagna_idx, _ = get_lagna(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
+
+        results.append({
+            "input_datetime": local_dt.strftime('%Y-%m-%d %H:%M:%S'),
+            "timezone": loc["timezone"],
+            "address": loc["address"],
+            "sunrise": sunrise.strftime('%H:%M:%S') if sunrise else 'N/A',
+            "sunset": sunset.strftime('%H:%M:%S') if sunset else 'N/A',
+            "samvatsara": samvatsara,
+            "saka_year": calculate_saka_year(local_dt),
+            "masa": masa,
+            "paksha": paksha,
+            "tithi": tithi,
+            "vara": calculate_vara(local_dt, sunrise, lang=lang),
+            "nakshatra": f"{nakshatra} (Pada {nak_pada})",
+            "yoga": calculate_yoga(s_lon, m_lon, lang=lang),
+            "karana": calculate_karana(s_lon, m_lon),
+            "rashi": {"name": get_zodiac_name(rashi_idx, lang), "code": ZODIAC_SIGNS[rashi_idx]["code"]},
+            "lagna": {"name": get_zodiac_name(lagna_idx, lang), "code": ZODIAC_SIGNS[lagna_idx]["code"]}
+        })
+    return results
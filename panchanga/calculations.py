@@ -62,11 +62,36 @@ def calculate_masa_name(sun_lon_at_nm, lang='EN'):
     }
     return MASAS[lang][masa_mapping[rasi_index]]
 
-def calculate_masa_samvatsara(year, sun_lon_at_nm, sun_lon_now, lang='EN'):
+def samvatsara_index(local_date, masa_index):
+    """
+    Samvatsara (0 = Prabhava) of a local date in Masa masa_index. As in the lunation index, the
+    year changes at Chaitra: Pausha, Magha and Phalguna early in a calendar year close the previous one.
+    """
+    year = local_date.year - 1 if masa_index >= 9 and local_date.month <= 6 else local_date.year
+    return (year - 1987) % 60
+
+def calculate_masa_samvatsara(local_date, sun_lon_at_nm, sun_lon_now, lang='EN'):
+    """Masa from the Sun at the preceding New Moon, and the Samvatsara it falls in (changing at Chaitra)."""
     masa_name = calculate_masa_name(sun_lon_at_nm, lang)
-    samvat_index = (year - 1987) % 60
+    samvat_index = samvatsara_index(local_date, MASAS[lang].index(masa_name))
     return masa_name, SAMVATSARAS[lang][samvat_index]
 
+def lookup_masa_samvatsara(when_utc, lang='EN'):
+    """
+    Masa and Samvatsara at when_utc from the Sankranti/lunation index (v6.1), with no New Moon
+    search: (masa, samvatsara, masa_info) where masa_info is {'adhika', 'kshaya_masa'}.
+    The Samvatsara changes at Chaitra. None outside the index (use calculate_masa_samvatsara).
+    """
+    from utils.lunation_index import get_lunation
+    lunation = get_lunation(when_utc)
+    if lunation is None:
+        return None
+    masa_info = {
+        "adhika": lunation["adhika"],
+        "kshaya_masa": MASAS[lang][lunation["lost_masa"]] if lunation["kshaya"] else None,
+    }
+    return MASAS[lang][lunation["masa"]], SAMVATSARAS[lang][lunation["samvatsara"]], masa_info
+
 def calculate_saka_year(date_obj):
     """
     Calculates the Saka Varsha (Saka Era) year.
@@ -1,16 +1,56 @@
 from datetime import datetime, timedelta
+from itertools import islice
+from bisect import bisect_right
+import numpy as np
 import pytz
-from utils.astronomy import get_sidereal_longitude, get_sunrise_sunset, sun, moon, get_previous_new_moon
+from utils.astronomy import (
+    get_sidereal_longitude, get_sidereal_longitudes, get_sunrise_sunset, sun, moon,
+    get_sun_moon_longitudes, get_previous_new_moon, find_new_moons, get_ephemeris_years, TABLE
+)
 from panchanga.calculations import (
     calculate_tithi, calculate_masa_samvatsara, calculate_vara, 
-    calculate_nakshatra, calculate_yoga, calculate_karana, format_panchanga_report
+    calculate_nakshatra, calculate_yoga, calculate_karana, format_panchanga_report,
+    lookup_masa_samvatsara
 )
+from data.panchanga_data import MASAS, SAMVATSARAS
+from panchanga.batch import _lunation_rows
+from panchanga.udaya import INSTANT, UDAYA, check_mode, find_udaya_occurrences
+from utils.limb_index import get_limb_index
+from utils.lunation_index import get_lunation_index
+from utils.sidereal_tables import TableUnavailableError
+
+# find_recurrences_bulk: years per search window (the search stops once every event has its matches)
+BULK_WINDOW_YEARS = 5
 
-def find_recurrences(base_dt, loc_details, num_entries=20, lang='EN'):
+def _masa_samvatsara(utc_dt, local_date, sun_lon, lang):
+    """Masa and Samvatsara from the lunation index, or from the preceding New Moon outside it."""
+    lunar = lookup_masa_samvatsara(utc_dt, lang=lang)
+    if lunar:
+        return lunar[:2]
+    sun_lon_at_nm = get_sidereal_longitude(get_previous_new_moon(utc_dt), sun)
+    return calculate_masa_samvatsara(local_date, sun_lon_at_nm, sun_lon, lang=lang)
+
+def find_recurrences(base_dt, loc_details, num_entries=20, lang='EN', mode=INSTANT):
     """
     Finds the next num_entries occurrences of the same Masa, Paksha, and Tithi.
     Starts search from the current date.
     """
+    matches = iter_recurrences(base_dt, loc_details, lang=lang, max_years=num_entries * 2, mode=mode)
+    return list(islice(matches, num_entries))
+
+def iter_recurrences(base_dt, loc_details, lang='EN', max_years=20, from_year=None, mode=INSTANT):
+    """
+    Lazily yields future occurrences of the same Masa, Paksha, and Tithi, year by year.
+    Lets long horizons stream without holding every match.
+    Searches `from_year` (default: the current year) through `from_year + max_years`, stopping at
+    the last year of the ephemeris (get_ephemeris_years) so a stream always ends cleanly.
+    mode='instant' matches the limbs at the event's local time on each day; mode='udaya' matches
+    the day whose sunrise the Tithi prevails at (see iter_udaya_recurrences).
+    """
+    if check_mode(mode) == UDAYA:
+        yield from iter_udaya_recurrences(base_dt, loc_details, lang=lang, max_years=max_years, from_year=from_year)
+        return
+
     # 1. Get target attributes from the original date
     utc_dt = base_dt.astimezone(pytz.utc)
     sun_lon = get_sidereal_longitude(utc_dt, sun)
@@ -19,28 +59,28 @@ def find_recurrences(base_dt, loc_details, num_entries=20, lang='EN'):
     target_tithi, target_paksha = calculate_tithi(sun_lon, moon_lon, lang=lang)
     
     # Target Masa must be determined at the New Moon preceding the original event
-    prev_nm_utc = get_previous_new_moon(utc_dt)
-    sun_lon_at_nm = get_sidereal_longitude(prev_nm_utc, sun)
-    target_masa, _ = calculate_masa_samvatsara(base_dt.year, sun_lon_at_nm, sun_lon, lang=lang)
+    target_masa, _ = _masa_samvatsara(utc_dt, base_dt, sun_lon, lang)
     
     now = datetime.now(pytz.utc)
     current_year = now.year
+    tz = pytz.timezone(loc_details["timezone"])
     
     # Starting search from current year
-    print(f"Searching for: {target_masa}, {target_paksha}, {target_tithi} for next {num_entries} matches...")
+    print(f"Searching for: {target_masa}, {target_paksha}, {target_tithi}...")
+    
+    last_date = None
     
-    results = []
-    year_to_search = current_year
+    first_year = from_year if from_year is not None else current_year
+    last_year = min(first_year + max_years, get_ephemeris_years()[1])
     
-    # 2. Search year by year until we have num_entries
-    while len(results) < num_entries:
+    # 2. Search year by year
+    for year_to_search in range(first_year, last_year + 1):
         # Approximate date: same month/day
         try:
             approx_date = datetime(year_to_search, base_dt.month, base_dt.day, base_dt.hour, base_dt.minute)
         except ValueError:
             approx_date = datetime(year_to_search, base_dt.month, 28, base_dt.hour, base_dt.minute)
             
-        tz = pytz.timezone(loc_details["timezone"])
         # Window of search (+/- 30 days around approx date)
         start_search = approx_date - timedelta(days=32)
         
@@ -57,14 +97,13 @@ def find_recurrences(base_dt, loc_details, num_entries=20, lang='EN'):
             m_lon = get_sidereal_longitude(dt_utc, moon)
             
             tithi, paksha = calculate_tithi(s_lon, m_lon, lang=lang)
-            curr_nm_utc = get_previous_new_moon(dt_utc)
-            s_lon_at_nm = get_sidereal_longitude(curr_nm_utc, sun)
-            masa, samvatsara = calculate_masa_samvatsara(dt_local.year, s_lon_at_nm, s_lon, lang=lang)
+            masa, samvatsara = _masa_samvatsara(dt_utc, dt_local, s_lon, lang)
             
             if tithi == target_tithi and paksha == target_paksha and masa == target_masa:
                 # Basic protection against double-counting the same day
-                if results and results[-1]["datetime"].date() == dt_local.date():
+                if last_date == dt_local.date():
                     continue
+                last_date = dt_local.date()
 
                 sunrise, sunset = get_sunrise_sunset(dt_local, loc_details["latitude"], loc_details["longitude"], loc_details["timezone"])
                 vara = calculate_vara(dt_local, sunrise, lang=lang)
@@ -78,19 +117,225 @@ def find_recurrences(base_dt, loc_details, num_entries=20, lang='EN'):
                     vara, nakshatra, nak_pada, yoga, karana, lang=lang
                 )
                 
-                results.append({
+                yield {
                     "datetime": dt_local,
                     "report": report
-                })
-                
-                if len(results) >= num_entries:
+                }
+
+def iter_udaya_recurrences(base_dt, loc_details, lang='EN', max_years=20, from_year=None):
+    """
+    Udaya (sunrise) reckoning of iter_recurrences (v6.1): the target Masa/Paksha/Tithi is the one
+    at the original moment, and it recurs on the day it prevails at sunrise. A kshaya Tithi (never
+    at a sunrise) falls on the day it begins and ends in; an adhika one (two sunrises) on the first.
+    Matching Tithis come from the transition index, so each year costs the few sunrises inside
+    them rather than a longitude evaluation and New Moon search per day. Reports give the limbs
+    at that sunrise.
+    """
+    utc_dt = base_dt.astimezone(pytz.utc)
+    sun_lon = get_sidereal_longitude(utc_dt, sun)
+    moon_lon = get_sidereal_longitude(utc_dt, moon)
+    target_tithi, target_paksha = calculate_tithi(sun_lon, moon_lon, lang=lang)
+    tithi_idx = int(((moon_lon - sun_lon) % 360) / 12)
+
+    target_masa, _ = _masa_samvatsara(utc_dt, base_dt, sun_lon, lang)
+    masa_idx = MASAS[lang].index(target_masa)
+
+    now = datetime.now(pytz.utc)
+    tz = pytz.timezone(loc_details["timezone"])
+    index, lunations = get_limb_index(), get_lunation_index()
+    print(f"Searching (udaya) for: {target_masa}, {target_paksha}, {target_tithi}...")
+
+    last_date = None
+    first_year = from_year if from_year is not None else now.year
+    for year_to_search in range(first_year, first_year + max_years + 1):
+        try:
+            approx_date = datetime(year_to_search, base_dt.month, base_dt.day, tzinfo=pytz.utc)
+        except ValueError:
+            approx_date = datetime(year_to_search, base_dt.month, 28, tzinfo=pytz.utc)
+        window_start, window_end = approx_date - timedelta(days=32), approx_date + timedelta(days=33)
+        if not (index.covers(window_start - timedelta(days=32), window_end) and lunations.covers(window_start, window_end)):
+            print(f"Udaya search stops at {year_to_search}: outside the transition index")
+            return
+
+        for day, sunrise in find_udaya_occurrences(loc_details, window_start, window_end, tithi_idx, masa_idx):
+            dt_local = tz.localize(datetime(day.year, day.month, day.day, base_dt.hour, base_dt.minute))
+            if dt_local < now or day == last_date:
+                continue
+            last_date = day
+
+            _, sunset = get_sunrise_sunset(day, loc_details["latitude"], loc_details["longitude"], loc_details["timezone"])
+            (s_lon,), (m_lon,) = get_sun_moon_longitudes([sunrise.astimezone(pytz.utc)], TABLE)
+            tithi, paksha = calculate_tithi(s_lon, m_lon, lang=lang)
+            _, samvatsara = _masa_samvatsara(sunrise.astimezone(pytz.utc), day, s_lon, lang)
+            nakshatra, nak_pada = calculate_nakshatra(m_lon, lang=lang)
+            report = format_panchanga_report(
+                dt_local, loc_details["address"], loc_details["timezone"],
+                sunrise, sunset, samvatsara, target_masa, paksha, tithi,
+                calculate_vara(sunrise, sunrise, lang=lang), nakshatra, nak_pada,
+                calculate_yoga(s_lon, m_lon, lang=lang), calculate_karana(s_lon, m_lon), lang=lang
+            )
+            yield {"datetime": dt_local, "report": report}
+
+def _new_moon_sun_longitudes(utc_times, new_moons, nm_sun_lons):
+    """Sun longitude at the New Moon preceding each instant (bisect into a sorted New Moon list)."""
+    return [nm_sun_lons[bisect_right(new_moons, t) - 1] for t in utc_times]
+
+def recurrence_last_year(mode=INSTANT):
+    """
+    Last year a recurrence search can cover in `mode`: the ephemeris end for instant mode; for udaya,
+    the last year whose search window (up to ~33 days into the next year) lies inside both the
+    transition and lunation indexes (None if they are unavailable).
+    """
+    if check_mode(mode) != UDAYA:
+        return get_ephemeris_years()[1]
+    try:
+        end = min(get_limb_index().header["coverage"][1], get_lunation_index().header["coverage"][1])
+    except TableUnavailableError:
+        return None
+    return (datetime.fromtimestamp(end, pytz.utc) - timedelta(days=34)).year - 1
+
+def max_recurrence_count(mode=INSTANT, now=None):
+    """
+    Most yearly recurrences `mode` can still supply from now: one per full year left before
+    recurrence_last_year(mode). Larger counts cannot be met and are rejected up front.
+    """
+    now = now or datetime.now(pytz.utc)
+    last_year = recurrence_last_year(mode)
+    return last_year - now.year if last_year is not None else 0
+
+def _window_lunar_names(utc_dts, sun_lons, local_dates, window, lang, precision):
+    """
+    Masa and Samvatsara names at each instant: from the lunation index, or past it from the New
+    Moons of the search window (solved once per window and shared by every location).
+    """
+    lunations = _lunation_rows(utc_dts)
+    if lunations is not None:
+        return ([MASAS[lang][k] for k in lunations["masa"]],
+                [SAMVATSARAS[lang][k] for k in lunations["samvatsara"]])
+    if "new_moons" not in window:
+        # (the day grid may run a day past the window end)
+        window["new_moons"] = find_new_moons(window["start"] - timedelta(days=32), window["end"] + timedelta(days=2))
+        window["nm_sun_lons"] = get_sidereal_longitudes(window["new_moons"], sun, precision)
+    nm_lons = _new_moon_sun_longitudes(utc_dts, window["new_moons"], window["nm_sun_lons"])
+    names = [calculate_masa_samvatsara(day, nm_lons[j], sun_lons[j], lang=lang) for j, day in enumerate(local_dates)]
+    return [n[0] for n in names], [n[1] for n in names]
+
+def find_recurrences_bulk(events, num_entries=20, lang='EN', precision=None, window_years=BULK_WINDOW_YEARS):
+    """
+    Batched find_recurrences for many events (e.g. a family's birthdays) in one pass.
+    `events` is a list of (base_dt, loc_details); returns one occurrence list per event, in order.
+
+    Targets (Masa, Paksha, Tithi) for all events come from one vectorized evaluation. Events are
+    grouped by location: each location evaluates one grid of local midnights per search window,
+    and since the Tithi only advances during a day, a day can hold an event's Tithi only if it
+    lies between the Tithis at the day's two midnights. Only those candidate days (in the target
+    Masa) are evaluated at each event's local time, so cost grows with distinct locations rather
+    than with the number of events or birth times.
+    Windows of `window_years` are searched until every event has num_entries matches, never past
+    the ephemeris (see max_recurrence_count).
+    precision='fast' evaluates the longitudes analytically (see utils.astronomy.get_sun_moon_longitudes).
+    """
+    if not events:
+        return []
+
+    now = datetime.now(pytz.utc)
+    last_year = min(get_ephemeris_years()[1], now.year + num_entries * 2)
+    horizon_end = datetime(last_year + 1, 1, 1, tzinfo=pytz.utc)
+
+    # 1. Targets of all events
+    base_utcs = [base_dt.astimezone(pytz.utc) for base_dt, _ in events]
+    base_sun, base_moon = get_sun_moon_longitudes(base_utcs, precision)
+    base_lunations = _lunation_rows(base_utcs)
+    if base_lunations is None:
+        base_nms = find_new_moons(min(base_utcs) - timedelta(days=32), max(base_utcs))
+        base_nm_lons = _new_moon_sun_longitudes(base_utcs, base_nms, get_sidereal_longitudes(base_nms, sun, precision))
+
+    targets, target_tithis = [], []
+    for i, (base_dt, _) in enumerate(events):
+        tithi, paksha = calculate_tithi(base_sun[i], base_moon[i], lang=lang)
+        if base_lunations is not None:
+            masa = MASAS[lang][base_lunations["masa"][i]]
+        else:
+            masa, _ = calculate_masa_samvatsara(base_dt, base_nm_lons[i], base_sun[i], lang=lang)
+        targets.append((masa, paksha, tithi))
+        target_tithis.append(int(((base_moon[i] - base_sun[i]) % 360) / 12))
+
+    # 2. Group events by location only; birth times are matched against the shared day grid
+    groups = {}
+    for i, (_, loc) in enumerate(events):
+        groups.setdefault((loc["latitude"], loc["longitude"], loc["timezone"]), []).append(i)
+
+    results = [[] for _ in events]
+    sun_times = {}
+
+    window_start = now
+    while window_start < horizon_end:
+        window_end = min(datetime(window_start.year + window_years, 1, 1, tzinfo=pytz.utc), horizon_end)
+        window = {"start": window_start, "end": window_end}
+
+        for (lat, lon, tz_name), indices in groups.items():
+            pending = [i for i in indices if len(results[i]) < num_entries]
+            if not pending:
+                continue
+            tz = pytz.timezone(tz_name)
+            loc = events[indices[0]][1]
+
+            # 3. Local midnights bounding every day of the window, in one vectorized call
+            day = window_start.astimezone(tz).date()
+            days, midnights = [], []
+            while True:
+                midnight = tz.localize(datetime(day.year, day.month, day.day))
+                midnights.append(midnight.astimezone(pytz.utc))
+                if midnight >= window_end:
                     break
-        
-        year_to_search += 1
-        # Safety break to prevent infinite loops if something is wrong with calculations
-        if year_to_search > current_year + (num_entries * 2):
+                days.append(day)
+                day += timedelta(days=1)
+            grid_sun, grid_moon = get_sun_moon_longitudes(midnights, precision)
+            grid_tithis = (((grid_moon - grid_sun) % 360) // 12).astype(int)
+            grid_masas, _ = _window_lunar_names(midnights, grid_sun, midnights, window, lang, precision)
+            grid_masas = np.array(grid_masas)
+            day_spans = (grid_tithis[1:] - grid_tithis[:-1]) % 30
+
+            # 4. Candidate days per event: target Tithi between the day's midnights, target Masa at either
+            candidates = []
+            for i in pending:
+                masa, hour, minute = targets[i][0], events[i][0].hour, events[i][0].minute
+                holds = ((target_tithis[i] - grid_tithis[:-1]) % 30 <= day_spans) & \
+                        ((grid_masas[:-1] == masa) | (grid_masas[1:] == masa))
+                for j in np.flatnonzero(holds):
+                    d = days[j]
+                    dt_local = tz.localize(datetime(d.year, d.month, d.day, hour, minute))
+                    if window_start <= dt_local < window_end:
+                        candidates.append((i, dt_local))
+            if not candidates:
+                continue
+
+            # 5. Exact limbs at the candidates' local times, in one vectorized call
+            utc_dts = [dt_local.astimezone(pytz.utc) for _, dt_local in candidates]
+            s_lons, m_lons = get_sun_moon_longitudes(utc_dts, precision)
+            masas, samvatsaras = _window_lunar_names(utc_dts, s_lons, [dt for _, dt in candidates], window, lang, precision)
+
+            for j, (i, dt_local) in enumerate(candidates):
+                tithi, paksha = calculate_tithi(s_lons[j], m_lons[j], lang=lang)
+                if (masas[j], paksha, tithi) != targets[i] or len(results[i]) >= num_entries:
+                    continue
+                sun_key = (lat, lon, dt_local.date())
+                if sun_key not in sun_times:
+                    sun_times[sun_key] = get_sunrise_sunset(dt_local, lat, lon, tz_name)
+                sunrise, sunset = sun_times[sun_key]
+
+                masa, paksha, tithi = targets[i]
+                nakshatra, nak_pada = calculate_nakshatra(m_lons[j], lang=lang)
+                report = format_panchanga_report(
+                    dt_local, loc["address"], tz_name,
+                    sunrise, sunset, samvatsaras[j], masa, paksha, tithi,
+                    calculate_vara(dt_local, sunrise, lang=lang), nakshatra, nak_pada,
+                    calculate_yoga(s_lons[j], m_lons[j], lang=lang), calculate_karana(s_lons[j], m_lons[j]), lang=lang
+                )
+                results[i].append({"datetime": dt_local, "report": report})
+
+        if all(len(r) >= num_entries for r in results):
             break
-            
-    return results
-                
+        window_start = window_end
+
     return results
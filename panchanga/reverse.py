@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+import pytz
+from data.panchanga_data import MASAS, PAKSHAS, TITHIS, SAMVATSARAS
+from utils.astronomy import find_tithi_transitions, get_sidereal_longitudes, get_ephemeris_years, sun
+from utils.lunation_index import get_lunation_index
+from utils.sidereal_tables import TableUnavailableError
+from panchanga.calculations import calculate_masa_name, samvatsara_index
+
+# Reverse Panchanga lookup (v6.1)
+# Finds the Gregorian dates of a Masa / Paksha / Tithi (/ Samvatsara) from the lunation structure:
+# one find_discrete pass yields every tithi boundary in the window, the boundaries into
+# tithi 0 are the New Moons, and the Masa of each lunation is the Sun's rashi at that New Moon
+# (as in calculate_masa_name; read from the lunation index, with the Samvatsara changing at
+# Chaitra, where it covers the window). No day-by-day scan.
+
+def _indices_for(value, table):
+    """Indices of `value` in a multi-language table, by name (any language) or 1-based number."""
+    if value is None or value == "":
+        return None
+    text = str(value).strip()
+    if text.isdigit():
+        number = int(text)
+        if not 1 <= number <= len(table["EN"]):
+            raise ValueError(f"Out of range: {value}")
+        return {number - 1}
+    matches = {i for names in table.values() for i, name in enumerate(names) if name.lower() == text.lower()}
+    if not matches:
+        raise ValueError(f"Unknown name: {value}")
+    return matches
+
+def _tithi_indices(value):
+    """Tithi 1-15 names/numbers match in both pakshas (the paksha filter disambiguates); 16-30 are Krishna."""
+    indices = _indices_for(value, TITHIS)
+    if indices is None:
+        return None
+    if str(value).strip().isdigit() and int(str(value).strip()) <= 15:
+        indices = indices | {i + 15 for i in indices if i < 14}
+    return indices
+
+def _year_runs(years):
+    """Groups sorted years into contiguous (first, last) runs."""
+    runs = []
+    for year in years:
+        if runs and runs[-1][1] == year - 1:
+            runs[-1][1] = year
+        else:
+            runs.append([year, year])
+    return runs
+
+def find_panchanga_dates(loc_details, start_year, end_year, masa=None, paksha=None, tithi=None,
+                         samvatsara=None, lang='EN', limit=500):
+    """
+    Returns every tithi interval in [start_year, end_year] (local calendar years, clipped to the
+    ephemeris) matching the criteria.
+    Each match: {'date', 'start', 'end', 'samvatsara', 'masa', 'paksha', 'tithi'} with local ISO times;
+    'date' is the local date on which the tithi begins.
+    """
+    masa_idx = _indices_for(masa, MASAS)
+    paksha_idx = _indices_for(paksha, PAKSHAS)
+    tithi_idx = _tithi_indices(tithi)
+    samvat_idx = _indices_for(samvatsara, SAMVATSARAS)
+    if not any([masa_idx, paksha_idx, tithi_idx, samvat_idx]):
+        raise ValueError("Provide at least one of masa, paksha, tithi or samvatsara")
+
+    tz = pytz.timezone(loc_details["timezone"])
+    first_year, last_year = get_ephemeris_years()
+    start_year, end_year = max(start_year, first_year), min(end_year, last_year)
+
+    # A Samvatsara runs from Chaitra to Chaitra (utils.lunation_index), touching two calendar years,
+    # so only years it may fall in are searched
+    years = [y for y in range(start_year, end_year + 1)
+             if samvat_idx is None or {(y - 1987) % 60, (y - 1988) % 60} & samvat_idx]
+    try:
+        lunation_index = get_lunation_index()
+    except TableUnavailableError as e:
+        print(f"⚠️ Lunation index unavailable: {e}")
+        lunation_index = None
+
+    matches = []
+    for first, last in _year_runs(years):
+        window_start = tz.localize(datetime(first, 1, 1)).astimezone(pytz.utc)
+        window_end = tz.localize(datetime(last + 1, 1, 1)).astimezone(pytz.utc)
+
+        # 1. One pass over the run (plus one lunation before it, to name the first Masa)
+        _, times, indices = find_tithi_transitions(window_start - timedelta(days=32), window_end + timedelta(days=2))
+
+        # 2. Masa and Samvatsara per lunation: from the lunation index, or outside it from the Sun
+        # at each New Moon (one vectorized longitude call), the Samvatsara changing at Chaitra
+        new_moons = [t for t, idx in zip(times, indices) if idx == 0]
+        if new_moons and lunation_index is not None and lunation_index.covers(new_moons[0], new_moons[-1]):
+            # (a second in, so microsecond rounding of the New Moon cannot land in the previous lunation)
+            lunations = [lunation_index.lunation(t + timedelta(seconds=1)) for t in new_moons]
+            lunar_at_nm = {t: (l["masa"], l["samvatsara"]) for t, l in zip(new_moons, lunations)}
+        else:
+            nm_sun_lons = get_sidereal_longitudes(new_moons, sun) if new_moons else []
+            lunar_at_nm = {t: (MASAS["EN"].index(calculate_masa_name(lon, 'EN')), None)
+                           for t, lon in zip(new_moons, nm_sun_lons)}
+
+        # 3. Walk the tithi intervals
+        current_masa = None
+        for k in range(len(times) - 1):
+            start, end, idx = times[k], times[k + 1], int(indices[k])
+            if idx == 0:
+                current_masa, current_samvat = lunar_at_nm[start]
+            if current_masa is None or start < window_start or start >= window_end:
+                continue
+
+            local_start = start.astimezone(tz).replace(microsecond=0)
+            samvat = current_samvat if current_samvat is not None else samvatsara_index(local_start, current_masa)
+            if masa_idx is not None and current_masa not in masa_idx:
+                continue
+            if paksha_idx is not None and (0 if idx < 15 else 1) not in paksha_idx:
+                continue
+            if tithi_idx is not None and idx not in tithi_idx:
+                continue
+            if samvat_idx is not None and samvat not in samvat_idx:
+                continue
+
+            matches.append({
+                "date": local_start.strftime("%Y-%m-%d"),
+                "start": local_start.isoformat(),
+                "end": end.astimezone(tz).replace(microsecond=0).isoformat(),
+                "samvatsara": SAMVATSARAS[lang][samvat],
+                "masa": MASAS[lang][current_masa],
+                "paksha": PAKSHAS[lang][0 if idx < 15 else 1],
+                "tithi": TITHIS[lang][idx]
+            })
+            if len(matches) >= limit:
+                return matches
+
+    return matches
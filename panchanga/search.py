@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+from data.panchanga_data import MASAS, PAKSHAS, TITHIS, NAKSHATRAS, YOGAS, VARAS
+from utils.limb_index import get_limb_index
+from utils.lunation_index import get_lunation_index
+from panchanga.reverse import _indices_for, _tithi_indices
+
+# Range search (v6.1)
+# Finds every stretch of time in a local date range where combined Panchanga criteria hold.
+# Each criterion becomes a sorted list of disjoint [start, end) intervals read off the global
+# limb-transition index (utils.limb_index) - tithi, paksha, karana, nakshatra, yoga directly,
+# masa per lunation (utils.lunation_index), vara per civil day - and the lists are intersected.
+# No per-day calculate_data calls and no ephemeris searches at request time.
+
+KARANAS = {"EN": [str(i) for i in range(1, 61)]}  # calculate_karana reports karanas by number
+WEEKDAYS = {"WEEKDAY": ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]}
+CRITERIA = ("masa", "paksha", "tithi", "nakshatra", "yoga", "karana", "vara")
+
+def _intersect(a, b):
+    """Intersection of two sorted lists of disjoint (start, end) intervals."""
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if start < end:
+            out.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+def _select(starts, ends, values, wanted):
+    """
+    Intervals whose value is in `wanted`. Adjacent intervals merge only when their value is the
+    same (e.g. consecutive tithis of one paksha), so every match carries one value per criterion.
+    """
+    out = []
+    last_value = None
+    for start, end, value in zip(starts.tolist(), ends.tolist(), values.tolist()):
+        if value in wanted:
+            if out and out[-1][1] == start and value == last_value:
+                out[-1] = (out[-1][0], end)
+            else:
+                out.append((start, end))
+            last_value = value
+    return out
+
+def _day_bounds(tz, start_date, end_date):
+    """Local midnights from start_date through the day after end_date, as UTC timestamps."""
+    days = (end_date - start_date).days + 2
+    return [tz.localize(datetime.combine(start_date + timedelta(days=k), datetime.min.time())).timestamp()
+            for k in range(days)]
+
+def _masa_periods(window_start, window_end):
+    """(starts, ends, masa indices) per lunation, from the Sankranti/lunation index."""
+    return get_lunation_index().periods(window_start, window_end)
+
+def parse_criteria(criteria):
+    """Criterion name -> set of 0-based indices (names in any language or 1-based numbers)."""
+    parsers = {
+        "masa": lambda v: _indices_for(v, MASAS),
+        "paksha": lambda v: _indices_for(v, PAKSHAS),
+        "tithi": _tithi_indices,
+        "nakshatra": lambda v: _indices_for(v, NAKSHATRAS),
+        "yoga": lambda v: _indices_for(v, YOGAS),
+        "karana": lambda v: _indices_for(v, KARANAS),
+        "vara": lambda v: _indices_for(v, {**VARAS, **WEEKDAYS}),
+    }
+    parsed = {}
+    for name, value in criteria.items():
+        if name not in parsers:
+            raise ValueError(f"Unknown criterion: {name}")
+        values = value if isinstance(value, list) else [value]
+        indices = set()
+        for item in values:
+            found = parsers[name](item)
+            if found:
+                indices |= found
+        if indices:
+            parsed[name] = indices
+    if not parsed:
+        raise ValueError(f"Provide at least one of {', '.join(CRITERIA)}")
+    return parsed
+
+def search_panchanga(loc_details, start_date, end_date, criteria, lang='EN', limit=500):
+    """
+    Every interval in the local dates [start_date, end_date] where all criteria hold at once.
+    `criteria` maps masa/paksha/tithi/nakshatra/yoga/karana/vara to a value or list of values
+    (any of which may match). Vara is the civil weekday (local midnight to midnight).
+    Returns a list of {'date', 'start', 'end', <criterion>: name, ...} with local ISO times;
+    an interval spanning midnight is split so each match belongs to one local date.
+    """
+    wanted = parse_criteria(criteria)
+    tz = pytz.timezone(loc_details["timezone"])
+    index = get_limb_index()
+
+    days = _day_bounds(tz, start_date, end_date)
+    window_start = datetime.fromtimestamp(days[0], pytz.utc)
+    window_end = datetime.fromtimestamp(days[-1], pytz.utc)
+    if not index.covers(window_start - timedelta(days=32), window_end):
+        raise ValueError("Date range is outside the precomputed transition index")
+
+    # 1. One interval list per criterion
+    periods = {}
+    for limb in ("tithi", "karana", "nakshatra", "yoga"):
+        if limb in wanted or (limb == "tithi" and "paksha" in wanted):
+            periods[limb] = index.periods(window_start, window_end, limb)
+    if "masa" in wanted:
+        periods["masa"] = _masa_periods(window_start, window_end)
+    day_starts, day_ends = np.array(days[:-1]), np.array(days[1:])
+    dates = [start_date + timedelta(days=k) for k in range(len(day_starts))]
+    # VARAS index 0 is Ravivara (Sunday); date.weekday() is 0 for Monday
+    periods["vara"] = (day_starts, day_ends, np.array([(d.weekday() + 1) % 7 for d in dates]))
+
+    interval_lists = []
+    for name, indices in wanted.items():
+        if name == "paksha":
+            starts, ends, values = periods["tithi"]
+            interval_lists.append(_select(starts, ends, values // 15, indices))
+        else:
+            interval_lists.append(_select(*periods[name], indices))
+
+    # 2. Intersect, shortest list first, then split at local midnights
+    interval_lists.sort(key=len)
+    matches = interval_lists[0]
+    for intervals in interval_lists[1:]:
+        matches = _intersect(matches, intervals)
+    matches = _intersect(matches, list(zip(days[:-1], days[1:])))
+
+    # 3. Describe each match by the values prevailing in it
+    lookups = {name: (starts, values) for name, (starts, _, values) in periods.items()}
+    tables = {"masa": MASAS, "tithi": TITHIS, "nakshatra": NAKSHATRAS, "yoga": YOGAS, "vara": VARAS}
+    results = []
+    for start, end in matches[:limit]:
+        local_start = datetime.fromtimestamp(start, tz)
+        match = {
+            "date": local_start.strftime("%Y-%m-%d"),
+            "start": local_start.replace(microsecond=0).isoformat(),
+            "end": datetime.fromtimestamp(end, tz).replace(microsecond=0).isoformat(),
+        }
+        for name in CRITERIA:
+            source = "tithi" if name == "paksha" else name
+            if name not in wanted or source not in lookups:
+                continue
+            starts, values = lookups[source]
+            value = int(values[np.searchsorted(starts, start, side="right") - 1])
+            if name == "paksha":
+                match[name] = PAKSHAS[lang][value // 15]
+            elif name == "karana":
+                match[name] = value + 1
+            else:
+                match[name] = tables[name][lang][value]
+        results.append(match)
+    return results
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+from data.panchanga_data import VARAS, CHOGHADIYAS, MUHURTAS
+from utils.sun_tables import get_sun_days
+from utils.astronomy import get_ephemeris_years
+
+# Daily time segments (v6.1)
+# The traditional divisions of a day are equal partitions of the daytime (sunrise to sunset) and
+# of the night (sunset to the next sunrise): eighths for Rahu Kalam, Yamaganda and Gulika (which
+# eighth depends on the weekday), eighths again for the Choghadiyas, fifteenths for the Muhurtas.
+# All sunrises and sunsets of the range come from the cached sunrise tables (get_sun_days) and
+# every boundary of every day from one broadcast, so a month costs no ephemeris search.
+
+# 0-based eighth of the daytime (night for GULIKA_NIGHT_PARTS), indexed Sunday..Saturday as VARAS
+RAHU_KALAM_PARTS = (7, 1, 6, 4, 5, 3, 2)
+YAMAGANDA_PARTS = (4, 3, 2, 1, 0, 6, 5)
+GULIKA_PARTS = (6, 5, 4, 3, 2, 1, 0)
+GULIKA_NIGHT_PARTS = (2, 1, 0, 6, 5, 4, 3)
+# CHOGHADIYAS index of the first Choghadiya, Sunday..Saturday; day ones then follow the cycle
+# order, night ones step back two places (Shubha, Amrita, Chara, Roga, ... on Sunday night)
+CHOGHADIYA_DAY_START = (0, 3, 6, 2, 5, 1, 4)
+CHOGHADIYA_NIGHT_START = (5, 1, 4, 0, 3, 6, 2)
+ABHIJIT_MUHURTA = 7       # 8th of the day
+BRAHMA_MUHURTA = 28       # 14th of the night, the last but one before sunrise
+
+def _divide(starts, ends, parts):
+    """Boundaries of `parts` equal divisions of every [start, end) row: shape (days, parts + 1)."""
+    return starts[:, None] + (ends - starts)[:, None] * (np.arange(parts + 1) / parts)
+
+def calculate_time_segments(loc_details, start_date, end_date, lang='EN'):
+    """
+    Day and night segments for every local date in [start_date, end_date].
+    Returns one dict per date: 'vara', 'sunrise', 'sunset', 'next_sunrise', the 'rahu_kalam',
+    'yamaganda', 'gulika', 'gulika_night', 'abhijit' and 'brahma_muhurta' spans, and
+    'choghadiya' / 'muhurta' lists for 'day' and 'night' ({'name', 'start', 'end'}), with local
+    '%Y-%m-%d %H:%M:%S' times. Spans are None when the Sun does not rise or set (polar day/night).
+    Raises ValueError for an unknown lang or dates whose sunrise tables fall outside the ephemeris.
+    """
+    if lang not in VARAS:
+        raise ValueError(f"Unknown lang: {lang}; use {', '.join(VARAS)}")
+    # The night of end_date runs to the next sunrise, whose year table must also be covered
+    first_year, last_year = get_ephemeris_years()
+    if start_date.year < first_year or (end_date + timedelta(days=1)).year > last_year:
+        raise ValueError(f"Dates must fall between {first_year}-01-01 and {last_year}-12-30")
+    tz = pytz.timezone(loc_details["timezone"])
+    dates, sunrises, sunsets, _ = get_sun_days(start_date, end_date + timedelta(days=1),
+                                               loc_details["latitude"], loc_details["longitude"], loc_details["timezone"])
+    count = len(dates) - 1
+    rises, sets, next_rises = sunrises[:count], sunsets[:count], sunrises[1:]
+    # Both bounds must exist and be in order (NaN compares False)
+    day_ok = rises < sets
+    night_ok = sets < next_rises
+
+    day_eighths = _divide(rises, sets, 8)
+    night_eighths = _divide(sets, next_rises, 8)
+    day_muhurtas = _divide(rises, sets, 15)
+    night_muhurtas = _divide(sets, next_rises, 15)
+
+    def stamp(t):
+        return datetime.fromtimestamp(float(t), tz).strftime('%Y-%m-%d %H:%M:%S') if np.isfinite(t) else None
+
+    def span(bounds, k):
+        return {"start": stamp(bounds[k]), "end": stamp(bounds[k + 1])}
+
+    def named(bounds, names):
+        return [{"name": name, **span(bounds, k)} for k, name in enumerate(names)]
+
+    results = []
+    for i, day in enumerate(dates[:count]):
+        weekday = (day.weekday() + 1) % 7  # VARAS index 0 is Ravivara (Sunday)
+        day_start, night_start = CHOGHADIYA_DAY_START[weekday], CHOGHADIYA_NIGHT_START[weekday]
+        segments = {
+            "date": day.strftime('%Y-%m-%d'),
+            "vara": VARAS[lang][weekday],
+            "sunrise": stamp(rises[i]),
+            "sunset": stamp(sets[i]),
+            "next_sunrise": stamp(next_rises[i]),
+            "rahu_kalam": None, "yamaganda": None, "gulika": None, "abhijit": None,
+            "gulika_night": None, "brahma_muhurta": None,
+            "choghadiya": {"day": None, "night": None},
+            "muhurta": {"day": None, "night": None},
+        }
+        if day_ok[i]:
+            segments.update({
+                "rahu_kalam": span(day_eighths[i], RAHU_KALAM_PARTS[weekday]),
+                "yamaganda": span(day_eighths[i], YAMAGANDA_PARTS[weekday]),
+                "gulika": span(day_eighths[i], GULIKA_PARTS[weekday]),
+                "abhijit": span(day_muhurtas[i], ABHIJIT_MUHURTA),
+            })
+            segments["choghadiya"]["day"] = named(day_eighths[i], [CHOGHADIYAS[lang][(day_start + k) % 7] for k in range(8)])
+            segments["muhurta"]["day"] = named(day_muhurtas[i], MUHURTAS[lang][:15])
+        if night_ok[i]:
+            segments.update({
+                "gulika_night": span(night_eighths[i], GULIKA_NIGHT_PARTS[weekday]),
+                "brahma_muhurta": span(night_muhurtas[i], BRAHMA_MUHURTA - 15),
+            })
+            segments["choghadiya"]["night"] = named(night_eighths[i], [CHOGHADIYAS[lang][(night_start - 2 * k) % 7] for k in range(8)])
+            segments["muhurta"]["night"] = named(night_muhurtas[i], MUHURTAS[lang][15:])
+        results.append(segments)
+    return results
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import pytz
+from utils.astronomy import get_sunrise_sunset
+from utils.limb_index import get_limb_index
+from utils.sidereal_tables import TableUnavailableError
+from panchanga.search import _intersect, _select, _masa_periods
+
+# Udaya (sunrise) reckoning (v6.1)
+# Civil Panchangas name a day by the limbs prevailing at its sunrise, and a Panchanga day runs
+# from one sunrise to the next. Sunrises come from the cached sunrise tables (utils.sun_tables)
+# and tithi boundaries from the global transition index (utils.limb_index), so a kshaya tithi
+# (one that begins and ends between two sunrises) or an adhika tithi (one prevailing at two
+# sunrises) is found by comparing indices, and a recurrence needs only the sunrises inside the
+# matching tithi - no per-day longitude evaluation or root finding.
+
+INSTANT = "instant"
+UDAYA = "udaya"
+MODES = (INSTANT, UDAYA)
+
+def check_mode(mode):
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+    return mode
+
+def udaya_day(local_dt, loc_details):
+    """
+    The Panchanga day containing local_dt: {'date', 'sunrise', 'next_sunrise', 'kshaya_tithis',
+    'adhika_tithi'}. Before sunrise, local_dt belongs to the previous date's Panchanga day.
+    'kshaya_tithis' are the tithi indices lost within the day and 'adhika_tithi' is True when the
+    day's tithi already prevailed at the previous sunrise (both None outside the transition index).
+    """
+    lat, lon, tz_name = loc_details["latitude"], loc_details["longitude"], loc_details["timezone"]
+    day = local_dt.date()
+    sunrise, _ = get_sunrise_sunset(day, lat, lon, tz_name)
+    if local_dt < sunrise:
+        day -= timedelta(days=1)
+        sunrise, _ = get_sunrise_sunset(day, lat, lon, tz_name)
+    prev_sunrise, _ = get_sunrise_sunset(day - timedelta(days=1), lat, lon, tz_name)
+    next_sunrise, _ = get_sunrise_sunset(day + timedelta(days=1), lat, lon, tz_name)
+
+    result = {"date": day, "sunrise": sunrise, "next_sunrise": next_sunrise,
+              "kshaya_tithis": None, "adhika_tithi": None}
+    try:
+        index = get_limb_index()
+    except TableUnavailableError as e:
+        print(f"⚠️ Limb index unavailable: {e}")
+        return result
+    utc_sunrises = [s.astimezone(pytz.utc) for s in (prev_sunrise, sunrise, next_sunrise)]
+    if index.covers(utc_sunrises[0], utc_sunrises[-1]):
+        prev_tithi, tithi, next_tithi = (index.active(s, "tithi")["index"] for s in utc_sunrises)
+        result["kshaya_tithis"] = [(tithi + k) % 30 for k in range(1, (next_tithi - tithi) % 30)]
+        result["adhika_tithi"] = prev_tithi == tithi
+    return result
+
+def sunrise_date_in(start, end, loc_details):
+    """
+    The local date whose sunrise falls in [start, end) (UTC timestamps), the first one if two do
+    (adhika tithi); for a kshaya tithi (no sunrise inside), the date whose Panchanga day contains it.
+    Returns (date, sunrise).
+    """
+    lat, lon, tz_name = loc_details["latitude"], loc_details["longitude"], loc_details["timezone"]
+    tz = pytz.timezone(tz_name)
+    day = datetime.fromtimestamp(start, tz).date() - timedelta(days=1)
+    candidate = None
+    while True:
+        sunrise, _ = get_sunrise_sunset(day, lat, lon, tz_name)
+        stamp = sunrise.timestamp()
+        if stamp >= end:
+            return candidate
+        if stamp >= start:
+            return day, sunrise
+        candidate = (day, sunrise)
+        day += timedelta(days=1)
+
+def find_udaya_occurrences(loc_details, window_start, window_end, tithi_idx, masa_idx):
+    """
+    (date, sunrise) of every Panchanga day in the UTC window whose udaya tithi is tithi_idx in masa
+    masa_idx, a kshaya tithi being observed on the day it falls in. Uses only the transition index
+    and the sunrises inside matching tithis.
+    """
+    index = get_limb_index()
+    tithis = _select(*index.periods(window_start, window_end, "tithi"), {tithi_idx})
+    masas = _select(*_masa_periods(window_start, window_end), {masa_idx})
+    return [sunrise_date_in(start, end, loc_details) for start, end in _intersect(tithis, masas)]
@@ -1,22 +1,213 @@
 import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
 from datetime import datetime
 import pytz
 from utils.location import get_location_details
-from utils.astronomy import get_sidereal_longitude, get_sunrise_sunset, sun, moon
+from utils.astronomy import get_sidereal_longitude, get_sunrise_sunset, get_previous_new_moon, sun, moon, PRECISE, FAST, TABLE
 from panchanga.calculations import (
-    calculate_vara, calculate_tithi, calculate_nakshatra, 
+    calculate_vara, calculate_tithi, calculate_nakshatra,
     calculate_yoga, calculate_karana, calculate_masa_samvatsara,
-    calculate_saka_year
+    calculate_saka_year, lookup_masa_samvatsara
 )
+from panchanga.batch import calculate_batch
+
+# Bulk mode (v6.1): CSV/JSONL in, CSV/JSONL/Parquet out, ordered, over a pool of warmed-up workers.
+# The parent geocodes each distinct location once (workers never hit Nominatim) and ships
+# resolved location details with every chunk; workers run the vectorized panchanga.batch path.
+
+OUTPUT_FIELDS = [
+    "id", "date", "time", "location", "address", "timezone", "samvatsara", "saka_year", "masa", "paksha",
+    "tithi", "vara", "nakshatra", "yoga", "karana", "rashi", "lagna", "sunrise", "sunset", "error"
+]
+
+def _init_worker():
+    """Loads the ephemeris/timescale once per worker so the first chunk pays no warm-up."""
+    get_sidereal_longitude(datetime(2000, 1, 1, tzinfo=pytz.utc), sun)
+
+def _convert_chunk(task):
+    """
+    Worker: converts one chunk of (row, location details or error) pairs.
+    Returns output records in input order.
+    """
+    rows, lang, precision = task
+    records = []
+    moments = []
+    positions = []
+
+    for row, loc in rows:
+        record = {field: row.get(field, "") for field in ("id", "date", "time", "location")}
+        records.append(record)
+        try:
+            if isinstance(loc, str):
+                raise ValueError(loc)
+            naive_dt = datetime.strptime(f"{row['date']} {row['time']}", "%Y-%m-%d %H:%M")
+            local_dt = pytz.timezone(loc["timezone"]).localize(naive_dt)
+            moments.append({"loc": loc, "local_dt": local_dt, "utc_dt": local_dt.astimezone(pytz.utc)})
+            positions.append(len(records) - 1)
+        except Exception as e:
+            record["error"] = str(e)
+
+    try:
+        results = calculate_batch(moments, lang=lang, precision=precision)
+    except Exception:
+        # One bad row (e.g. no sunrise at polar latitudes) must not sink the chunk
+        results = []
+        for moment in moments:
+            try:
+                results.append(calculate_batch([moment], lang=lang, precision=precision)[0])
+            except Exception as e:
+                results.append(e)
+
+    for pos, result in zip(positions, results):
+        record = records[pos]
+        if isinstance(result, Exception):
+            record["error"] = str(result)
+            continue
+        for field in OUTPUT_FIELDS:
+            if field in result:
+                record[field] = result[field]
+        record["rashi"] = result["rashi"]["code"]
+        record["lagna"] = result["lagna"]["code"]
+    return records
+
+def _read_rows(path):
+    """Yields input rows (dicts with date, time, location and optional id) from CSV or JSONL."""
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+class _Writer:
+    """Streams records to CSV, JSONL or Parquet (by file extension; '-' writes JSONL to stdout)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = "parquet" if path.endswith(".parquet") else ("csv" if path.endswith(".csv") else "jsonl")
+        if self.format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+            self._pa, self._pq = pyarrow, pyarrow.parquet
+            self._schema = pyarrow.schema([(field, pyarrow.string()) for field in OUTPUT_FIELDS])
+            self._parquet = self._pq.ParquetWriter(path, self._schema)
+        else:
+            self._stream = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+            if self.format == "csv":
+                self._csv = csv.DictWriter(self._stream, fieldnames=OUTPUT_FIELDS)
+                self._csv.writeheader()
+
+    def write(self, records):
+        if self.format == "parquet":
+            columns = {field: [None if r.get(field) in (None, "") else str(r[field]) for r in records] for field in OUTPUT_FIELDS}
+            self._parquet.write_table(self._pa.table(columns, schema=self._schema))
+        elif self.format == "csv":
+            self._csv.writerows({field: r.get(field, "") for field in OUTPUT_FIELDS} for r in records)
+        else:
+            for r in records:
+                self._stream.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self.format == "parquet":
+            self._parquet.close()
+        elif self._stream is not sys.stdout:
+            self._stream.close()
+
+def run_bulk(input_path, output_path, workers=None, chunk_size=500, lang='EN', precision=None):
+    """
+    Converts every row of input_path and streams ordered results to output_path.
+    Progress (rows, rows/s) is reported on stderr.
+    """
+    workers = workers or os.cpu_count() or 1
+    locations = {}
+
+    def resolve(name):
+        if name not in locations:
+            try:
+                locations[name] = get_location_details(name)
+            except Exception as e:
+                locations[name] = f"Location error: {e}"
+        return locations[name]
+
+    def tasks():
+        chunk = []
+        for row in _read_rows(input_path):
+            chunk.append((row, resolve(row.get("location") or "")))
+            if len(chunk) >= chunk_size:
+                yield chunk, lang, precision
+                chunk = []
+        if chunk:
+            yield chunk, lang, precision
+
+    writer = _Writer(output_path)
+    start = time.monotonic()
+    done = errors = 0
+
+    def emit(records):
+        nonlocal done, errors
+        writer.write(records)
+        done += len(records)
+        errors += sum(1 for r in records if r.get("error"))
+        elapsed = time.monotonic() - start
+        print(f"\r{done} rows | {errors} errors | {done / elapsed:.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            # Bounded read-ahead keeps memory flat on huge inputs; popping in submission order keeps output ordered
+            pending = deque()
+            for task in tasks():
+                pending.append(pool.apply_async(_convert_chunk, (task,)))
+                if len(pending) >= workers * 4:
+                    emit(pending.popleft().get())
+            while pending:
+                emit(pending.popleft().get())
+    finally:
+        writer.close()
+
+    elapsed = time.monotonic() - start
+    print(f"\nConverted {done} rows in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.0f} rows/s, "
+          f"{len(locations)} distinct locations, {workers} workers)", file=sys.stderr)
 
 def main():
     parser = argparse.ArgumentParser(description="Gregorian to Hindu Panchanga Converter")
-    parser.add_argument("--date", type=str, help="Date in YYYY-MM-DD format", required=True)
-    parser.add_argument("--time", type=str, help="Time in HH:MM (24-hour) format", required=True)
-    parser.add_argument("--location", type=str, help="Location (City, State, Country)", required=True)
+    parser.add_argument("--date", type=str, help="Date in YYYY-MM-DD format")
+    parser.add_argument("--time", type=str, help="Time in HH:MM (24-hour) format")
+    parser.add_argument("--location", type=str, help="Location (City, State, Country)")
+    parser.add_argument("--input", type=str, help="Bulk mode: CSV/JSONL file with date, time, location (and optional id) columns, or - for stdin JSONL")
+    parser.add_argument("--output", type=str, default="-", help="Bulk mode: .csv, .jsonl or .parquet output (default: JSONL on stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="Bulk mode: worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Bulk mode: rows per worker task")
+    parser.add_argument("--precision", choices=[PRECISE, FAST, TABLE], default=None, help="Bulk mode: DE421 ephemeris, the faster analytic series or the Chebyshev tables (default: ASTRONOMY_PRECISION or precise)")
+    parser.add_argument("--lang", type=str, default="EN", help="Output language (EN, KN, SA)")
 
     args = parser.parse_args()
 
+    if args.input:
+        try:
+            run_bulk(args.input, args.output, workers=args.workers, chunk_size=args.chunk_size, lang=args.lang,
+                     precision=args.precision)
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"\nError: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if not all([args.date, args.time, args.location]):
+        parser.error("--date, --time and --location are required (or use --input for bulk mode)")
+
     try:
         # 1. Resolve Location
         print(f"Resolving location: {args.location}...")
@@ -35,16 +226,22 @@ def main():
         print("\nCalculating astronomical positions...")
         sun_lon = get_sidereal_longitude(utc_dt, sun)
         moon_lon = get_sidereal_longitude(utc_dt, moon)
-        
+
         sunrise, sunset = get_sunrise_sunset(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
-        
+
         # 4. Calculate Panchanga Elements
-        vara = calculate_vara(local_dt, sunrise)
-        tithi, paksha = calculate_tithi(sun_lon, moon_lon)
-        nakshatra = calculate_nakshatra(moon_lon)
-        yoga = calculate_yoga(sun_lon, moon_lon)
+        vara = calculate_vara(local_dt, sunrise, lang=args.lang)
+        tithi, paksha = calculate_tithi(sun_lon, moon_lon, lang=args.lang)
+        nakshatra, nak_pada = calculate_nakshatra(moon_lon, lang=args.lang)
+        yoga = calculate_yoga(sun_lon, moon_lon, lang=args.lang)
         karana_num = calculate_karana(sun_lon, moon_lon)
-        masa, samvatsara = calculate_masa_samvatsara(local_dt.year, sun_lon)
+        # Masa from the lunation index; New Moon search outside it
+        lunar = lookup_masa_samvatsara(utc_dt, lang=args.lang)
+        if lunar:
+            masa, samvatsara, _ = lunar
+        else:
+            sun_lon_at_nm = get_sidereal_longitude(get_previous_new_moon(utc_dt), sun)
+            masa, samvatsara = calculate_masa_samvatsara(local_dt, sun_lon_at_nm, sun_lon, lang=args.lang)
 
         # 5. Display Results
         print("\n" + "="*40)
@@ -61,7 +258,7 @@ def main():
         print(f"Paksha          : {paksha}")
         print(f"Tithi           : {tithi}")
         print(f"Vara (Weekday)  : {vara}")
-        print(f"Nakshatra       : {nakshatra}")
+        print(f"Nakshatra       : {nakshatra} (Pada {nak_pada})")
         print(f"Yoga            : {yoga}")
         print(f"Karana (Index)  : {karana_num}")
         print("="*40)
@@ -0,0 +1,24 @@
+// Astro-Tutor chat client shared by guide.html and insights.html.
+// Server-side tutor session: context is sent once, then only the message travels
+let tutorSessionId = null;
+
+async function postTutor(payload) {
+    const response = await fetch('/api/ai-chat', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(payload)
+    });
+    return response.json();
+}
+
+async function askTutor(text, context) {
+    let result = await postTutor(tutorSessionId ? { message: text, session_id: tutorSessionId } : { message: text, context });
+
+    // Session expired on the server (restart or TTL): start a new one with the full context
+    if (result.session_expired) {
+        tutorSessionId = null;
+        result = await postTutor({ message: text, context });
+    }
+    if (result.session_id) tutorSessionId = result.session_id;
+    return result;
+}
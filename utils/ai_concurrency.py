@@ -0,0 +1,180 @@
+"""
+AI Request Concurrency Controls (v6.1)
+Single-flight coalescing and an upstream limiter for AI provider calls.
+
+When a teacher shares a date with a class, dozens of identical /api/v2/ai-explain
+payloads arrive together. SingleFlight lets them share one provider call, and
+UpstreamLimiter caps concurrent provider calls with a bounded wait queue so that
+a burst degrades to the Template Engine instead of exhausting the workers.
+Coalescing and limiting happen within a worker process, so run gunicorn with --threads.
+AI_MAX_CONCURRENT and AI_MAX_QUEUE are deployment-wide totals: each worker takes its
+share of WEB_CONCURRENCY (the gunicorn worker count, which gunicorn also reads).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+WEB_CONCURRENCY = max(1, int(os.environ.get("WEB_CONCURRENCY", 1)))
+# Per-worker shares of the deployment-wide limits (at least one slot per worker)
+AI_MAX_CONCURRENT = max(1, int(os.environ.get("AI_MAX_CONCURRENT", 4)) // WEB_CONCURRENCY)
+AI_MAX_QUEUE = -(-int(os.environ.get("AI_MAX_QUEUE", 16)) // WEB_CONCURRENCY)
+AI_QUEUE_TIMEOUT = float(os.environ.get("AI_QUEUE_TIMEOUT", 20))
+
+
+class AIBusyError(Exception):
+    """Raised when the upstream wait queue is full or the wait timed out."""
+    pass
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Runs fn() once per key among concurrent callers.
+        Returns (result, shared) where `shared` is True for callers that joined an in-flight call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class AIMetrics:
+    """Thread-safe counters for coalescing and queueing behaviour."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.requests = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_request(self, shared):
+        with self._lock:
+            self.requests += 1
+            if shared:
+                self.coalesced += 1
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.upstream_calls += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+
+    def record_rejection(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            p95 = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "coalescing_ratio": round(self.coalesced / self.requests, 4) if self.requests else 0.0,
+                "upstream_calls": self.upstream_calls,
+                "rejected": self.rejected,
+                "queue_wait_ms": {
+                    "avg": round(1000 * self.wait_total / self.upstream_calls, 2) if self.upstream_calls else 0.0,
+                    "p95": round(1000 * p95, 2),
+                    "max": round(1000 * self.wait_max, 2)
+                }
+            }
+
+
+class UpstreamLimiter:
+    """
+    Per-worker semaphore for provider calls with a bounded wait queue.
+    Only callers that find every slot taken count against max_queue.
+    """
+
+    def __init__(self, metrics, max_concurrent=AI_MAX_CONCURRENT, max_queue=AI_MAX_QUEUE, timeout=AI_QUEUE_TIMEOUT):
+        self.metrics = metrics
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._active = 0
+
+    def call(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) inside an upstream slot. Raises AIBusyError if none frees up in time."""
+        start = time.monotonic()
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self._active += 1
+        else:
+            with self._lock:
+                if self._waiting >= self.max_queue:
+                    self.metrics.record_rejection()
+                    raise AIBusyError("AI upstream queue is full")
+                self._waiting += 1
+
+            acquired = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self._waiting -= 1
+                if acquired:
+                    self._active += 1
+            if not acquired:
+                self.metrics.record_rejection()
+                raise AIBusyError(f"No AI upstream slot within {self.timeout}s")
+
+        self.metrics.record_wait(time.monotonic() - start)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+
+    def state(self):
+        with self._lock:
+            return {
+                "active": self._active,
+                "waiting": self._waiting,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue
+            }
@@ -7,6 +7,17 @@ import json
 import urllib.request
 import urllib.error
 import re
+import hashlib
+from utils.ai_concurrency import SingleFlight, UpstreamLimiter, AIMetrics, AIBusyError
+from utils.tutor_sessions import tutor_sessions, compact_context, SessionExpiredError
+from utils import template_explainer
+
+# Upper bound for a single provider call, so a dead model fails over quickly
+AI_REQUEST_TIMEOUT = float(os.environ.get("AI_REQUEST_TIMEOUT", 45))
+
+class AIEngineError(Exception):
+    """Raised when an LLM engine cannot produce a reply; the manager falls back to templates."""
+    pass
 
 class BaseAIEngine(metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -14,7 +25,12 @@ class BaseAIEngine(metaclass=abc.ABCMeta):
         pass
     
     @abc.abstractmethod
-    def chat_with_tutor(self, message, context_data):
+    def build_tutor_prompt(self, context_data):
+        """Builds the tutor system prompt for a (compacted) context. Built once per chat session."""
+        pass
+
+    @abc.abstractmethod
+    def chat_with_tutor(self, message, context_data, session=None):
         pass
 
 FOUNDATION_PROMPT = """
@@ -57,9 +73,9 @@ class OpenRouterEngine(BaseAIEngine):
         else:
             print(f"OpenRouter Engine initialized with models: {self.models}")
 
-    def _call_openrouter(self, system_prompt, user_prompt):
+    def _call_openrouter(self, system_prompt, user_prompt, history=None):
         if not self.api_key:
-            return "AI Engine Error: OPENROUTER_API_KEY not configured."
+            raise AIEngineError("OPENROUTER_API_KEY not configured.")
 
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -68,16 +84,20 @@ class OpenRouterEngine(BaseAIEngine):
             "X-Title": "Cosmic Explorer"
         }
 
+        # System prompt first and unchanged across turns, so providers can cache the prefix
+        messages = [{"role": "system", "content": system_prompt}]
+        for question, answer in (history or []):
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        messages.append({"role": "user", "content": user_prompt})
+
         # Fallback Loop
         last_error = None
         for model in self.models:
             print(f"DEBUG: Attempting AI call with model: {model}", flush=True)
             payload = {
                 "model": model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
+                "messages": messages
             }
 
             try:
@@ -88,10 +108,10 @@ class OpenRouterEngine(BaseAIEngine):
                     method="POST"
                 )
                 
-                with urllib.request.urlopen(req) as response:
+                with urllib.request.urlopen(req, timeout=AI_REQUEST_TIMEOUT) as response:
                     result = json.loads(response.read().decode('utf-8'))
                     # Check for valid response structure
-                    if 'choices' in result and len(result['choices']) > 0:
+                    if 'choices' in result and len(result['choices']) > 0 and result['choices'][0]['message'].get('content'):
                         content = result['choices'][0]['message']['content']
                         print(f"DEBUG: Success with model {model}", flush=True)
                         return content
@@ -110,7 +130,7 @@ class OpenRouterEngine(BaseAIEngine):
             # If we get here, the current model failed. Loop continues to next model.
 
         # If loop finishes without return, all models failed
-        return f"AI Generation Failed. All models exhausted. Last error: {last_error}"
+        raise AIEngineError(f"All models exhausted. Last error: {last_error}")
 
     def generate_insight(self, config_data, context_instructions=None):
         instructions = context_instructions or "Explain the provided astronomical data scientifically."
@@ -150,8 +170,8 @@ class OpenRouterEngine(BaseAIEngine):
                 
         return clean_text
 
-    def chat_with_tutor(self, message, context_data):
-        system_prompt = f"""
+    def build_tutor_prompt(self, context_data):
+        return f"""
         Role: The "Astro-Tutor" (The Maestro of the Cosmic Explorer).
         Person: You are an encouraging, highly enthusiastic, and knowledgeable Science Educator who bridges Traditional Indian Panchanga with Modern Astrophysics.
         Tone: High-energy, clear, and educational.
@@ -167,10 +187,19 @@ class OpenRouterEngine(BaseAIEngine):
         6. Safe Harbor Terms: Explain terms like Graha (Planetary Bodies), Yoga (Longitudinal sums), Karana (Half-Tithi), Muhurtha (Time units), Sankranti (Solar Ingress), Vakra (Retrograde Motion), Asta (Combustion/Invisibility), and Ayanamsa (Precession Index) strictly as mathematical or physical phenomena. Refuse to discuss their "effects" on human destiny.
         
         Diversion Rule: If the student asks about unrelated topics or superstition, politely redirect: "That's a fascinating question, but my eyes are fixed on the physics of the heavens! Let's get back to [Panchanga/Astronomy topic]."
-        """
         
-        raw_msg = f"Context: {context_data}\n\nStudent Question: {message}"
-        response = self._call_openrouter(system_prompt, raw_msg)
+        Current Context for this User (The Cosmic Map):
+        {context_data}
+        """
+
+    def chat_with_tutor(self, message, context_data, session=None):
+        if session is not None:
+            system_prompt, history = session.system_prompt, session.turns
+        else:
+            system_prompt, history = self.build_tutor_prompt(context_data), None
+
+        raw_msg = f"Student Question: {message}"
+        response = self._call_openrouter(system_prompt, raw_msg, history)
         return self._clean_response(response) # Also clean chat responses just in case
 
 
@@ -199,10 +228,10 @@ class GeminiEngine(BaseAIEngine):
 
     def generate_insight(self, config_data, context_instructions=None):
         if not self.model:
-            return "AI Engine not configured. Please set GOOGLE_API_KEY environment variable."
+            raise AIEngineError("AI Engine not configured. Please set GOOGLE_API_KEY environment variable.")
             
         if not config_data:
-            return "Error: No astronomical configuration data provided to the AI Engine."
+            raise AIEngineError("No astronomical configuration data provided to the AI Engine.")
 
         instructions = context_instructions or "Explain the provided astronomical data scientifically."
 
@@ -216,12 +245,15 @@ class GeminiEngine(BaseAIEngine):
         """
         try:
             print("DEBUG: Generating content via Gemini...", file=sys.stderr)
-            response = self.model.generate_content(prompt)
-            return self._clean_response(response.text)
+            response = self.model.generate_content(prompt, request_options={"timeout": AI_REQUEST_TIMEOUT})
+            insight = self._clean_response(response.text)
         except Exception as e:
             print(f"ERROR in generate_insight: {str(e)}", file=sys.stderr)
             traceback.print_exc(file=sys.stderr)
-            return f"Error: {str(e)}"
+            raise AIEngineError(str(e)) from e
+        if not insight:
+            raise AIEngineError("Empty response from Gemini.")
+        return insight
             
     def _clean_response(self, text):
         clean_text = text.strip()
@@ -243,11 +275,8 @@ class GeminiEngine(BaseAIEngine):
                 pass
         return clean_text
 
-    def chat_with_tutor(self, message, context_data):
-        if not self.model:
-            return "AI Engine not configured."
-            
-        system_prompt = f"""
+    def build_tutor_prompt(self, context_data):
+        return f"""
         Role: The "Astro-Tutor" (The Maestro of the Cosmic Explorer).
         Person: You are an encouraging, highly enthusiastic, and knowledgeable Science Educator who bridges Traditional Indian Panchanga with Modern Astrophysics.
         Tone: High-energy, clear, and educational.
@@ -271,17 +300,53 @@ class GeminiEngine(BaseAIEngine):
         
         Current Context for this User (The Cosmic Map):
         {context_data}
-        
+        """
+
+    def chat_with_tutor(self, message, context_data, session=None):
+        if not self.model:
+            raise AIEngineError("AI Engine not configured.")
+
+        if session is not None:
+            system_prompt = session.system_prompt
+            transcript = "".join(f"\n        Student: {q}\n        Tutor: {a}\n" for q, a in session.turns)
+        else:
+            system_prompt = self.build_tutor_prompt(context_data)
+            transcript = ""
+
+        prompt = f"""{system_prompt}{transcript}
         User Message: {message}
         """
 
         try:
-            response = self.model.generate_content(system_prompt)
-            return response.text
+            response = self.model.generate_content(prompt, request_options={"timeout": AI_REQUEST_TIMEOUT})
+            reply = response.text
         except Exception as e:
             print(f"ERROR in chat_with_tutor: {str(e)}", file=sys.stderr)
             traceback.print_exc(file=sys.stderr)
-            return f"The star-link is fuzzy... (Error: {str(e)})"
+            raise AIEngineError(str(e)) from e
+        if not reply or not reply.strip():
+            raise AIEngineError("Empty response from Gemini.")
+        return reply
+
+class TemplateEngine(BaseAIEngine):
+    """
+    Offline engine: deterministic Phase I-III markdown assembled from precompiled fragments.
+    See utils/template_explainer.py. No network, no API key, answers in milliseconds.
+    """
+    model_name = "template"
+
+    def generate_insight(self, config_data, context_instructions=None, civilization=None):
+        if not isinstance(config_data, dict):
+            config_data = {}
+        return template_explainer.explain(config_data, civilization)
+
+    def build_tutor_prompt(self, context_data):
+        return context_data
+
+    def chat_with_tutor(self, message, context_data, session=None):
+        context_text = session.context_text if session is not None else compact_context(context_data)
+        return template_explainer.answer_question(message, context_text)
+
 
 # Factory or Manager to handle future expansion
 class AIEngineManager:
@@ -299,9 +364,22 @@ class AIEngineManager:
             self.engine = OpenRouterEngine()
             self.provider = "openrouter"
         else:
-            # Fallback to Gemini if nothing else found
-            self.engine = GeminiEngine()
-            self.provider = "gemini"
+            # No key anywhere (or AI_PROVIDER=template): answer instantly from templates
+            print("📚 No AI key configured. Using offline Template Engine.")
+            self.engine = TemplateEngine()
+            self.provider = "template"
+
+        # Offline engine doubles as the instant fallback for any LLM failure
+        self.template_engine = self.engine if self.provider == "template" else TemplateEngine()
+
+        # AI_DEFAULT_MODE=template serves templates by default (classroom traffic);
+        # requests then opt into the LLM explicitly with "ai_mode": "llm".
+        self.default_mode = os.environ.get("AI_DEFAULT_MODE", "llm").lower()
+
+        # Identical concurrent explanations share one provider call; all calls share a capped pool
+        self.metrics = AIMetrics()
+        self.single_flight = SingleFlight()
+        self.limiter = UpstreamLimiter(self.metrics)
             
         # 2. Apply Model Override if requested
         model_override = os.environ.get("AI_MODEL_OVERRIDE")
@@ -315,29 +393,97 @@ class AIEngineManager:
                 self.engine.model_name = model_override
 
     def get_explanation(self, payload):
+        return self.explain(payload)[0]
+
+    def _use_templates(self, ai_mode=None):
+        return self.provider == "template" or (ai_mode or self.default_mode).lower() == "template"
+
+    def explain(self, payload):
         """
         Double-Spoke Implementation:
         Fused 'Foundation' (Safety/Guardrails) with civilization-specific 'Context Spoke'.
+        Returns (markdown, provider_used); falls back to the Template Engine if the LLM fails.
         """
         from engines.factory import EngineFactory
         
         # 1. Extract civilization type and raw input
         metadata = payload.get('metadata', {})
-        civ_type = metadata.get('civilization', 'panchanga')
+        civ_type = metadata.get('civilization')
         config_data = payload.get('results', payload) # Fallback to full payload if v2 structure missing
+
+        if self._use_templates(payload.get('ai_mode')):
+            return self.template_engine.generate_insight(config_data, civilization=civ_type), "template"
         
         # 2. Get the Spoke Engine
         try:
-            spoke_engine = EngineFactory.get_engine(civ_type)
+            spoke_engine = EngineFactory.get_engine(civ_type or 'panchanga')
             context_instructions = spoke_engine.get_ai_instructions()
         except:
             # Fallback if engine not found (Phase 3 resilience)
             context_instructions = "Explain the provided astronomical data scientifically."
 
-        return self.engine.generate_insight(config_data, context_instructions)
+        key = hashlib.sha256(json.dumps([civ_type, config_data], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        try:
+            insight, shared = self.single_flight.do(
+                key, lambda: self.limiter.call(self.engine.generate_insight, config_data, context_instructions)
+            )
+        except (AIEngineError, AIBusyError) as e:
+            self.metrics.record_request(False)
+            print(f"DEBUG: LLM unavailable ({str(e)[:80]}). Serving template explanation.", flush=True)
+            return self.template_engine.generate_insight(config_data, civilization=civ_type), "template"
+        self.metrics.record_request(shared)
+        return insight, self.provider
+
+    def _limited_chat(self, message, context_data, session=None):
+        """Model reply through the upstream limiter, or None when the engine failed or the pool is busy."""
+        try:
+            return self.limiter.call(self.engine.chat_with_tutor, message, context_data, session=session)
+        except (AIEngineError, AIBusyError) as e:
+            print(f"DEBUG: LLM unavailable ({str(e)[:80]}). Serving template answer.", flush=True)
+            return None
 
     def chat_with_tutor(self, message, context_data):
-        return self.engine.chat_with_tutor(message, context_data)
+        reply = self._limited_chat(message, context_data)
+        if reply is None:
+            reply = self.template_engine.chat_with_tutor(message, context_data)
+        return reply
+
+    def chat_in_session(self, message, session_id=None, context_data=None, ai_mode=None):
+        """
+        Session-aware tutor chat (v6.1).
+        The context is sent once; later turns reuse the server-side session (prompt + recent turns).
+        Returns (reply, session_id). Raises SessionExpiredError if the session is gone and no context was sent.
+        """
+        session = tutor_sessions.get(session_id)
+        if context_data is not None and (session is None or session.context_text != compact_context(context_data)):
+            if session is not None:
+                tutor_sessions.discard(session.id)
+            session = tutor_sessions.create(context_data, self.engine.build_tutor_prompt)
+        elif session is None:
+            raise SessionExpiredError(f"Unknown or expired tutor session: {session_id}")
+
+        from_model = False
+        if self._use_templates(ai_mode):
+            reply = self.template_engine.chat_with_tutor(message, session.context_text, session=session)
+        else:
+            reply = self._limited_chat(message, session.context_text, session=session)
+            from_model = reply is not None
+            if not from_model:
+                reply = self.template_engine.chat_with_tutor(message, session.context_text, session=session)
+        # Only model answers become history; canned template text would be replayed to the model
+        if from_model:
+            tutor_sessions.record_turn(session, message, reply)
+        return reply, session.id
+
+    def get_metrics(self):
+        """Coalescing ratio, queue wait times and pool state for /api/v2/ai-metrics."""
+        return {
+            "provider": self.provider,
+            "default_mode": self.default_mode,
+            "requests": self.metrics.snapshot(),
+            "upstream": self.limiter.state(),
+            "tutor_sessions": tutor_sessions.stats()
+        }
 
 # Singleton instance for easy import
 ai_engine = AIEngineManager()
@@ -3,6 +3,7 @@ from skyfield import almanac
 from datetime import datetime, timedelta
 import pytz
 import numpy as np
+import os
 
 # Load ephemeris data
 eph = load('de421.bsp')
@@ -37,6 +38,265 @@ def get_sidereal_longitude(target_time_utc, body):
     sidereal_lon = (tropical_lon - ayanamsha) % 360
     return sidereal_lon
 
+def get_sidereal_longitudes(target_times_utc, body, precision=None):
+    """
+    Vectorized get_sidereal_longitude: one Skyfield evaluation for a whole sequence of UTC datetimes.
+    Returns a NumPy array of sidereal longitudes in degrees.
+    precision='fast' uses the analytic series for the Sun or Moon, re-verifying near rashi/nakshatra limbs;
+    precision='table' evaluates the Chebyshev tables.
+    """
+    precision = precision or DEFAULT_PRECISION
+    if precision == FAST and (body is sun or body is moon):
+        return _fast_sidereal_longitudes(list(target_times_utc), with_sun=body is sun, with_moon=body is moon)[0 if body is sun else 1]
+    t = ts.from_datetimes(list(target_times_utc))
+    if precision == TABLE and (body is sun or body is moon):
+        table_lons = _table_sidereal_longitudes(t.tt, "sun" if body is sun else "moon")
+        if table_lons is not None:
+            return table_lons
+    astrometric = earth.at(t).observe(body)
+    ecliptic_lat, ecliptic_lon, distance = astrometric.ecliptic_latlon()
+    return (ecliptic_lon.degrees - get_ayanamsha(t.tt)) % 360
+
+# --- Fast analytic longitudes (Meeus, Astronomical Algorithms ch. 25 and 47) ---
+# Geometric longitudes for the mean equinox of date, rotated back to the J2000 equinox so they
+# match earth.at(t).observe(body).ecliptic_latlon(). Error bounds against DE421 (1900-2050):
+FAST_SUN_MAX_ERROR = 0.015   # degrees (measured max 0.0096, mean 0.0027)
+FAST_MOON_MAX_ERROR = 0.015  # degrees (measured max 0.0090, mean 0.0036)
+
+PRECISE = "precise"
+FAST = "fast"
+TABLE = "table"     # Chebyshev tables fitted to DE421 (utils.sidereal_tables); precise outside their range
+DEFAULT_PRECISION = os.environ.get("ASTRONOMY_PRECISION", PRECISE)
+
+# Table 47.A: multiples of D, M, M', F and the Moon's longitude term (1e-6 degrees)
+_MOON_TERMS = np.array([
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314), (0, 0, 2, 0, 213618),
+    (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332), (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066),
+    (2, 0, 1, 0, 53322), (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528), (0, 0, 1, -2, 10980),
+    (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034), (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888),
+    (2, 1, 0, 0, -6766), (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665), (0, 1, -2, 0, -2689),
+    (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390), (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236),
+    (0, 1, 2, 0, -2120), (0, 2, 0, 0, -2069), (2, -2, -1, 0, 2048), (2, 0, 1, -2, -1773),
+    (2, 0, 0, 2, -1595), (4, -1, -1, 0, 1215), (0, 0, 2, 2, -1110), (3, 0, -1, 0, -892),
+    (2, 1, 1, 0, -810), (4, -1, -2, 0, 759), (0, 2, -1, 0, -713), (2, 2, -1, 0, -700),
+    (2, 1, -2, 0, 691), (2, -1, 0, -2, 596), (4, 0, 1, 0, 549), (0, 0, 4, 0, 537),
+    (4, -1, 0, 0, 520), (1, 0, -2, 0, -487), (2, 1, 0, -2, -399), (0, 0, 2, -2, -381),
+    (1, 1, 1, 0, 351), (3, 0, -2, 0, -340), (4, 0, -3, 0, 330), (2, -1, 2, 0, 327),
+    (0, 2, 1, 0, -323), (1, 1, -1, 0, 299), (2, 0, 3, 0, 294),
+], dtype=np.float64)
+_MOON_M_POWER = np.abs(_MOON_TERMS[:, 1])
+
+def _precession_since_j2000(T):
+    """General precession in longitude (degrees) from J2000 to T Julian centuries later."""
+    return 1.396971 * T + 0.0003086 * T * T
+
+def fast_sun_longitude(jd_tt):
+    """Tropical (J2000 equinox) geometric longitude of the Sun, degrees. Vectorized."""
+    T = (np.asarray(jd_tt, dtype=np.float64) - 2451545.0) / 36525.0
+    L0 = 280.46646 + 36000.76983 * T + 0.0003032 * T * T
+    M = np.radians(357.52911 + 35999.05029 * T - 0.0001537 * T * T)
+    C = ((1.914602 - 0.004817 * T - 0.000014 * T * T) * np.sin(M)
+         + (0.019993 - 0.000101 * T) * np.sin(2 * M) + 0.000289 * np.sin(3 * M))
+    return (L0 + C - _precession_since_j2000(T)) % 360
+
+def fast_moon_longitude(jd_tt):
+    """Tropical (J2000 equinox) geometric longitude of the Moon, degrees. Vectorized."""
+    T = (np.asarray(jd_tt, dtype=np.float64) - 2451545.0) / 36525.0
+    T2, T3, T4 = T * T, T ** 3, T ** 4
+    Lp = 218.3164477 + 481267.88123421 * T - 0.0015786 * T2 + T3 / 538841 - T4 / 65194000
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T2 + T3 / 545868 - T4 / 113065000
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T2 + T3 / 24490000
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T2 + T3 / 69699 - T4 / 14712000
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T2 - T3 / 3526000 + T4 / 863310000
+    E = 1 - 0.002516 * T - 0.0000074 * T2
+
+    # One (N, 4) x (4, terms) product gives every argument; E scales terms with M (E^2 for 2M)
+    fundamentals = np.radians(np.stack([D, M, Mp, F], axis=-1))
+    args = fundamentals @ _MOON_TERMS[:, :4].T
+    E = E[..., None]
+    amplitudes = _MOON_TERMS[:, 4] * np.where(_MOON_M_POWER == 0, 1.0, np.where(_MOON_M_POWER == 1, E, E * E))
+    sigma_l = np.sum(amplitudes * np.sin(args), axis=-1)
+
+    A1 = np.radians(119.75 + 131.849 * T)
+    A2 = np.radians(53.09 + 479264.290 * T)
+    sigma_l += 3958 * np.sin(A1) + 1962 * np.sin(np.radians(Lp - F)) + 318 * np.sin(A2)
+
+    return (Lp + sigma_l / 1e6 - _precession_since_j2000(T)) % 360
+
+# Limb widths (degrees) checked for fast-mode re-verification
+_SUN_LIMBS = (30.0,)                          # rashi / masa
+_MOON_LIMBS = (30.0, 360 / 27, 360 / 108)     # rashi, nakshatra, pada
+_ELONGATION_LIMBS = (6.0,)                    # karana (tithi boundaries are a subset)
+_YOGA_LIMBS = (360 / 27,)
+
+def _near_boundary(values, widths, margin):
+    near = np.zeros(values.shape, dtype=bool)
+    for width in widths:
+        offset = values % width
+        near |= (offset < margin) | (offset > width - margin)
+    return near
+
+def _fast_sidereal_longitudes(times, with_sun=True, with_moon=True):
+    """
+    Analytic sidereal longitudes; instants within the error bound of a limb boundary of the
+    requested bodies (and, for both, of the elongation and yoga sum) are recomputed with DE421.
+    Returns (sun_lons, moon_lons); an unrequested body is None.
+    """
+    if not times:
+        return np.array([]), np.array([])
+
+    tt = ts.from_datetimes(times).tt
+    ayanamsha = get_ayanamsha(tt)
+    sun_lons = (fast_sun_longitude(tt) - ayanamsha) % 360 if with_sun else None
+    moon_lons = (fast_moon_longitude(tt) - ayanamsha) % 360 if with_moon else None
+
+    recheck = np.zeros(len(times), dtype=bool)
+    if with_sun:
+        recheck |= _near_boundary(sun_lons, _SUN_LIMBS, FAST_SUN_MAX_ERROR)
+    if with_moon:
+        recheck |= _near_boundary(moon_lons, _MOON_LIMBS, FAST_MOON_MAX_ERROR)
+    if with_sun and with_moon:
+        margin = FAST_SUN_MAX_ERROR + FAST_MOON_MAX_ERROR
+        recheck |= _near_boundary((moon_lons - sun_lons) % 360, _ELONGATION_LIMBS, margin)
+        recheck |= _near_boundary((moon_lons + sun_lons) % 360, _YOGA_LIMBS, margin)
+
+    idx = np.nonzero(recheck)[0]
+    if len(idx):
+        subset = [times[i] for i in idx]
+        if with_sun:
+            sun_lons[idx] = get_sidereal_longitudes(subset, sun, precision=PRECISE)
+        if with_moon:
+            moon_lons[idx] = get_sidereal_longitudes(subset, moon, precision=PRECISE)
+    return sun_lons, moon_lons
+
+def _table_sidereal_longitudes(jd_tt, body):
+    """Longitudes from the Chebyshev tables, or None if any instant falls outside them."""
+    from utils.sidereal_tables import TableUnavailableError, get_tables
+    try:
+        tables = get_tables()
+    except TableUnavailableError:
+        return None
+    if len(jd_tt) == 0 or not tables.covers(jd_tt):
+        return None
+    return tables.longitudes(jd_tt, body)
+
+def get_sun_moon_longitudes(target_times_utc, precision=None):
+    """
+    Sidereal Sun and Moon longitudes for a sequence of UTC datetimes, as two NumPy arrays.
+    precision='fast' evaluates the analytic series and recomputes with DE421 only the instants whose
+    Sun, Moon, elongation or yoga sum lies within the error bound of a limb boundary, so every
+    discrete Panchanga limb (tithi, karana, nakshatra/pada, yoga, rashi) matches the precise path.
+    precision='table' evaluates the Chebyshev tables (within ~1e-7 deg of DE421).
+    """
+    times = list(target_times_utc)
+    precision = precision or DEFAULT_PRECISION
+    if precision == FAST:
+        return _fast_sidereal_longitudes(times)
+    if precision == TABLE and times:
+        jd_tt = ts.from_datetimes(times).tt
+        sun_lons = _table_sidereal_longitudes(jd_tt, "sun")
+        if sun_lons is not None:
+            return sun_lons, _table_sidereal_longitudes(jd_tt, "moon")
+    return get_sidereal_longitudes(times, sun), get_sidereal_longitudes(times, moon)
+
+def find_new_moons(start_utc, end_utc):
+    """
+    Finds every New Moon between two UTC datetimes in a single find_discrete pass.
+    Returns a sorted list of UTC datetimes.
+    """
+    times, phases = almanac.find_discrete(ts.from_datetime(start_utc), ts.from_datetime(end_utc), almanac.moon_phases(eph))
+    return [t.astimezone(pytz.utc) for t, p in zip(times, phases) if p == 0]
+
+def get_ephemeris_years():
+    """First and last full calendar years covered by the loaded ephemeris (de421: 1900-2052)."""
+    start_jd = max(segment.start_jd for segment in eph.spk.segments)
+    end_jd = min(segment.end_jd for segment in eph.spk.segments)
+    return ts.tt_jd(start_jd).utc_datetime().year + 1, ts.tt_jd(end_jd).utc_datetime().year - 1
+
+# Root refinement shared by the event tables (utils.graha_events, utils.samvatsara_cycle)
+ILLINOIS_ITERATIONS = 12    # converges to well under a second from a 1-2 day bracket
+
+def wrap_angle(angle):
+    """Angle difference folded into [-180, 180)."""
+    return (angle + 180) % 360 - 180
+
+def illinois_roots(f, lo, hi, f_lo, f_hi, iterations=ILLINOIS_ITERATIONS):
+    """Roots of a vectorized f bracketed by [lo, hi] (f_lo and f_hi of opposite signs), by the Illinois method."""
+    for _ in range(iterations):
+        mid = hi - f_hi * (hi - lo) / (f_hi - f_lo)
+        f_mid = f(mid)
+        crossed = np.sign(f_mid) != np.sign(f_hi)
+        lo, f_lo = np.where(crossed, hi, lo), np.where(crossed, f_hi, f_lo / 2)
+        hi, f_hi = mid, f_mid
+    return hi
+
+def tt_to_unix(jd_tt):
+    """TT Julian dates to UTC POSIX timestamps (leap seconds via Skyfield)."""
+    return np.array([dt.timestamp() for dt in ts.tt_jd(jd_tt).utc_datetime()])
+
+def tithi_index_at(t):
+    """
+    Tithi index (0-29) at Skyfield time(s) t: Moon-Sun elongation / 12 degrees.
+    The ayanamsha cancels in the difference, so tropical longitudes are used directly.
+    """
+    e = earth.at(t)
+    _, sun_lon, _ = e.observe(sun).ecliptic_latlon()
+    _, moon_lon, _ = e.observe(moon).ecliptic_latlon()
+    return (((moon_lon.degrees - sun_lon.degrees) % 360) // 12).astype(int)
+
+# Shortest tithi is ~19.5 hours; sample more often than that so none is skipped
+tithi_index_at.step_days = 0.4
+TITHI_EPSILON_DAYS = 60 / 86400.0
+
+def find_tithi_transitions(start_utc, end_utc):
+    """
+    Every tithi boundary between two UTC datetimes in a single find_discrete pass.
+    Returns (index_at_start, [UTC datetimes], NumPy array of the tithi index beginning at each boundary).
+    Transitions to index 0 are the New Moons, so the result also carries the lunation structure.
+    Served from the global limb-transition index (utils.limb_index) when it covers the window.
+    """
+    from utils.limb_index import get_limb_index
+    try:
+        index = get_limb_index()
+        if index.covers(start_utc, end_utc):
+            return index.transitions(start_utc, end_utc, "tithi")
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️ Limb index unavailable, using the ephemeris: {e}")
+
+    t0, t1 = ts.from_datetime(start_utc), ts.from_datetime(end_utc)
+    # Boundaries to within a minute; the default millisecond refinement costs ~4x more for no practical gain
+    times, indices = almanac.find_discrete(t0, t1, tithi_index_at, epsilon=TITHI_EPSILON_DAYS, num=4)
+    return int(tithi_index_at(t0)), [t.astimezone(pytz.utc) for t in times], indices
+
+# Mean Moon-Sun elongation rate (360 degrees per synodic month of 29.530589 days)
+SYNODIC_RATE = 360.0 / 29.530589
+
+def _elongations(tt):
+    e = earth.at(ts.tt_jd(tt))
+    _, sun_lon, _ = e.observe(sun).ecliptic_latlon()
+    _, moon_lon, _ = e.observe(moon).ecliptic_latlon()
+    return (moon_lon.degrees - sun_lon.degrees) % 360
+
+def get_previous_new_moons(target_times_utc, iterations=4):
+    """
+    Vectorized get_previous_new_moon for many unrelated instants at once.
+    Steps back by the elongation at each instant, then refines with secant iterations on the
+    elongation; every step is one Skyfield evaluation for all instants (sub-second accuracy).
+    Returns a list of UTC datetimes.
+    """
+    tt = ts.from_datetimes(list(target_times_utc)).tt
+    prev_tt = tt - _elongations(tt) / SYNODIC_RATE
+    prev_e = ((_elongations(prev_tt) + 180) % 360) - 180
+    tt = prev_tt - prev_e / SYNODIC_RATE
+    for _ in range(iterations):
+        e = ((_elongations(tt) + 180) % 360) - 180
+        slope = np.where(np.abs(e - prev_e) > 1e-9, (e - prev_e) / np.where(tt != prev_tt, tt - prev_tt, 1.0), SYNODIC_RATE)
+        prev_tt, prev_e = tt, e
+        tt = tt - e / slope
+    return list(ts.tt_jd(tt).utc_datetime())
+
 def get_previous_new_moon(target_time_utc):
     """
     Finds the most recent New Moon (Amavasya) preceding the target time.
@@ -58,26 +318,23 @@ def get_previous_new_moon(target_time_utc):
 def get_sunrise_sunset(date_local, lat, lon, timezone_str):
     """
     Calculates Sunrise and Sunset for a given date and location.
+    Served by utils.sun_tables: a lookup in the location's year table once one is cached,
+    otherwise a search over the day.
+    Polar days are explicit rather than None: if the Sun does not rise that day, sunrise is local
+    midnight (the Vara falls back to the civil day); if it does not set, sunset is 23:59:59 while
+    the Sun is up and local midnight in polar night.
     """
-    observer = earth + Topos(latitude_degrees=lat, longitude_degrees=lon)
+    from utils.sun_tables import get_sun_day, POLAR_NIGHT
     tz = pytz.timezone(timezone_str)
-    
-    # Define the time range for the day (searching from 00:00 to 23:59 local)
-    t0 = ts.from_datetime(tz.localize(datetime(date_local.year, date_local.month, date_local.day, 0, 0, 0)))
-    t1 = ts.from_datetime(tz.localize(datetime(date_local.year, date_local.month, date_local.day, 23, 59, 59)))
-    
-    f = almanac.sunrise_sunset(eph, Topos(latitude_degrees=lat, longitude_degrees=lon))
-    times, events = almanac.find_discrete(t0, t1, f)
-    
-    sunrise = None
-    sunset = None
-    
-    for t, event in zip(times, events):
-        if event == 1: # Sunrise
-            sunrise = t.astimezone(tz)
-        elif event == 0: # Sunset
-            sunset = t.astimezone(tz)
-            
+    day = date_local.date() if isinstance(date_local, datetime) else date_local
+    sun_day = get_sun_day(day, lat, lon, timezone_str)
+    sunrise, sunset, polar_night = sun_day["sunrise"], sun_day["sunset"], sun_day["state"] == POLAR_NIGHT
+
+    midnight = tz.localize(datetime(day.year, day.month, day.day))
+    if sunrise is None:
+        sunrise = midnight
+    if sunset is None:
+        sunset = midnight if polar_night else tz.localize(datetime(day.year, day.month, day.day, 23, 59, 59))
     return sunrise, sunset
 
 def get_rashi(moon_lon):
@@ -145,42 +402,29 @@ def get_angular_data(date_local, lat, lon, timezone_str):
         - Ayanamsha (Lahiri)
         - Sun-Moon angular separation (phase angle)
         - Ecliptic longitude of the Sun (tropical) for reference
+        - Mean lunar nodes (Rahu/Ketu)
+        - Every graha's position, speed and retrograde flag (utils.grahas snapshot, v6.1)
     """
+    from utils.grahas import get_graha_snapshot
     # Ensure date_local is a datetime with timezone
     if date_local.tzinfo is None:
         tz = pytz.timezone(timezone_str)
         date_local = tz.localize(date_local)
-    # Convert to UTC for calculations
-    utc_dt = date_local.astimezone(pytz.utc)
-    # Sidereal longitudes
-    sun_sid = get_sidereal_longitude(utc_dt, sun)
-    moon_sid = get_sidereal_longitude(utc_dt, moon)
-    # Ayanamsha for the moment
-    t = ts.from_datetime(utc_dt)
-    ayanamsha = get_ayanamsha(t.tt)
-    # Tropical Sun longitude (for phase calculation)
-    t_tropical = ts.from_datetime(utc_dt)
-    astrometric = earth.at(t_tropical).observe(sun)
-    _, sun_tropical_lon, _ = astrometric.ecliptic_latlon()
-    sun_tropical_deg = sun_tropical_lon.degrees
+    # One batched pass for all grahas, shared with the solar-system view of the same instant
+    snapshot = get_graha_snapshot(date_local.astimezone(pytz.utc))
+    grahas = snapshot["grahas"]
+    sun_sid = grahas["sun"]["sidereal_longitude"]
+    moon_sid = grahas["moon"]["sidereal_longitude"]
     # Phase angle between Sun and Moon (0-360)
     phase_angle = (moon_sid - sun_sid) % 360
 
-    # Calculate Rahu (Mean North Node)
-    # T = centuries from J2000.0
-    tt = t.tt
-    T = (tt - 2451545.0) / 36525.0
-    # Formula for Mean Node (Tropical)
-    rahu_tropical = (125.0445479 - 1934.1362891 * T + 0.0020754 * T**2 + 0.000002139 * T**3 - 0.0000000165 * T**4) % 360
-    rahu_sidereal = (rahu_tropical - ayanamsha) % 360
-    ketu_sidereal = (rahu_sidereal + 180) % 360
-
     return {
-        "sun_sidereal": round(sun_sid, 4),
-        "moon_sidereal": round(moon_sid, 4),
-        "ayanamsha": round(ayanamsha, 4),
-        "sun_tropical": round(sun_tropical_deg, 4),
+        "sun_sidereal": sun_sid,
+        "moon_sidereal": moon_sid,
+        "ayanamsha": snapshot["ayanamsha"],
+        "sun_tropical": grahas["sun"]["tropical_longitude"],
         "phase_angle": round(phase_angle, 2),
-        "rahu_sidereal": round(rahu_sidereal, 4),
-        "ketu_sidereal": round(ketu_sidereal, 4)
+        "rahu_sidereal": grahas["rahu"]["sidereal_longitude"],
+        "ketu_sidereal": grahas["ketu"]["sidereal_longitude"],
+        "grahas": grahas
     }
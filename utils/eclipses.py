@@ -0,0 +1,238 @@
+"""
+Eclipse Finder (v6.1)
+Solar and lunar eclipses (Surya and Chandra Grahana) over a range of years.
+
+Only a syzygy close to a lunar node can be eclipsed, so the New and Full Moons are read from the
+limb index (tithi 0 and tithi 15 transitions, utils.limb_index) and pre-filtered by the distance
+of the Sun from the mean node (Rahu/Ketu, utils.grahas) against the ecliptic limits: about one
+syzygy in five survives. Only those few are confirmed with DE421 geometry: the instant of
+greatest eclipse is found for all of them at once by a vectorized golden-section search, then
+
+    solar: the Moon's shadow cone against the Earth - distance of the shadow axis from the
+           Earth's centre (gamma) and the umbra/penumbra radii there give total, annular,
+           hybrid or partial;
+    lunar: the Moon against the Earth's shadow - umbra and penumbra angular radii from the
+           parallaxes and the Sun's semi-diameter (enlarged by SHADOW_ENLARGEMENT for the
+           atmosphere) give total, partial or penumbral.
+
+Results are cached per calendar year; missing years are computed in one batch.
+"""
+
+from collections import OrderedDict
+import threading
+
+import numpy as np
+import pytz
+
+from utils.astronomy import earth, sun, moon, ts, get_ayanamsha
+from utils.grahas import mean_node_longitude
+from utils.sidereal_tables import TABLE_START_YEAR, TABLE_END_YEAR, get_tables
+from utils.limb_index import get_limb_index
+
+SOLAR = "solar"
+LUNAR = "lunar"
+KINDS = (SOLAR, LUNAR)
+
+# Largest Sun-node distance (degrees) at which an eclipse is possible, with margin for the
+# true node swinging ~1.7 degrees about the mean one
+ECLIPTIC_LIMITS = {SOLAR: 20.5, LUNAR: 19.5}
+SEARCH_HALF_WINDOW_DAYS = 0.3     # greatest eclipse lies within hours of the syzygy
+GOLDEN_ITERATIONS = 36            # 0.6 day * 0.618**36 ~ 0.02 s
+SHADOW_ENLARGEMENT = 1.02
+
+EARTH_RADIUS_KM = 6378.137
+MOON_RADIUS_KM = 1737.4
+SUN_RADIUS_KM = 696000.0
+ECLIPSE_CACHE_YEARS = 300
+
+_years = OrderedDict()
+_years_lock = threading.Lock()
+
+
+def _positions(jd_tt):
+    """Geocentric (astrometric) Sun and Moon position vectors in km, shape (3, n)."""
+    observer = earth.at(ts.tt_jd(jd_tt))
+    return observer.observe(sun).position.km, observer.observe(moon).position.km
+
+
+def _norm(v):
+    return np.sqrt(np.sum(v * v, axis=0))
+
+
+def _solar_geometry(S, M):
+    """Shadow axis distance from the Earth's centre and cone radii at its closest point (km)."""
+    sun_moon = _norm(M - S)
+    axis = (M - S) / sun_moon
+    along = -np.sum(M * axis, axis=0)             # Moon to the axis point closest to the Earth's centre
+    closest = M + along * axis
+    penumbra = MOON_RADIUS_KM + along * (SUN_RADIUS_KM + MOON_RADIUS_KM) / sun_moon
+    umbra = MOON_RADIUS_KM - along * (SUN_RADIUS_KM - MOON_RADIUS_KM) / sun_moon   # < 0: antumbra
+    return {"distance": _norm(closest), "along": along, "axis": axis, "closest": closest,
+            "sun_moon": sun_moon, "penumbra": penumbra, "umbra": umbra}
+
+
+def _lunar_geometry(S, M):
+    """Moon-shadow separation, shadow radii and Moon semi-diameter (degrees)."""
+    sun_distance, moon_distance = _norm(S), _norm(M)
+    cos_sep = np.clip(-np.sum(S * M, axis=0) / (sun_distance * moon_distance), -1.0, 1.0)
+    parallaxes = np.arcsin(EARTH_RADIUS_KM / moon_distance) + np.arcsin(EARTH_RADIUS_KM / sun_distance)
+    sun_semi = np.arcsin(SUN_RADIUS_KM / sun_distance)
+    return {
+        "separation": np.degrees(np.arccos(cos_sep)),
+        "umbra": np.degrees(SHADOW_ENLARGEMENT * (parallaxes - sun_semi)),
+        "penumbra": np.degrees(SHADOW_ENLARGEMENT * (parallaxes + sun_semi)),
+        "moon_semi": np.degrees(np.arcsin(MOON_RADIUS_KM / moon_distance)),
+    }
+
+
+def _miss(kind):
+    """The quantity greatest eclipse minimizes, as a vectorized function of TT Julian dates."""
+    if kind == SOLAR:
+        return lambda jd: _solar_geometry(*_positions(jd))["distance"]
+    return lambda jd: _lunar_geometry(*_positions(jd))["separation"]
+
+
+def _golden_minimum(f, lo, hi):
+    """Minimum of a vectorized unimodal f on every [lo, hi]."""
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+    fa, fb = f(a), f(b)
+    for _ in range(GOLDEN_ITERATIONS):
+        left = fa < fb
+        hi, lo = np.where(left, b, hi), np.where(left, lo, a)
+        # The surviving interior point is reused; only the other one is evaluated
+        a, b = np.where(left, hi - ratio * (hi - lo), b), np.where(left, a, lo + ratio * (hi - lo))
+        values = f(np.where(left, a, b))
+        fa, fb = np.where(left, values, fb), np.where(left, fa, values)
+    return (lo + hi) / 2
+
+
+def _classify_solar(jd):
+    S, M = _positions(jd)
+    g = _solar_geometry(S, M)
+    distance, umbra, penumbra = g["distance"], g["umbra"], g["penumbra"]
+    central = distance < EARTH_RADIUS_KM
+    # Umbra radius where the axis meets the Earth's surface on the sunward side
+    surface = g["along"] - np.sqrt(np.clip(EARTH_RADIUS_KM ** 2 - distance ** 2, 0, None))
+    umbra_surface = MOON_RADIUS_KM - surface * (SUN_RADIUS_KM - MOON_RADIUS_KM) / g["sun_moon"]
+
+    eclipses = []
+    for i in range(len(jd)):
+        if distance[i] > EARTH_RADIUS_KM + penumbra[i]:
+            continue
+        if central[i]:
+            kind = "total" if umbra[i] > 0 else ("hybrid" if umbra_surface[i] > 0 else "annular")
+            # Ratio of apparent diameters seen from the surface point under the axis
+            observer = g["closest"][:, i] - (g["along"][i] - surface[i]) * g["axis"][:, i]
+            magnitude = ((MOON_RADIUS_KM / _norm(M[:, i] - observer)) / (SUN_RADIUS_KM / _norm(S[:, i] - observer)))
+        else:
+            kind = ("total" if umbra[i] > 0 else "annular") if distance[i] < EARTH_RADIUS_KM + abs(umbra[i]) else "partial"
+            magnitude = (EARTH_RADIUS_KM + penumbra[i] - distance[i]) / (penumbra[i] + umbra[i])
+        eclipses.append((float(jd[i]), SOLAR, kind, {
+            "central": bool(central[i]),
+            "gamma": round(float(distance[i] / EARTH_RADIUS_KM), 4),
+            "magnitude": round(float(magnitude), 4),
+        }))
+    return eclipses
+
+
+def _classify_lunar(jd):
+    g = _lunar_geometry(*_positions(jd))
+    umbral = (g["umbra"] + g["moon_semi"] - g["separation"]) / (2 * g["moon_semi"])
+    penumbral = (g["penumbra"] + g["moon_semi"] - g["separation"]) / (2 * g["moon_semi"])
+
+    eclipses = []
+    for i in range(len(jd)):
+        if penumbral[i] <= 0:
+            continue
+        kind = "total" if umbral[i] >= 1 else ("partial" if umbral[i] > 0 else "penumbral")
+        eclipses.append((float(jd[i]), LUNAR, kind, {
+            "umbral_magnitude": round(float(umbral[i]), 4),
+            "penumbral_magnitude": round(float(penumbral[i]), 4),
+        }))
+    return eclipses
+
+
+def _compute_eclipses(first_year, last_year):
+    """Every eclipse of the calendar years [first_year, last_year] as (TT JD, kind, type, details)."""
+    events = get_limb_index().events_of("tithi")
+    start, end = (ts.utc(first_year, 1, 1).utc_datetime().timestamp(),
+                  ts.utc(last_year + 1, 1, 1).utc_datetime().timestamp())
+    selected = events[(events["time"] >= start) & (events["time"] < end)]
+
+    eclipses = []
+    for kind, tithi in ((SOLAR, 0), (LUNAR, 15)):
+        stamps = selected["time"][selected["index"] == tithi]
+        if not len(stamps):
+            continue
+        jd = ts.utc(1970, 1, 1, 0, 0, np.asarray(stamps, dtype=float)).tt
+        # Distance of the Sun from the nearer node (both in sidereal longitude)
+        node = (mean_node_longitude(jd) - get_ayanamsha(jd)) % 360
+        from_node = np.abs((get_tables().longitudes(jd, "sun") - node + 90) % 180 - 90)
+        candidates = jd[from_node < ECLIPTIC_LIMITS[kind]]
+        if not len(candidates):
+            continue
+        greatest = _golden_minimum(_miss(kind), candidates - SEARCH_HALF_WINDOW_DAYS, candidates + SEARCH_HALF_WINDOW_DAYS)
+        eclipses.extend(_classify_solar(greatest) if kind == SOLAR else _classify_lunar(greatest))
+    return sorted(eclipses, key=lambda e: e[0])
+
+
+def _eclipses_for_years(first_year, last_year):
+    with _years_lock:
+        missing = [y for y in range(first_year, last_year + 1) if y not in _years]
+    if missing:
+        computed = _compute_eclipses(missing[0], missing[-1])
+        with _years_lock:
+            for year in range(missing[0], missing[-1] + 1):
+                lo, hi = float(ts.utc(year, 1, 1).tt), float(ts.utc(year + 1, 1, 1).tt)
+                _years[year] = [e for e in computed if lo <= e[0] < hi]
+            while len(_years) > ECLIPSE_CACHE_YEARS:
+                _years.popitem(last=False)
+
+    with _years_lock:
+        return [e for y in range(first_year, last_year + 1) for e in _years[y]]
+
+
+def find_eclipses(start_year, end_year, kinds=None, timezone_str="UTC"):
+    """
+    Eclipses in the calendar years [start_year, end_year], in time order:
+    [{'kind' ('solar' / 'lunar'), 'type', 'time' (ISO, greatest eclipse), 'node' ('rahu' / 'ketu',
+    the node the Moon is at), 'sidereal_longitude' and 'rashi' of the Moon, plus 'central', 'gamma'
+    and 'magnitude' (solar) or 'umbral_magnitude' and 'penumbral_magnitude' (lunar)}].
+    """
+    kinds = list(kinds or KINDS)
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown:
+        raise ValueError(f"Unknown eclipse kind(s): {', '.join(unknown)}; use {', '.join(KINDS)}")
+    if start_year > end_year:
+        raise ValueError("end_year must not be before start_year")
+    # The first syzygies of TABLE_START_YEAR precede the limb index coverage
+    if start_year <= TABLE_START_YEAR or end_year > TABLE_END_YEAR:
+        raise ValueError(f"Years must fall in {TABLE_START_YEAR + 1}-{TABLE_END_YEAR}")
+    try:
+        tz = pytz.timezone(timezone_str)
+    except pytz.UnknownTimeZoneError:
+        raise ValueError(f"Unknown timezone: {timezone_str}")
+
+    eclipses = [e for e in _eclipses_for_years(start_year, end_year) if e[1] in kinds]
+    if not eclipses:
+        return []
+
+    t = ts.tt_jd(np.array([e[0] for e in eclipses]))
+    observer = earth.at(t)
+    moon_lon = (observer.observe(moon).ecliptic_latlon()[1].degrees - get_ayanamsha(t.tt)) % 360
+    rahu = (mean_node_longitude(t.tt) - get_ayanamsha(t.tt)) % 360
+    at_rahu = np.abs((moon_lon - rahu + 180) % 360 - 180) < 90
+
+    results = []
+    for i, (_, kind, eclipse_type, details) in enumerate(eclipses):
+        results.append({
+            "kind": kind,
+            "type": eclipse_type,
+            "time": t[i].utc_datetime().astimezone(tz).replace(microsecond=0).isoformat(),
+            "node": "rahu" if at_rahu[i] else "ketu",
+            "sidereal_longitude": round(float(moon_lon[i]), 4),
+            "rashi": int(moon_lon[i] // 30),
+            **details,
+        })
+    return results
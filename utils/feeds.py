@@ -0,0 +1,203 @@
+"""
+Subscribable Calendar Feeds (v6.1)
+GET-able webcal feeds whose URL token encodes the event parameters.
+
+Computed occurrences are persisted per feed and only extended when the horizon
+(current year + FEED_HORIZON_YEARS) advances, so a steady-state subscriber polling
+every few hours costs one small JSON read and, usually, a 304 Not Modified.
+
+Tokens are signed with the app secret (itsdangerous), so only feeds minted by
+POST /api/v2/feeds are served, and the store keeps at most FEED_CACHE_MAX_FEEDS
+files, evicting the least recently read.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytz
+from itsdangerous import BadData, URLSafeSerializer
+
+FEED_CACHE_DIR = Path(os.environ.get("FEED_CACHE_DIR", "cache/feeds"))
+FEED_HORIZON_YEARS = int(os.environ.get("FEED_HORIZON_YEARS", 10))
+FEED_CACHE_MAX_FEEDS = int(os.environ.get("FEED_CACHE_MAX_FEEDS", 10000))
+FEED_STATE_VERSION = 1
+SECRET_KEY_FILE = Path(os.environ.get("SECRET_KEY_FILE", "cache/secret_key"))
+
+# Short keys keep the URL token compact
+_TOKEN_FIELDS = {
+    "c": "calendar",
+    "d": "date",
+    "t": "time",
+    "l": "location",
+    "n": "title",
+    "g": "lang",
+}
+
+
+def load_secret_key(path=SECRET_KEY_FILE):
+    """
+    App secret for deployments without SECRET_KEY: read from a key file, created once so every
+    worker and restart signs feed tokens with the same key. The key is written to a private temp
+    file and hard-linked into place, so a racing worker never reads a partial key.
+    """
+    path = Path(path)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="ascii") as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp)
+    return path.read_text(encoding="ascii").strip()
+
+
+def _serializer(secret_key):
+    return URLSafeSerializer(secret_key, salt="feed-token")
+
+
+def encode_feed_token(params, secret_key):
+    """Encodes event parameters into a signed, URL-safe feed token."""
+    compact = {short: params[name] for short, name in _TOKEN_FIELDS.items() if params.get(name)}
+    return _serializer(secret_key).dumps(compact)
+
+
+def decode_feed_token(token, secret_key):
+    """
+    Decodes a feed token back into event parameters.
+    Raises ValueError on a malformed token or one not signed with `secret_key`.
+    """
+    try:
+        compact = _serializer(secret_key).loads(token)
+    except BadData:
+        raise ValueError("Invalid feed token")
+    if not isinstance(compact, dict):
+        raise ValueError("Malformed feed token")
+
+    params = {name: compact.get(short) for short, name in _TOKEN_FIELDS.items()}
+    if not all([params["date"], params["time"], params["location"]]):
+        raise ValueError("Feed token is missing date, time or location")
+    datetime.strptime(f"{params['date']} {params['time']}", "%Y-%m-%d %H:%M")
+    params["calendar"] = params["calendar"] or "panchanga"
+    params["lang"] = params["lang"] or "EN"
+    params["title"] = params["title"] or f"{params['calendar'].capitalize()} Event"
+    return params
+
+
+def get_feed_id(params):
+    """Stable cache key for a feed (independent of token encoding details)."""
+    data = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+class FeedCache:
+    """
+    Persistent per-feed occurrence store (one JSON file per feed), bounded to `max_feeds`
+    files; reads refresh a file's mtime, and the stalest files go first.
+    """
+
+    def __init__(self, cache_dir=FEED_CACHE_DIR, max_feeds=FEED_CACHE_MAX_FEEDS):
+        self.cache_dir = Path(cache_dir)
+        self.max_feeds = max_feeds
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, feed_id):
+        with self._locks_guard:
+            return self._locks.setdefault(feed_id, threading.Lock())
+
+    def _path(self, feed_id):
+        return self.cache_dir / f"{feed_id}.json"
+
+    def load(self, feed_id):
+        path = self._path(feed_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return state if state.get("version") == FEED_STATE_VERSION else None
+
+    def save(self, feed_id, state):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(feed_id)
+        is_new = not path.exists()
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        if is_new:
+            self._evict(keep=path)
+
+    def _evict(self, keep):
+        """Removes the least recently read feeds beyond max_feeds (other workers may race; that is harmless)."""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort()
+        for _, path in files[:max(0, len(files) - self.max_feeds)]:
+            if path != keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def get_state(self, params, engine, horizon_years=FEED_HORIZON_YEARS):
+        """
+        Returns the feed state, extending the stored occurrences only if the horizon advanced.
+        State: {"occurrences": [{"datetime", "report"}], "searched_through": year, "last_modified": iso}.
+        """
+        feed_id = get_feed_id(params)
+        target_year = datetime.now(pytz.utc).year + horizon_years
+
+        with self._lock_for(feed_id):
+            state = self.load(feed_id)
+            if state and state["searched_through"] >= target_year:
+                return feed_id, state
+
+            if state is None:
+                state = {"version": FEED_STATE_VERSION, "occurrences": [], "searched_through": None}
+            from_year = (state["searched_through"] + 1) if state["searched_through"] else datetime.now(pytz.utc).year
+
+            new_occurrences = engine.feed_occurrences(
+                params["date"], params["time"], params["location"], params["lang"], from_year, target_year
+            )
+            known = {o["datetime"] for o in state["occurrences"]}
+            for occ in new_occurrences:
+                stamp = occ["datetime"].isoformat()
+                if stamp not in known:
+                    state["occurrences"].append({"datetime": stamp, "report": occ["report"]})
+                    known.add(stamp)
+            state["occurrences"].sort(key=lambda o: o["datetime"])
+            state["searched_through"] = target_year
+            state["last_modified"] = datetime.now(pytz.utc).replace(microsecond=0).isoformat()
+            self.save(feed_id, state)
+            return feed_id, state
+
+
+def state_occurrences(state):
+    """Yields stored occurrences with their datetimes revived for the iCal writer."""
+    for occ in state["occurrences"]:
+        yield {"datetime": datetime.fromisoformat(occ["datetime"]), "report": occ["report"]}
+
+
+# Singleton instance for easy import
+feed_cache = FeedCache()
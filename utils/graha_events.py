@@ -0,0 +1,189 @@
+"""
+Vakra and Asta Finder (v6.1)
+Retrograde stations (vakra) and combustion windows (asta) of the five tara-grahas - Mars,
+Mercury, Jupiter, Venus, Saturn - over a date range.
+
+One Earth-observer pass samples every planet and the Sun once a day over the whole span. A
+station is a sign change of the daily motion, a combustion boundary a sign change of
+(planet-Sun separation - orb); every bracket found is then refined at once by a vectorized
+Illinois (regula falsi) iteration, so the cost depends on the span and not on the number of
+events. Events are cached per calendar year; missing years are computed in one batch.
+"""
+
+from collections import OrderedDict
+from datetime import timedelta
+import threading
+
+import numpy as np
+import pytz
+
+from utils.astronomy import eph, earth, sun, ts, get_ayanamsha, get_ephemeris_years, illinois_roots, wrap_angle
+from utils.grahas import GRAHAS
+
+PLANETS = ("mars", "mercury", "jupiter", "venus", "saturn")
+# Combustion orbs in degrees of longitude from the Sun: (direct, retrograde)
+COMBUSTION_ORBS = {
+    "mars": (17.0, 17.0),
+    "mercury": (14.0, 12.0),
+    "jupiter": (11.0, 11.0),
+    "venus": (10.0, 8.0),
+    "saturn": (15.0, 15.0),
+}
+SAMPLE_DAYS = 1.0           # shorter than any retrograde loop or combustion window
+SPEED_STEP_DAYS = 0.05      # central difference for the motion at a refinement point
+EVENT_CACHE_YEARS = 300
+
+RETROGRADE = "retrograde"
+DIRECT = "direct"
+COMBUST = "combust"
+VISIBLE = "visible"
+
+_bodies = {name: eph[GRAHAS[name][0]] for name in PLANETS}
+_years = OrderedDict()
+_years_lock = threading.Lock()
+
+
+def graha_longitudes(jd_tt, names):
+    """Sidereal geocentric longitudes of `names` ('sun' or planets) from one observer evaluation."""
+    t = ts.tt_jd(jd_tt)
+    observer = earth.at(t)
+    ayanamsha = get_ayanamsha(t.tt)
+    bodies = {"sun": sun, **_bodies}
+    return {name: (observer.observe(bodies[name]).ecliptic_latlon()[1].degrees - ayanamsha) % 360 for name in names}
+
+
+def _speed(name, jd_tt):
+    steps = np.concatenate([jd_tt - SPEED_STEP_DAYS, jd_tt + SPEED_STEP_DAYS])
+    lons = graha_longitudes(steps, [name])[name]
+    return wrap_angle(lons[len(jd_tt):] - lons[:len(jd_tt)]) / (2 * SPEED_STEP_DAYS)
+
+
+def _compute_events(start_jd, end_jd):
+    """
+    Every station and combustion boundary in [start_jd, end_jd) (TT): planet -> list of
+    (TT Julian date, kind, sidereal longitude), kind being RETROGRADE/DIRECT (stations) or
+    COMBUST/VISIBLE (entering/leaving combustion).
+    """
+    jd = np.arange(start_jd - SAMPLE_DAYS, end_jd + 2 * SAMPLE_DAYS, SAMPLE_DAYS)
+    samples = graha_longitudes(jd, ("sun",) + PLANETS)
+    events = {}
+    for name in PLANETS:
+        lons = samples[name]
+        motion = wrap_angle(np.diff(lons))           # motion over [jd[k], jd[k+1]]
+        retro = motion < 0
+
+        # Stations: the motion changes sign between consecutive sample intervals
+        k = np.nonzero(retro[1:] != retro[:-1])[0]
+        lo, hi = jd[k], jd[k + 2]
+        station_jd = illinois_roots(lambda x: _speed(name, x), lo, hi, _speed(name, lo), _speed(name, hi)) if len(k) else np.array([])
+        station_kind = np.where(retro[k + 1], RETROGRADE, DIRECT)
+
+        # Combustion: separation from the Sun crosses the orb (retrograde orb while retrograde)
+        orbs = np.where(retro, COMBUSTION_ORBS[name][1], COMBUSTION_ORBS[name][0])
+        gap = np.abs(wrap_angle(lons[:-1] - samples["sun"][:-1])) - orbs
+        gap_next = np.abs(wrap_angle(lons[1:] - samples["sun"][1:])) - orbs
+        c = np.nonzero(np.sign(gap) != np.sign(gap_next))[0]
+
+        def separation(x, orb=orbs[c]):
+            both = graha_longitudes(x, ["sun", name])
+            return np.abs(wrap_angle(both[name] - both["sun"])) - orb
+
+        combust_jd = illinois_roots(separation, jd[c], jd[c + 1], gap[c], gap_next[c]) if len(c) else np.array([])
+        combust_kind = np.where(gap[c] > 0, COMBUST, VISIBLE)
+
+        times = np.concatenate([station_jd, combust_jd])
+        kinds = np.concatenate([station_kind, combust_kind])
+        keep = (times >= start_jd) & (times < end_jd)
+        times, kinds = times[keep], kinds[keep]
+        lon_at = graha_longitudes(times, [name])[name] if len(times) else np.array([])
+        order = np.argsort(times)
+        events[name] = [(float(times[i]), str(kinds[i]), float(lon_at[i])) for i in order]
+    return events
+
+
+def _year_jd(year):
+    return float(ts.utc(year, 1, 1).tt)
+
+
+def _events_for_years(first_year, last_year):
+    """Per-planet events of every year in [first_year, last_year]; uncached years in one batch."""
+    with _years_lock:
+        missing = [y for y in range(first_year, last_year + 1) if y not in _years]
+    if missing:
+        computed = _compute_events(_year_jd(missing[0]), _year_jd(missing[-1] + 1))
+        with _years_lock:
+            for year in range(missing[0], missing[-1] + 1):
+                lo, hi = _year_jd(year), _year_jd(year + 1)
+                _years[year] = {name: [e for e in events if lo <= e[0] < hi] for name, events in computed.items()}
+            while len(_years) > EVENT_CACHE_YEARS:
+                _years.popitem(last=False)
+
+    with _years_lock:
+        years = [_years[y] for y in range(first_year, last_year + 1)]
+    return {name: [e for year in years for e in year[name]] for name in PLANETS}
+
+
+def _state_at(jd_tt, name):
+    """(retrograde, combust) at one instant."""
+    speed = _speed(name, np.array([jd_tt]))[0]
+    both = graha_longitudes(np.array([jd_tt]), ["sun", name])
+    orb = COMBUSTION_ORBS[name][1 if speed < 0 else 0]
+    return speed < 0, abs(wrap_angle(both[name][0] - both["sun"][0])) < orb
+
+
+def find_graha_events(start_date, end_date, planets=None, timezone_str="UTC"):
+    """
+    Stations and retrograde/combustion periods of each planet between two dates (inclusive, UTC days).
+    Returns {planet: {'graha', 'stations': [{'type', 'time', 'sidereal_longitude', 'rashi'}],
+    'retrograde_periods': [{'start', 'end'}], 'combustion_periods': [{'start', 'end'}]}} with ISO
+    times in `timezone_str`; a period already running at the start (or still running at the end)
+    of the range has start (end) None.
+    """
+    planets = list(planets or PLANETS)
+    unknown = [p for p in planets if p not in PLANETS]
+    if unknown:
+        raise ValueError(f"Unknown planet(s): {', '.join(unknown)}; use {', '.join(PLANETS)}")
+    first_year, last_year = get_ephemeris_years()
+    if start_date.year < first_year or end_date.year > last_year:
+        raise ValueError(f"Dates must fall in {first_year}-{last_year}")
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    try:
+        tz = pytz.timezone(timezone_str)
+    except pytz.UnknownTimeZoneError:
+        raise ValueError(f"Unknown timezone: {timezone_str}")
+
+    start_jd = float(ts.utc(start_date.year, start_date.month, start_date.day).tt)
+    after = end_date + timedelta(days=1)
+    end_jd = float(ts.utc(after.year, after.month, after.day).tt)
+    by_planet = _events_for_years(start_date.year, end_date.year)
+
+    def stamp(jd):
+        return ts.tt_jd(jd).utc_datetime().astimezone(tz).replace(microsecond=0).isoformat()
+
+    results = {}
+    for name in planets:
+        events = [e for e in by_planet[name] if start_jd <= e[0] < end_jd]
+        retro, combust = _state_at(start_jd, name)
+        open_period = {RETROGRADE: {"start": None} if retro else None, COMBUST: {"start": None} if combust else None}
+        periods = {RETROGRADE: [], COMBUST: []}
+        stations = []
+        for jd, kind, lon in events:
+            if kind in (RETROGRADE, DIRECT):
+                stations.append({"type": kind, "time": stamp(jd), "sidereal_longitude": round(lon, 4), "rashi": int(lon // 30)})
+            key = RETROGRADE if kind in (RETROGRADE, DIRECT) else COMBUST
+            if kind in (RETROGRADE, COMBUST):
+                open_period[key] = {"start": stamp(jd)}
+            elif open_period[key] is not None:
+                periods[key].append({**open_period[key], "end": stamp(jd)})
+                open_period[key] = None
+        for key, period in open_period.items():
+            if period is not None:
+                periods[key].append({**period, "end": None})
+        results[name] = {
+            "graha": GRAHAS[name][1],
+            "stations": stations,
+            "retrograde_periods": periods[RETROGRADE],
+            "combustion_periods": periods[COMBUST],
+        }
+    return results
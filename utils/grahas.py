@@ -0,0 +1,132 @@
+"""
+Graha Snapshot (v6.1)
+Positions of every classical graha (Sun, Moon, Mars, Mercury, Jupiter, Venus, Saturn, the mean
+lunar nodes Rahu and Ketu) plus Uranus and Neptune at one instant, from a single batched
+evaluation: every body is computed over one three-instant Skyfield Time (the instant and
+SPEED_STEP_DAYS either side), so positions and speeds come out of the same pass.
+
+Per graha: geocentric sidereal (Lahiri) and tropical ecliptic longitude, latitude, distance,
+speed in degrees/day and a retrograde flag; per planet (and Earth): heliocentric ecliptic
+position for the solar-system view. Snapshots are cached per instant, so the fact cards
+(get_angular_data) and the renderer (generate_solar_system) of one request share one pass.
+"""
+
+from collections import OrderedDict
+import threading
+
+import numpy as np
+import pytz
+from skyfield.framelib import ecliptic_frame
+
+from utils.astronomy import eph, earth, sun, ts, get_ayanamsha
+
+SPEED_STEP_DAYS = 0.25
+SNAPSHOT_CACHE_SIZE = 256
+
+# key: (ephemeris target, Sanskrit name); in Vara-lord order, then the outer planets
+GRAHAS = OrderedDict([
+    ("sun", ("sun", "Surya")),
+    ("moon", ("moon", "Chandra")),
+    ("mars", ("mars", "Mangala")),
+    ("mercury", ("mercury", "Budha")),
+    ("jupiter", ("jupiter barycenter", "Guru")),
+    ("venus", ("venus", "Shukra")),
+    ("saturn", ("saturn barycenter", "Shani")),
+    ("uranus", ("uranus barycenter", "Aruna")),
+    ("neptune", ("neptune barycenter", "Varuna")),
+])
+NODES = OrderedDict([("rahu", "Rahu"), ("ketu", "Ketu")])
+HELIOCENTRIC_BODIES = ("mercury", "venus", "earth", "mars", "jupiter", "saturn", "uranus", "neptune")
+
+_bodies = {name: eph[target] for name, (target, _) in GRAHAS.items()}
+_bodies["earth"] = earth
+_snapshots = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def mean_node_longitude(jd_tt):
+    """Tropical longitude of the mean ascending lunar node (Rahu), degrees; jd_tt may be an array."""
+    T = (np.asarray(jd_tt) - 2451545.0) / 36525.0
+    return (125.0445479 - 1934.1362891 * T + 0.0020754 * T**2 + 0.000002139 * T**3 - 0.0000000165 * T**4) % 360
+
+
+def _speed(longitudes):
+    """Central-difference speed (degrees/day) from longitudes at t - step, t, t + step."""
+    return float(((longitudes[2] - longitudes[0] + 180) % 360 - 180) / (2 * SPEED_STEP_DAYS))
+
+
+def _compute_snapshot(utc_dt):
+    t0 = ts.from_datetime(utc_dt)
+    t = ts.tt_jd(t0.tt + np.array([-SPEED_STEP_DAYS, 0.0, SPEED_STEP_DAYS]))
+    ayanamsha = get_ayanamsha(t.tt)
+    observer = earth.at(t)
+
+    grahas = OrderedDict()
+    for name, (_, graha) in GRAHAS.items():
+        lat, lon, distance = observer.observe(_bodies[name]).ecliptic_latlon()
+        sidereal = (lon.degrees - ayanamsha) % 360
+        speed = _speed(lon.degrees)
+        grahas[name] = {
+            "graha": graha,
+            "sidereal_longitude": round(float(sidereal[1]), 4),
+            "tropical_longitude": round(float(lon.degrees[1]), 4),
+            "latitude": round(float(lat.degrees[1]), 4),
+            "distance_au": round(float(distance.au[1]), 6),
+            "speed": round(speed, 4),
+            "retrograde": speed < 0,
+            "rashi": int(sidereal[1] // 30),
+        }
+
+    rahu = mean_node_longitude(t.tt)
+    for name, graha in NODES.items():
+        tropical = rahu if name == "rahu" else (rahu + 180) % 360
+        sidereal = (tropical - ayanamsha) % 360
+        speed = _speed(tropical)
+        grahas[name] = {
+            "graha": graha,
+            "sidereal_longitude": round(float(sidereal[1]), 4),
+            "tropical_longitude": round(float(tropical[1]), 4),
+            "latitude": 0.0,
+            "distance_au": None,
+            "speed": round(speed, 4),
+            "retrograde": speed < 0,
+            "rashi": int(sidereal[1] // 30),
+        }
+
+    sun_at = sun.at(t0)
+    heliocentric = OrderedDict()
+    for name in HELIOCENTRIC_BODIES:
+        x, y, z = sun_at.observe(_bodies[name]).frame_xyz(ecliptic_frame).au
+        heliocentric[name] = {
+            "x": float(x), "y": float(y), "z": float(z),
+            "longitude": round(float(np.degrees(np.arctan2(y, x)) % 360), 4),
+            "distance_au": round(float(np.sqrt(x * x + y * y + z * z)), 6),
+        }
+
+    return {
+        "utc": utc_dt.astimezone(pytz.utc).isoformat(),
+        "ayanamsha": round(float(ayanamsha[1]), 4),
+        "grahas": grahas,
+        "heliocentric": heliocentric,
+    }
+
+
+def get_graha_snapshot(utc_dt):
+    """
+    Snapshot of all grahas at a timezone-aware datetime (see module docstring):
+    {'utc', 'ayanamsha', 'grahas': {name: {...}}, 'heliocentric': {name: {x, y, z, longitude, distance_au}}}.
+    The returned dict is shared with the cache; do not modify it.
+    """
+    key = utc_dt.timestamp()
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            _snapshots.move_to_end(key)
+            return snapshot
+
+    snapshot = _compute_snapshot(utc_dt)
+    with _snapshots_lock:
+        _snapshots[key] = snapshot
+        while len(_snapshots) > SNAPSHOT_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+    return snapshot
@@ -1,20 +1,92 @@
-from ics import Calendar, Event
-from datetime import timedelta
+from datetime import datetime, timedelta
+import hashlib
 import pytz
 
+# Lightweight RFC 5545 writer (v6.1)
+# Streams VEVENTs straight from an iterable of occurrences, one chunk per event,
+# instead of building an ics.Calendar object graph and serializing it at once.
+# Output parses to the same events as the ics-library output (see verify_ical_parity.py).
+
+CRLF = "\r\n"
+PRODID = "-//Ancient Calendars//Cosmic Explorer//EN"
+
+def _escape_text(value):
+    """Escapes a TEXT property value (RFC 5545 section 3.3.11)."""
+    return (str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def _fold(line):
+    """Folds a content line at 75 octets (RFC 5545 section 3.1), never splitting a UTF-8 character."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + CRLF
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return (CRLF + " ").join(parts) + CRLF
+
+def _utc_stamp(dt):
+    return dt.astimezone(pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def _duration(td):
+    seconds = int(td.total_seconds())
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    out = "PT"
+    if hours:
+        out += f"{hours}H"
+    if minutes:
+        out += f"{minutes}M"
+    if secs or out == "PT":
+        out += f"{secs}S"
+    return out
+
+def format_vevent(title, occurrence, dtstamp, duration=timedelta(hours=1)):
+    """
+    Serializes one occurrence ({'datetime', 'report'}) as a VEVENT block.
+    An occurrence may carry its own 'title' (combined calendars); otherwise the calendar title is used.
+    The UID is derived from title + start so re-downloads and feed refreshes update instead of duplicating.
+    """
+    title = occurrence.get("title", title)
+    start = occurrence["datetime"]
+    uid = hashlib.sha1(f"{title}|{_utc_stamp(start)}".encode("utf-8")).hexdigest()
+    return "".join([
+        "BEGIN:VEVENT" + CRLF,
+        _fold(f"UID:{uid}@ancient-calendars"),
+        "DTSTAMP:" + dtstamp + CRLF,
+        "DTSTART:" + _utc_stamp(start) + CRLF,
+        "DURATION:" + _duration(duration) + CRLF,
+        _fold("SUMMARY:" + _escape_text(title)),
+        _fold("DESCRIPTION:" + _escape_text(occurrence["report"])),
+        "END:VEVENT" + CRLF,
+    ])
+
+def stream_ical_content(title, occurrences, duration=timedelta(hours=1), dtstamp=None, calendar_name=None):
+    """
+    Yields iCal (.ics) content chunk by chunk for an iterable of occurrences.
+    Memory stays constant however long the recurrence horizon is.
+    Subscription feeds pass a fixed `dtstamp` (their last-modified time) so the body is byte-stable,
+    and a `calendar_name` for the client's calendar list.
+    """
+    dtstamp = _utc_stamp(dtstamp or datetime.now(pytz.utc))
+    header = "BEGIN:VCALENDAR" + CRLF + "VERSION:2.0" + CRLF + "PRODID:" + PRODID + CRLF
+    if calendar_name:
+        header += _fold("X-WR-CALNAME:" + _escape_text(calendar_name))
+        header += "REFRESH-INTERVAL;VALUE=DURATION:PT12H" + CRLF + "X-PUBLISHED-TTL:PT12H" + CRLF
+    yield header
+    for occurrence in occurrences:
+        yield format_vevent(title, occurrence, dtstamp, duration)
+    yield "END:VCALENDAR" + CRLF
+
 def create_ical_content(title, occurrences):
     """
     Creates iCal content (.ics) for a list of occurrences.
     Each occurrence is a dict with 'datetime' and 'report'.
     """
-    c = Calendar()
-    
-    for occurrence in occurrences:
-        e = Event()
-        e.name = title
-        e.begin = occurrence["datetime"]
-        e.duration = timedelta(hours=1) # Standard 1 hour event
-        e.description = occurrence["report"]
-        c.events.add(e)
-        
-    return c.serialize()
+    return "".join(stream_ical_content(title, occurrences))
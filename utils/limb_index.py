@@ -0,0 +1,290 @@
+"""
+Global Limb-Transition Index (v6.1)
+Every tithi, karana, nakshatra and yoga transition from TABLE_START_YEAR to TABLE_END_YEAR.
+
+The limbs depend only on the sidereal Sun and Moon, so their transitions are location
+independent UTC events that can be computed once. The builder samples the Chebyshev tables
+(utils.sidereal_tables) and refines each crossing by vectorized bisection; the result is one
+memory-mapped structured array of (utc timestamp, limb, index) rows, grouped by limb and sorted
+by time within each limb. "Which value is active at t, since when, until when" is then a
+binary search, with no ephemeris evaluation at request time.
+
+Built offline like the Chebyshev tables, with `python -m utils.limb_index`; requests only load it.
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+from utils.sidereal_tables import TABLE_DIR, TABLE_START_YEAR, TABLE_END_YEAR, TableUnavailableError, get_tables
+
+INDEX_VERSION = 1
+SAMPLE_DAYS = 0.2            # shorter than any limb (shortest karana ~0.4 day), so one crossing per step at most
+BISECTION_STEPS = 36         # 0.2 day / 2**36 ~ 0.25 microseconds
+VERIFY_WINDOW_SECONDS = 1.0   # DE421 must agree with every sampled transition this far either side
+
+# limb: (sidereal quantity, width in degrees)
+LIMBS = {
+    "tithi": ("elongation", 12.0),
+    "karana": ("elongation", 6.0),
+    "nakshatra": ("moon", 360 / 27),
+    "yoga": ("yoga", 360 / 27),
+}
+LIMB_NAMES = tuple(LIMBS)
+
+EVENT_DTYPE = np.dtype([("time", "<f8"), ("limb", "u1"), ("index", "u1")])
+
+_INDEX_NAME = "limb_transitions"
+
+
+def _index_paths(table_dir):
+    table_dir = Path(table_dir)
+    return table_dir / f"{_INDEX_NAME}.npy", table_dir / f"{_INDEX_NAME}.json"
+
+
+def _quantity(tables, jd_tt, quantity):
+    """Sidereal elongation, Moon or Sun + Moon (yoga) in degrees, 0-360."""
+    if quantity == "yoga":
+        return (tables.longitudes(jd_tt, "sun") + tables.longitudes(jd_tt, "moon")) % 360
+    return tables.longitudes(jd_tt, quantity)
+
+
+def find_crossings(tables, quantity, width, start_jd, end_jd):
+    """(TT Julian dates, new index) of every boundary of `quantity` at multiples of `width`."""
+    jd = np.arange(start_jd, end_jd, SAMPLE_DAYS)
+    # All limb quantities increase monotonically; unwrapping makes them continuous
+    values = np.degrees(np.unwrap(np.radians(_quantity(tables, jd, quantity))))
+    counts = np.floor(values / width)
+    steps = np.nonzero(np.diff(counts))[0]
+    if np.any(np.diff(counts) > 1):
+        raise RuntimeError(f"SAMPLE_DAYS too long for {quantity}/{width}")
+
+    targets = counts[steps + 1] * width
+    lo, hi = jd[steps], jd[steps + 1]
+    base = values[steps]
+    for _ in range(BISECTION_STEPS):
+        mid = (lo + hi) / 2
+        # Unwrap the midpoint value relative to the bracket start
+        value = base + (_quantity(tables, mid, quantity) - base) % 360
+        below = value < targets
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+
+    indices = (counts[steps + 1] % round(360 / width)).astype(np.uint8)
+    return (lo + hi) / 2, indices
+
+
+class LimbIndex:
+    """A loaded (memory-mapped) transition index with per-limb binary search."""
+
+    def __init__(self, events, header):
+        self.events = events
+        self.header = header
+        self._slices = {limb: slice(*header["offsets"][limb]) for limb in LIMB_NAMES}
+
+    def events_of(self, limb):
+        """The (time, limb, index) rows of one limb, sorted by time."""
+        if limb not in self._slices:
+            raise ValueError(f"Unknown limb: {limb}")
+        return self.events[self._slices[limb]]
+
+    def covers(self, start_utc, end_utc=None):
+        first, last = self.header["coverage"]
+        end_utc = end_utc or start_utc
+        return first <= start_utc.timestamp() and end_utc.timestamp() < last
+
+    def active(self, when_utc, limb):
+        """
+        The value of `limb` active at `when_utc`:
+        {'limb', 'index' (0-based), 'start', 'end'} with UTC datetimes. Raises ValueError outside the index.
+        """
+        events = self.events_of(limb)
+        times = events["time"]
+        stamp = when_utc.timestamp()
+        pos = int(np.searchsorted(times, stamp, side="right")) - 1
+        if pos < 0 or pos + 1 >= len(times):
+            raise ValueError(f"Outside the limb index ({TABLE_START_YEAR}-{TABLE_END_YEAR})")
+        return {
+            "limb": limb,
+            "index": int(events["index"][pos]),
+            "start": datetime.fromtimestamp(float(times[pos]), pytz.utc),
+            "end": datetime.fromtimestamp(float(times[pos + 1]), pytz.utc),
+        }
+
+    def active_all(self, when_utc):
+        """active() for every limb, keyed by limb name."""
+        return {limb: self.active(when_utc, limb) for limb in LIMB_NAMES}
+
+    def transitions(self, start_utc, end_utc, limb):
+        """
+        Transitions of `limb` in [start_utc, end_utc): (index active at start, [UTC datetimes],
+        NumPy array of the index beginning at each) - the find_tithi_transitions contract.
+        """
+        events = self.events_of(limb)
+        times = events["time"]
+        lo = int(np.searchsorted(times, start_utc.timestamp(), side="right"))
+        hi = int(np.searchsorted(times, end_utc.timestamp(), side="left"))
+        if lo == 0 or hi >= len(times):
+            raise ValueError(f"Outside the limb index ({TABLE_START_YEAR}-{TABLE_END_YEAR})")
+        selected = events[lo:hi]
+        return (int(events["index"][lo - 1]),
+                [datetime.fromtimestamp(float(t), pytz.utc) for t in selected["time"]],
+                np.asarray(selected["index"], dtype=int))
+
+    def periods(self, start_utc, end_utc, limb):
+        """
+        The values of `limb` over [start_utc, end_utc) as (starts, ends, indices) NumPy arrays,
+        times as UTC POSIX timestamps, the first and last periods clipped to the window.
+        """
+        events = self.events_of(limb)
+        times = events["time"]
+        start, end = start_utc.timestamp(), end_utc.timestamp()
+        lo = int(np.searchsorted(times, start, side="right"))
+        hi = int(np.searchsorted(times, end, side="left"))
+        if lo == 0 or hi >= len(times):
+            raise ValueError(f"Outside the limb index ({TABLE_START_YEAR}-{TABLE_END_YEAR})")
+        bounds = np.concatenate([[start], times[lo:hi], [end]])
+        return bounds[:-1], bounds[1:], np.asarray(events["index"][lo - 1:hi], dtype=int)
+
+
+def get_limb_periods(when_utc, timezone_str):
+    """
+    Start and end (local '%Y-%m-%d %H:%M:%S') of the tithi, karana, nakshatra and yoga active at
+    `when_utc`, keyed by limb; None outside the index or if it is unavailable.
+    """
+    try:
+        index = get_limb_index()
+        if not index.covers(when_utc):
+            return None
+        tz = pytz.timezone(timezone_str)
+        return {
+            limb: {
+                "start": period["start"].astimezone(tz).strftime('%Y-%m-%d %H:%M:%S'),
+                "end": period["end"].astimezone(tz).strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            for limb, period in index.active_all(when_utc).items()
+        }
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"⚠️ Limb index unavailable: {e}")
+        return None
+
+
+def build_index(table_dir=TABLE_DIR):
+    """
+    Computes every transition from the Chebyshev tables, verifies a sample against DE421
+    and writes the index atomically. Returns the number of events per limb.
+    """
+    from utils.astronomy import tt_to_unix
+    tables = get_tables()
+    start_jd, end_jd = tables.start_jd, tables.end_jd - SAMPLE_DAYS
+
+    parts, offsets, position = [], {}, 0
+    for code, (limb, (quantity, width)) in enumerate(LIMBS.items()):
+        jd, indices = find_crossings(tables, quantity, width, start_jd, end_jd)
+        part = np.empty(len(jd), dtype=EVENT_DTYPE)
+        part["time"] = tt_to_unix(jd)
+        part["limb"] = code
+        part["index"] = indices
+        parts.append(part)
+        offsets[limb] = [position, position + len(part)]
+        position += len(part)
+    events = np.concatenate(parts)
+
+    # Coverage: from the latest first event to the earliest last event, so every limb is known inside it
+    coverage = [max(float(p["time"][0]) for p in parts), min(float(p["time"][-1]) for p in parts)]
+    header = {
+        "version": INDEX_VERSION,
+        "tables": {key: tables.header[key] for key in ("version", "start_year", "end_year", "degree", "segment_days")},
+        "limbs": list(LIMB_NAMES),
+        "offsets": offsets,
+        "coverage": coverage,
+    }
+    mismatches = verify_index(LimbIndex(events, header))
+    if mismatches:
+        raise RuntimeError(f"Limb index disagrees with the ephemeris at {mismatches} sampled transitions")
+    header["verified_within_seconds"] = VERIFY_WINDOW_SECONDS
+
+    table_dir = Path(table_dir)
+    table_dir.mkdir(parents=True, exist_ok=True)
+    npy_path, json_path = _index_paths(table_dir)
+    tmp = npy_path.with_suffix(".tmp.npy")
+    np.save(tmp, events)
+    os.replace(tmp, npy_path)
+    tmp = json_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp, json_path)
+    return {limb: end - start for limb, (start, end) in offsets.items()}
+
+
+def verify_index(index, samples=500, seed=0):
+    """
+    Number of sampled transitions (per limb) where DE421 disagrees: VERIFY_WINDOW_SECONDS before a
+    transition the previous value must be active, and the indexed value the same time after it.
+    """
+    from utils.astronomy import ts, earth, sun, moon, get_ayanamsha
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    for limb, (quantity, width) in LIMBS.items():
+        events = index.events_of(limb)
+        picks = rng.integers(1, len(events), samples)
+        for offset in (-VERIFY_WINDOW_SECONDS, VERIFY_WINDOW_SECONDS):
+            t = ts.from_datetimes([datetime.fromtimestamp(float(s) + offset, pytz.utc) for s in events["time"][picks]])
+            observer = earth.at(t)
+            ayanamsha = get_ayanamsha(t.tt)
+            sun_lon = (observer.observe(sun).ecliptic_latlon()[1].degrees - ayanamsha) % 360
+            moon_lon = (observer.observe(moon).ecliptic_latlon()[1].degrees - ayanamsha) % 360
+            value = {"elongation": (moon_lon - sun_lon) % 360, "moon": moon_lon,
+                     "yoga": (sun_lon + moon_lon) % 360}[quantity]
+            expected = events["index"][picks] if offset > 0 else events["index"][picks - 1]
+            mismatches += int(np.count_nonzero((value // width).astype(int) != expected))
+    return mismatches
+
+
+def load_index(table_dir=TABLE_DIR):
+    """Memory-maps the index, or returns None if it is missing or was built from another table layout."""
+    npy_path, json_path = _index_paths(table_dir)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        tables = get_tables().header
+        expected = {key: tables[key] for key in ("version", "start_year", "end_year", "degree", "segment_days")}
+        if header.get("version") != INDEX_VERSION or header.get("tables") != expected:
+            return None
+        return LimbIndex(np.load(npy_path, mmap_mode="r"), header)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_limb_index():
+    """
+    Process-wide index, loaded on first use. Never built inside a request: raises
+    TableUnavailableError if it is missing (build it with `python -m utils.limb_index`).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = load_index()
+                if index is None:
+                    raise TableUnavailableError(f"Limb-transition index missing in {TABLE_DIR}; run python -m utils.limb_index")
+                _index = index
+    return _index
+
+
+if __name__ == "__main__":
+    table_dir = sys.argv[1] if len(sys.argv) > 1 else TABLE_DIR
+    counts = build_index(table_dir)
+    print(f"Limb-transition index written to {table_dir}")
+    for limb, count in counts.items():
+        print(f"   {limb:<10} {count} transitions")
@@ -1,12 +1,22 @@
+from functools import lru_cache
 from geopy.geocoders import Nominatim
 from timezonefinder import TimezoneFinder
 import pytz
 
-def get_location_details(location_name):
-    """
-    Given a city/location name, returns lat, lon, and timezone.
-    """
-    geolocator = Nominatim(user_agent="hindu_panchanga_converter", timeout=10)
+_geolocator = None
+_timezone_finder = None
+
+def _get_services():
+    """Geocoder and TimezoneFinder are built once per process (TimezoneFinder loads its polygon data)."""
+    global _geolocator, _timezone_finder
+    if _geolocator is None:
+        _geolocator = Nominatim(user_agent="hindu_panchanga_converter", timeout=10)
+        _timezone_finder = TimezoneFinder()
+    return _geolocator, _timezone_finder
+
+@lru_cache(maxsize=1024)
+def _resolve_location(location_name):
+    geolocator, tf = _get_services()
     location = geolocator.geocode(location_name)
     
     if not location:
@@ -15,14 +25,21 @@ def get_location_details(location_name):
     lat = location.latitude
     lon = location.longitude
     
-    tf = TimezoneFinder()
     timezone_str = tf.timezone_at(lng=lon, lat=lat)
     
     if not timezone_str:
          raise ValueError(f"Could not find timezone for location: {location_name}")
          
+    return (location.address, lat, lon, timezone_str)
+
+def get_location_details(location_name):
+    """
+    Given a city/location name, returns lat, lon, and timezone.
+    Lookups are memoized per process (failures are not), so repeated names skip the Nominatim round trip.
+    """
+    address, lat, lon, timezone_str = _resolve_location(location_name.strip())
     return {
-        "address": location.address,
+        "address": address,
         "latitude": lat,
         "longitude": lon,
         "timezone": timezone_str
@@ -0,0 +1,264 @@
+"""
+Sankranti and Lunation Index (v6.1)
+Every Sankranti (sidereal solar ingress) and every lunation (New Moon to New Moon) from
+TABLE_START_YEAR to TABLE_END_YEAR, each lunation labelled once with its Masa.
+
+Amanta months are named from the Sun's rashi at the New Moon that opens them (as in
+calculate_masa_name). Pairing lunations with Sankrantis adds what that rule alone cannot see:
+a lunation containing no Sankranti is Adhika (it repeats the name of the month after it), one
+containing two is Kshaya-bearing (the month named after the second ingress is lost), and the
+Samvatsara changes at the first lunation of Chaitra (Adhika Chaitra included) instead of on
+1 January. Looking up the Masa of an instant is then a binary search.
+
+Sankrantis are found from the Chebyshev tables like the limb transitions, New Moons are the
+tithi-0 transitions of the limb index (utils.limb_index). Built offline like both, with
+`python -m utils.lunation_index`; requests only load it.
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+from utils.sidereal_tables import TABLE_DIR, TABLE_START_YEAR, TABLE_END_YEAR, TableUnavailableError, get_tables
+from utils.limb_index import VERIFY_WINDOW_SECONDS, find_crossings, get_limb_index
+
+INDEX_VERSION = 1
+SAMVATSARA_EPOCH = 1987       # Chaitra 1987 opened Prabhava, the first of the 60 years
+CHAITRA = 0
+
+SANKRANTI_DTYPE = np.dtype([("time", "<f8"), ("rashi", "u1")])
+LUNATION_DTYPE = np.dtype([("start", "<f8"), ("end", "<f8"), ("masa", "u1"), ("adhika", "u1"),
+                           ("kshaya", "u1"), ("samvatsara", "u1")])
+
+_INDEX_NAME = "lunations"
+
+
+def _index_paths(table_dir):
+    table_dir = Path(table_dir)
+    return (table_dir / f"{_INDEX_NAME}.npy", table_dir / "sankrantis.npy", table_dir / f"{_INDEX_NAME}.json")
+
+
+def tables_key(tables):
+    """The Chebyshev table parameters an index was built from (a mismatch forces a rebuild)."""
+    return {key: tables.header[key] for key in ("version", "start_year", "end_year", "degree", "segment_days")}
+
+
+class LunationIndex:
+    """A loaded (memory-mapped) pair of Sankranti and lunation arrays with binary-search lookups."""
+
+    def __init__(self, lunations, sankrantis, header):
+        self.lunations = lunations
+        self.sankrantis = sankrantis
+        self.header = header
+
+    def covers(self, start_utc, end_utc=None):
+        first, last = self.header["coverage"]
+        end_utc = end_utc or start_utc
+        return first <= start_utc.timestamp() and end_utc.timestamp() < last
+
+    def positions(self, stamps):
+        """Row of the lunation containing each UTC POSIX timestamp (NumPy array). Raises ValueError outside."""
+        rows = np.searchsorted(self.lunations["start"], stamps, side="right") - 1
+        if np.any(rows < 0) or np.any(np.asarray(stamps) >= self.lunations["end"][-1]):
+            raise ValueError(f"Outside the lunation index ({TABLE_START_YEAR}-{TABLE_END_YEAR})")
+        return rows
+
+    def lunation(self, when_utc):
+        """
+        The lunation containing `when_utc`: {'start', 'end' (UTC datetimes), 'masa', 'adhika',
+        'kshaya', 'lost_masa', 'samvatsara'}, indices 0-based; 'lost_masa' is the Masa skipped in a
+        Kshaya lunation, else None.
+        """
+        row = self.lunations[int(self.positions(when_utc.timestamp()))]
+        masa = int(row["masa"])
+        return {
+            "start": datetime.fromtimestamp(float(row["start"]), pytz.utc),
+            "end": datetime.fromtimestamp(float(row["end"]), pytz.utc),
+            "masa": masa,
+            "adhika": bool(row["adhika"]),
+            "kshaya": bool(row["kshaya"]),
+            "lost_masa": (masa + 1) % 12 if row["kshaya"] else None,
+            "samvatsara": int(row["samvatsara"]),
+        }
+
+    def periods(self, start_utc, end_utc):
+        """
+        Lunations over [start_utc, end_utc) as (starts, ends, masa indices) NumPy arrays of UTC POSIX
+        timestamps, the first and last clipped to the window (the LimbIndex.periods contract).
+        """
+        start, end = start_utc.timestamp(), end_utc.timestamp()
+        lo, hi = self.positions(np.array([start, end]))
+        rows = self.lunations[lo:hi + 1]
+        starts = np.maximum(rows["start"], start)
+        ends = np.minimum(rows["end"], end)
+        return starts, ends, np.asarray(rows["masa"], dtype=int)
+
+    def sankranti(self, when_utc):
+        """The solar month containing `when_utc`: {'rashi' (0-based), 'start', 'end'} with UTC datetimes."""
+        times = self.sankrantis["time"]
+        pos = int(np.searchsorted(times, when_utc.timestamp(), side="right")) - 1
+        if pos < 0 or pos + 1 >= len(times):
+            raise ValueError(f"Outside the lunation index ({TABLE_START_YEAR}-{TABLE_END_YEAR})")
+        return {
+            "rashi": int(self.sankrantis["rashi"][pos]),
+            "start": datetime.fromtimestamp(float(times[pos]), pytz.utc),
+            "end": datetime.fromtimestamp(float(times[pos + 1]), pytz.utc),
+        }
+
+
+def get_lunation(when_utc):
+    """LunationIndex.lunation(when_utc), or None outside the index or if it is unavailable."""
+    try:
+        index = get_lunation_index()
+        if not index.covers(when_utc):
+            return None
+        return index.lunation(when_utc)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"⚠️ Lunation index unavailable: {e}")
+        return None
+
+
+def label_lunations(new_moons, sankranti_times, sankranti_rashis):
+    """
+    One LUNATION_DTYPE row per pair of consecutive New Moons (UTC timestamps) that follows the
+    first Sankranti: Masa from the Sun's rashi at the opening New Moon, Adhika/Kshaya from the
+    number of Sankrantis inside, Samvatsara counted from each year's first Chaitra.
+    """
+    new_moons = new_moons[new_moons > sankranti_times[0]]
+    opening = np.searchsorted(sankranti_times, new_moons, side="right")
+    rows = np.zeros(len(new_moons) - 1, dtype=LUNATION_DTYPE)
+    rows["start"], rows["end"] = new_moons[:-1], new_moons[1:]
+    # calculate_masa_name: Sun in Meena at the New Moon -> Chaitra, Mesha -> Vaishakha, ...
+    rows["masa"] = (sankranti_rashis[opening[:-1] - 1].astype(int) + 1) % 12
+    ingresses = np.diff(opening)
+    rows["adhika"] = ingresses == 0
+    rows["kshaya"] = ingresses >= 2
+
+    # A year opens at the first lunation named Chaitra, or at the Kshaya lunation that swallows it
+    opens = (rows["masa"] == CHAITRA) | (rows["kshaya"].astype(bool) & ((rows["masa"] + 1) % 12 == CHAITRA))
+    opens[1:] &= ~opens[:-1]
+    years = np.array([datetime.fromtimestamp(float(t), pytz.utc).year for t in rows["start"]])
+    year_start = np.maximum.accumulate(np.where(opens, np.arange(len(rows)), -1))
+    first_open = int(np.argmax(opens))
+    samvat_year = np.where(year_start >= 0, years[np.maximum(year_start, 0)], years[first_open] - 1)
+    rows["samvatsara"] = (samvat_year - SAMVATSARA_EPOCH) % 60
+    return rows
+
+
+def build_index(table_dir=TABLE_DIR):
+    """
+    Computes every Sankranti from the Chebyshev tables, labels the lunations of the limb index,
+    verifies a sample against DE421 and writes the arrays atomically. Returns the row counts.
+    """
+    from utils.astronomy import tt_to_unix
+    tables = get_tables()
+    limb_index = get_limb_index()
+    jd, rashis = find_crossings(tables, "sun", 30.0, tables.start_jd, tables.end_jd - 1.0)
+    sankrantis = np.empty(len(jd), dtype=SANKRANTI_DTYPE)
+    sankrantis["time"] = tt_to_unix(jd)
+    sankrantis["rashi"] = rashis
+
+    tithis = limb_index.events_of("tithi")
+    new_moons = np.asarray(tithis["time"][tithis["index"] == 0], dtype=np.float64)
+    lunations = label_lunations(new_moons, sankrantis["time"], sankrantis["rashi"])
+
+    header = {
+        "version": INDEX_VERSION,
+        "tables": tables_key(tables),
+        "coverage": [float(lunations["start"][0]), float(lunations["end"][-1])],
+        "counts": {"sankrantis": len(sankrantis), "lunations": len(lunations),
+                   "adhika": int(lunations["adhika"].sum()), "kshaya": int(lunations["kshaya"].sum())},
+    }
+    index = LunationIndex(lunations, sankrantis, header)
+    mismatches = verify_index(index)
+    if mismatches:
+        raise RuntimeError(f"Lunation index disagrees with the ephemeris at {mismatches} sampled points")
+    header["verified_within_seconds"] = VERIFY_WINDOW_SECONDS
+
+    table_dir = Path(table_dir)
+    table_dir.mkdir(parents=True, exist_ok=True)
+    lunation_path, sankranti_path, json_path = _index_paths(table_dir)
+    for path, rows in ((lunation_path, lunations), (sankranti_path, sankrantis)):
+        tmp = path.with_suffix(".tmp.npy")
+        np.save(tmp, rows)
+        os.replace(tmp, path)
+    tmp = json_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp, json_path)
+    return header["counts"]
+
+
+def verify_index(index, samples=500, seed=0):
+    """
+    Number of sampled points where DE421 disagrees: the Sun must be in the previous rashi
+    VERIFY_WINDOW_SECONDS before a Sankranti and in the indexed one after it, and
+    calculate_masa_name at a lunation's opening New Moon must give its Masa.
+    """
+    from utils.astronomy import ts, earth, sun, get_ayanamsha
+    from panchanga.calculations import calculate_masa_name
+    from data.panchanga_data import MASAS
+
+    def sun_longitudes(stamps):
+        t = ts.from_datetimes([datetime.fromtimestamp(float(s), pytz.utc) for s in stamps])
+        return (earth.at(t).observe(sun).ecliptic_latlon()[1].degrees - get_ayanamsha(t.tt)) % 360
+
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    picks = rng.integers(1, len(index.sankrantis), samples)
+    times, rashis = index.sankrantis["time"][picks], index.sankrantis["rashi"][picks]
+    mismatches += int(np.count_nonzero((sun_longitudes(times - VERIFY_WINDOW_SECONDS) // 30) != (rashis.astype(int) - 1) % 12))
+    mismatches += int(np.count_nonzero((sun_longitudes(times + VERIFY_WINDOW_SECONDS) // 30) != rashis))
+
+    picks = rng.integers(0, len(index.lunations), samples)
+    rows = index.lunations[picks]
+    names = [MASAS["EN"].index(calculate_masa_name(lon, 'EN')) for lon in sun_longitudes(rows["start"] + VERIFY_WINDOW_SECONDS)]
+    mismatches += int(np.count_nonzero(np.array(names) != rows["masa"]))
+    return mismatches
+
+
+def load_index(table_dir=TABLE_DIR):
+    """Memory-maps the index, or returns None if it is missing or was built from another table layout."""
+    lunation_path, sankranti_path, json_path = _index_paths(table_dir)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("version") != INDEX_VERSION or header.get("tables") != tables_key(get_tables()):
+            return None
+        return LunationIndex(np.load(lunation_path, mmap_mode="r"), np.load(sankranti_path, mmap_mode="r"), header)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_lunation_index():
+    """
+    Process-wide index, loaded on first use. Never built inside a request: raises
+    TableUnavailableError if it is missing (build it with `python -m utils.lunation_index`).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = load_index()
+                if index is None:
+                    raise TableUnavailableError(f"Lunation index missing in {TABLE_DIR}; run python -m utils.lunation_index")
+                _index = index
+    return _index
+
+
+if __name__ == "__main__":
+    table_dir = sys.argv[1] if len(sys.argv) > 1 else TABLE_DIR
+    counts = build_index(table_dir)
+    print(f"Sankranti/lunation index written to {table_dir}")
+    for name, count in counts.items():
+        print(f"   {name:<10} {count}")
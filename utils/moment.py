@@ -0,0 +1,26 @@
+from datetime import datetime
+import pytz
+from utils.location import get_location_details
+
+def resolve_moment(date_str, time_str, location_name):
+    """
+    Resolves an input date/time/place once (geocode, timezone, localize, UTC, Julian Day)
+    so several engines can share it instead of each repeating the work.
+    """
+    loc = get_location_details(location_name)
+    naive_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+    local_tz = pytz.timezone(loc["timezone"])
+    local_dt = local_tz.localize(naive_dt)
+    utc_dt = local_dt.astimezone(pytz.utc)
+
+    return {
+        "date": date_str,
+        "time": time_str,
+        "location": location_name,
+        "loc": loc,
+        "local_tz": local_tz,
+        "local_dt": local_dt,
+        "utc_dt": utc_dt,
+        # JD 2440587.5 is 1970-01-01 00:00:00 UTC
+        "julian_day": 2440587.5 + (utc_dt.timestamp() / 86400.0)
+    }
@@ -0,0 +1,274 @@
+"""
+Jupiter-Saturn Cycle Table (v6.1)
+The events behind the 60-year Samvatsara cycle from TABLE_START_YEAR to TABLE_END_YEAR:
+
+    Jupiter's sidereal sign ingresses (the Barhaspatya years), retrograde re-entries included,
+    each tagged with the Samvatsara running at that moment (utils.lunation_index);
+    Jupiter-Saturn great conjunctions, geocentric (as seen: one pass, or three around a
+    retrograde loop) and heliocentric (one every ~19.86 years, the positions the 3D visual uses).
+
+A coarse sweep samples the geocentric and heliocentric longitudes of both planets every
+SAMPLE_DAYS in one vectorized pass; every sign change found is refined by the Illinois iteration
+of utils.astronomy. The events fit in a few hundred rows, so the table is written once and
+then served whole. Built offline like the other tables, with `python -m utils.samvatsara_cycle`;
+requests only load it.
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+from utils.astronomy import eph, sun, ts, get_ayanamsha, illinois_roots, tt_to_unix, wrap_angle
+from utils.grahas import GRAHAS
+from utils.sidereal_tables import TABLE_DIR, TABLE_START_YEAR, TABLE_END_YEAR, TableUnavailableError, get_tables
+from utils.lunation_index import tables_key, get_lunation_index
+from utils.graha_events import graha_longitudes
+
+INDEX_VERSION = 1
+SAMPLE_DAYS = 2.0              # Jupiter's retrograde loops last ~4 months; one crossing per step at most
+VERIFY_WINDOW_SECONDS = 60.0   # Jupiter can be nearly stationary at an ingress
+
+INGRESS, CONJUNCTION, HELIOCENTRIC_CONJUNCTION = 0, 1, 2
+NO_SAMVATSARA = 255            # before the first lunation of the index
+# The resonance the cycle rests on: 5 Jupiter orbits ~ 2 Saturn orbits ~ 3 great conjunctions ~ 60 years
+CYCLE = {"years": 60, "jupiter_orbits": 5, "saturn_orbits": 2, "great_conjunctions": 3}
+
+EVENT_DTYPE = np.dtype([("time", "<f8"), ("kind", "u1"), ("rashi", "u1"), ("retrograde", "u1"),
+                        ("samvatsara", "u1"), ("longitude", "<f4")])
+
+_INDEX_NAME = "samvatsara_cycle"
+_jupiter = eph[GRAHAS["jupiter"][0]]
+_saturn = eph[GRAHAS["saturn"][0]]
+
+
+def _index_paths(table_dir):
+    table_dir = Path(table_dir)
+    return table_dir / f"{_INDEX_NAME}.npy", table_dir / f"{_INDEX_NAME}.json"
+
+
+def _heliocentric(jd_tt):
+    """Sidereal heliocentric longitudes of Jupiter and Saturn."""
+    t = ts.tt_jd(jd_tt)
+    origin = sun.at(t)
+    ayanamsha = get_ayanamsha(t.tt)
+    return tuple((origin.observe(body).ecliptic_latlon()[1].degrees - ayanamsha) % 360 for body in (_jupiter, _saturn))
+
+
+def _geocentric(jd_tt):
+    lons = graha_longitudes(jd_tt, ["jupiter", "saturn"])
+    return lons["jupiter"], lons["saturn"]
+
+
+def _conjunctions(jd, jupiter, saturn, positions):
+    """TT Julian dates and longitudes where Jupiter - Saturn passes through 0 (either direction)."""
+    gap = wrap_angle(jupiter - saturn)
+    k = np.nonzero((np.sign(gap[:-1]) != np.sign(gap[1:])) & (np.abs(gap[:-1]) < 90))[0]
+    if not len(k):
+        return np.array([]), np.array([])
+
+    def separation(x):
+        j, s = positions(x)
+        return wrap_angle(j - s)
+
+    when = illinois_roots(separation, jd[k], jd[k + 1], gap[k], gap[k + 1])
+    return when, positions(when)[0]
+
+
+def _ingresses(jd, jupiter):
+    """TT Julian dates, rashi entered and retrograde flag of every Jupiter sign change."""
+    values = np.degrees(np.unwrap(np.radians(jupiter)))
+    counts = np.floor(values / 30)
+    k = np.nonzero(np.diff(counts))[0]
+    retrograde = counts[k + 1] < counts[k]
+    boundary = np.maximum(counts[k], counts[k + 1]) * 30
+
+    def past_boundary(x, boundary=boundary % 360):
+        return wrap_angle(graha_longitudes(x, ["jupiter"])["jupiter"] - boundary)
+
+    when = illinois_roots(past_boundary, jd[k], jd[k + 1], values[k] - boundary, values[k + 1] - boundary)
+    return when, (counts[k + 1] % 12).astype(np.uint8), retrograde
+
+
+class SamvatsaraCycle:
+    """A loaded (memory-mapped) Jupiter-Saturn event table."""
+
+    def __init__(self, events, header):
+        self.events = events
+        self.header = header
+
+    def select(self, start_year, end_year, kind):
+        """Rows of `kind` in the calendar years [start_year, end_year]."""
+        start = datetime(start_year, 1, 1, tzinfo=pytz.utc).timestamp()
+        end = datetime(end_year + 1, 1, 1, tzinfo=pytz.utc).timestamp()
+        times = self.events["time"]
+        rows = self.events[int(np.searchsorted(times, start)):int(np.searchsorted(times, end))]
+        return rows[rows["kind"] == kind]
+
+
+def build_index(table_dir=TABLE_DIR):
+    """
+    Sweeps TABLE_START_YEAR-TABLE_END_YEAR, refines every event, tags the ingresses with their
+    Samvatsara, verifies them against DE421 and writes the table atomically. Returns the counts.
+    """
+    tables = get_tables()
+    jd = np.arange(float(ts.utc(TABLE_START_YEAR, 1, 1).tt), float(ts.utc(TABLE_END_YEAR + 1, 1, 1).tt), SAMPLE_DAYS)
+    jupiter, saturn = _geocentric(jd)
+
+    when, rashis, retrograde = _ingresses(jd, jupiter)
+    found = [(INGRESS, when, _geocentric(when)[0], rashis, retrograde)]
+    for kind, positions, (j, s) in ((CONJUNCTION, _geocentric, (jupiter, saturn)),
+                                    (HELIOCENTRIC_CONJUNCTION, _heliocentric, _heliocentric(jd))):
+        when, lons = _conjunctions(jd, j, s, positions)
+        found.append((kind, when, lons, (lons // 30).astype(np.uint8), False))
+
+    parts = []
+    for kind, when, lons, rashis, retrograde in found:
+        part = np.zeros(len(when), dtype=EVENT_DTYPE)
+        part["time"] = tt_to_unix(when)
+        part["kind"], part["rashi"], part["retrograde"], part["longitude"] = kind, rashis, retrograde, lons
+        part["samvatsara"] = NO_SAMVATSARA
+        parts.append(part)
+    events = np.sort(np.concatenate(parts), order="time")
+
+    lunations = get_lunation_index()
+    first, last = lunations.header["coverage"]
+    inside = (events["time"] >= first) & (events["time"] < last)
+    events["samvatsara"][inside] = lunations.lunations["samvatsara"][lunations.positions(events["time"][inside])]
+
+    header = {
+        "version": INDEX_VERSION,
+        "tables": tables_key(tables),
+        "coverage": [TABLE_START_YEAR, TABLE_END_YEAR],
+        "counts": {name: int(np.count_nonzero(events["kind"] == kind)) for kind, name in
+                   ((INGRESS, "ingresses"), (CONJUNCTION, "conjunctions"),
+                    (HELIOCENTRIC_CONJUNCTION, "heliocentric_conjunctions"))},
+    }
+    mismatches = verify_index(SamvatsaraCycle(events, header))
+    if mismatches:
+        raise RuntimeError(f"Samvatsara cycle table disagrees with the ephemeris at {mismatches} events")
+    header["verified_within_seconds"] = VERIFY_WINDOW_SECONDS
+
+    table_dir = Path(table_dir)
+    table_dir.mkdir(parents=True, exist_ok=True)
+    npy_path, json_path = _index_paths(table_dir)
+    tmp = npy_path.with_suffix(".tmp.npy")
+    np.save(tmp, events)
+    os.replace(tmp, npy_path)
+    tmp = json_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp, json_path)
+    return header["counts"]
+
+
+def verify_index(index):
+    """
+    Number of events DE421 disagrees with VERIFY_WINDOW_SECONDS either side: Jupiter must leave
+    the previous rashi for the indexed one, and Jupiter - Saturn must change sign at a conjunction.
+    """
+    events = index.events
+    mismatches = 0
+    for kind, positions in ((INGRESS, None), (CONJUNCTION, _geocentric), (HELIOCENTRIC_CONJUNCTION, _heliocentric)):
+        rows = events[events["kind"] == kind]
+        around = []
+        for offset in (-VERIFY_WINDOW_SECONDS, VERIFY_WINDOW_SECONDS):
+            t = ts.from_datetimes([datetime.fromtimestamp(float(s) + offset, pytz.utc) for s in rows["time"]])
+            if positions is None:
+                around.append((_geocentric(t.tt)[0] // 30).astype(int))
+            else:
+                jupiter, saturn = positions(t.tt)
+                around.append(np.sign(wrap_angle(jupiter - saturn)))
+        if kind == INGRESS:
+            mismatches += int(np.count_nonzero((around[1] != rows["rashi"]) | (around[0] == around[1])))
+        else:
+            mismatches += int(np.count_nonzero(around[0] == around[1]))
+    return mismatches
+
+
+def load_index(table_dir=TABLE_DIR):
+    """Memory-maps the table, or returns None if it is missing or was built from another table layout."""
+    npy_path, json_path = _index_paths(table_dir)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("version") != INDEX_VERSION or header.get("tables") != tables_key(get_tables()):
+            return None
+        return SamvatsaraCycle(np.load(npy_path, mmap_mode="r"), header)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_samvatsara_cycle_table():
+    """
+    Process-wide table, loaded on first use. Never built inside a request: raises
+    TableUnavailableError if it is missing (build it with `python -m utils.samvatsara_cycle`).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = load_index()
+                if index is None:
+                    raise TableUnavailableError(f"Jupiter-Saturn cycle table missing in {TABLE_DIR}; run python -m utils.samvatsara_cycle")
+                _index = index
+    return _index
+
+
+def get_samvatsara_cycle(start_year=None, end_year=None, lang='EN'):
+    """
+    Jupiter-Saturn events of [start_year, end_year] (default: the whole table) for the Samvatsara
+    visual: {'coverage', 'cycle', 'great_conjunctions', 'heliocentric_conjunctions',
+    'jupiter_ingresses'} with ISO UTC times, sidereal longitudes and 0-based rashis; each ingress
+    carries the Samvatsara name (None before the lunation index starts).
+    """
+    from data.panchanga_data import SAMVATSARAS
+    first_year, last_year = TABLE_START_YEAR, TABLE_END_YEAR
+    start_year = first_year if start_year is None else start_year
+    end_year = last_year if end_year is None else end_year
+    if start_year < first_year or end_year > last_year:
+        raise ValueError(f"Years must fall in {first_year}-{last_year}")
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    names = SAMVATSARAS.get(lang)
+    if names is None:
+        raise ValueError(f"Unsupported language: {lang}")
+    table = get_samvatsara_cycle_table()
+
+    def stamp(t):
+        return datetime.fromtimestamp(float(t), pytz.utc).replace(microsecond=0).isoformat()
+
+    def conjunctions(kind):
+        return [{"time": stamp(row["time"]), "sidereal_longitude": round(float(row["longitude"]), 2),
+                 "rashi": int(row["rashi"])} for row in table.select(start_year, end_year, kind)]
+
+    heliocentric = table.select(first_year, last_year, HELIOCENTRIC_CONJUNCTION)["time"]
+    return {
+        "coverage": [first_year, last_year],
+        "cycle": {**CYCLE, "mean_conjunction_interval_years":
+                  round(float(np.mean(np.diff(heliocentric))) / (365.25 * 86400), 3) if len(heliocentric) > 1 else None},
+        "great_conjunctions": conjunctions(CONJUNCTION),
+        "heliocentric_conjunctions": conjunctions(HELIOCENTRIC_CONJUNCTION),
+        "jupiter_ingresses": [
+            {"time": stamp(row["time"]), "rashi": int(row["rashi"]), "retrograde": bool(row["retrograde"]),
+             "samvatsara": names[row["samvatsara"]] if row["samvatsara"] != NO_SAMVATSARA else None}
+            for row in table.select(start_year, end_year, INGRESS)
+        ],
+    }
+
+
+if __name__ == "__main__":
+    table_dir = sys.argv[1] if len(sys.argv) > 1 else TABLE_DIR
+    counts = build_index(table_dir)
+    print(f"Jupiter-Saturn cycle table written to {table_dir}")
+    for name, count in counts.items():
+        print(f"   {name:<26} {count}")
@@ -0,0 +1,226 @@
+"""
+Chebyshev Sidereal Tables (v6.1)
+Piecewise Chebyshev coefficients for the sidereal Sun, Moon and elongation (Moon - Sun),
+Lahiri ayanamsha already applied, fitted to DE421 over TABLE_START_YEAR..TABLE_END_YEAR.
+
+The coefficients live in one .npy file that is memory-mapped read-only (pages are shared
+between worker processes), with a small JSON header describing the layout and the error
+measured against the ephemeris when the table was built. Evaluation is a vectorized Clenshaw
+recurrence on TT Julian dates: no SPK chain, no aberration, a few microseconds per instant.
+
+The table is built offline (deploy.sh and the Docker image run `python -m utils.sidereal_tables`,
+which rebuilds and re-verifies it); requests only load it, and a missing or outdated file raises
+TableUnavailableError so callers fall back to the ephemeris.
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+TABLE_DIR = Path(os.environ.get("EPHEMERIS_TABLE_DIR", "cache/tables"))
+TABLE_START_YEAR = 1900
+TABLE_END_YEAR = 2050        # inclusive; DE421 covers up to 2053
+TABLE_VERSION = 1
+SEGMENT_DAYS = 8.0
+DEGREE = 12
+TABLE_TOLERANCE = 1e-6       # degrees; a build whose verification exceeds this is rejected
+BODIES = ("sun", "moon", "elongation")
+
+_TABLE_NAME = "sidereal_chebyshev"
+
+
+def _table_paths(table_dir):
+    table_dir = Path(table_dir)
+    return table_dir / f"{_TABLE_NAME}.npy", table_dir / f"{_TABLE_NAME}.json"
+
+
+def _year_start_jd(year):
+    """TT Julian date of 1 January of `year`, 0h."""
+    from utils.astronomy import ts
+    return float(ts.tt(year, 1, 1).tt)
+
+
+def _ephemeris_longitudes(jd_tt):
+    """(sun, moon) sidereal longitudes from DE421 for an array of TT Julian dates."""
+    from utils.astronomy import ts, earth, sun, moon, get_ayanamsha
+    t = ts.tt_jd(jd_tt)
+    observer = earth.at(t)
+    ayanamsha = get_ayanamsha(t.tt)
+    sun_lon = (observer.observe(sun).ecliptic_latlon()[1].degrees - ayanamsha) % 360
+    moon_lon = (observer.observe(moon).ecliptic_latlon()[1].degrees - ayanamsha) % 360
+    return sun_lon, moon_lon
+
+
+def _angle_error(a, b):
+    return np.abs((a - b + 180) % 360 - 180)
+
+
+class SiderealTables:
+    """
+    A loaded (memory-mapped) coefficient table.
+    coefficients has shape (segments, len(BODIES), DEGREE + 1).
+    """
+
+    def __init__(self, coefficients, header):
+        self.coefficients = coefficients
+        self.header = header
+        self.start_jd = header["start_jd"]
+        self.end_jd = header["end_jd"]
+        self.segment_days = header["segment_days"]
+
+    def covers(self, jd_tt):
+        jd_tt = np.asarray(jd_tt, dtype=np.float64)
+        return bool(np.all((jd_tt >= self.start_jd) & (jd_tt < self.end_jd)))
+
+    def longitudes(self, jd_tt, body):
+        """
+        Sidereal longitude (degrees, 0-360) of `body` ('sun', 'moon' or 'elongation')
+        for a TT Julian date or array of them. Raises ValueError outside the table.
+        """
+        if np.ndim(jd_tt) == 0:
+            return self._longitude(float(jd_tt), BODIES.index(body))
+
+        jd = np.asarray(jd_tt, dtype=np.float64)
+        if not self.covers(jd):
+            raise ValueError(f"Outside the sidereal table ({TABLE_START_YEAR}-{TABLE_END_YEAR})")
+
+        offset = (jd - self.start_jd) / self.segment_days
+        segment = np.minimum(offset.astype(np.int64), len(self.coefficients) - 1)
+        x = 2.0 * (offset - segment) - 1.0
+        coeffs = self.coefficients[segment, BODIES.index(body)]
+
+        # Clenshaw recurrence, vectorized over instants
+        b1 = np.zeros_like(x)
+        b2 = np.zeros_like(x)
+        for k in range(coeffs.shape[-1] - 1, 0, -1):
+            b1, b2 = 2.0 * x * b1 - b2 + coeffs[..., k], b1
+        return (x * b1 - b2 + coeffs[..., 0]) % 360
+
+    def _longitude(self, jd, body_index):
+        """Scalar Clenshaw in plain floats (NumPy per-element overhead dominates for one instant)."""
+        if not self.start_jd <= jd < self.end_jd:
+            raise ValueError(f"Outside the sidereal table ({TABLE_START_YEAR}-{TABLE_END_YEAR})")
+        offset = (jd - self.start_jd) / self.segment_days
+        segment = min(int(offset), len(self.coefficients) - 1)
+        x = 2.0 * (offset - segment) - 1.0
+        coeffs = self.coefficients[segment, body_index].tolist()
+        b1 = b2 = 0.0
+        for c in reversed(coeffs[1:]):
+            b1, b2 = 2.0 * x * b1 - b2 + c, b1
+        return (x * b1 - b2 + coeffs[0]) % 360
+
+
+def build_tables(table_dir=TABLE_DIR, start_year=TABLE_START_YEAR, end_year=TABLE_END_YEAR):
+    """
+    Fits the table from DE421 (all Chebyshev nodes of all segments in one vectorized pass),
+    verifies it against the ephemeris and writes it atomically. Returns the verification errors.
+    """
+    start_jd = _year_start_jd(start_year)
+    end_jd = _year_start_jd(end_year + 1)
+    segments = int(np.ceil((end_jd - start_jd) / SEGMENT_DAYS))
+    nodes = DEGREE + 1
+
+    # Chebyshev nodes of the first kind, in increasing time order within each segment
+    x = np.cos(np.pi * (np.arange(nodes)[::-1] + 0.5) / nodes)
+    jd = start_jd + (np.arange(segments)[:, None] + (x[None, :] + 1.0) / 2.0) * SEGMENT_DAYS
+
+    sun_lon, moon_lon = _ephemeris_longitudes(jd.ravel())
+    values = np.stack([sun_lon, moon_lon, (moon_lon - sun_lon) % 360], axis=-1).reshape(segments, nodes, len(BODIES))
+    # Unwrap across 360 within each segment so every body is a smooth function there
+    values = np.degrees(np.unwrap(np.radians(values), axis=1))
+
+    vander = chebyshev.chebvander(x, DEGREE)
+    coefficients = np.einsum("snb,nk->sbk", values, vander) * (2.0 / nodes)
+    coefficients[..., 0] /= 2.0
+
+    header = {
+        "version": TABLE_VERSION,
+        "ephemeris": "de421.bsp",
+        "ayanamsha": "lahiri",
+        "start_year": start_year,
+        "end_year": end_year,
+        "start_jd": start_jd,
+        "end_jd": start_jd + segments * SEGMENT_DAYS,
+        "segment_days": SEGMENT_DAYS,
+        "degree": DEGREE,
+        "bodies": list(BODIES),
+    }
+    tables = SiderealTables(coefficients, header)
+    errors = verify_tables(tables)
+    if max(errors.values()) > TABLE_TOLERANCE:
+        raise RuntimeError(f"Sidereal table fit exceeds {TABLE_TOLERANCE} deg: {errors}")
+    header["max_error_deg"] = errors
+
+    table_dir = Path(table_dir)
+    table_dir.mkdir(parents=True, exist_ok=True)
+    npy_path, json_path = _table_paths(table_dir)
+    tmp = npy_path.with_suffix(".tmp.npy")
+    np.save(tmp, coefficients)
+    os.replace(tmp, npy_path)
+    tmp = json_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp, json_path)
+    return errors
+
+
+def verify_tables(tables, samples=20000, seed=0):
+    """Max absolute error (degrees) per body at random instants, against DE421."""
+    rng = np.random.default_rng(seed)
+    jd = rng.uniform(tables.start_jd, tables.end_jd, samples)
+    sun_lon, moon_lon = _ephemeris_longitudes(jd)
+    expected = {"sun": sun_lon, "moon": moon_lon, "elongation": (moon_lon - sun_lon) % 360}
+    return {body: float(_angle_error(tables.longitudes(jd, body), expected[body]).max()) for body in BODIES}
+
+
+def load_tables(table_dir=TABLE_DIR):
+    """Memory-maps the table, or returns None if it is missing or was built with another layout."""
+    npy_path, json_path = _table_paths(table_dir)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        layout = (header.get("version"), header.get("degree"), header.get("segment_days"),
+                  header.get("start_year"), header.get("end_year"))
+        if layout != (TABLE_VERSION, DEGREE, SEGMENT_DAYS, TABLE_START_YEAR, TABLE_END_YEAR):
+            return None
+        return SiderealTables(np.load(npy_path, mmap_mode="r"), header)
+    except (OSError, ValueError):
+        return None
+
+
+class TableUnavailableError(RuntimeError):
+    """A precomputed table or index is missing; build it offline with its `python -m` entry point."""
+    pass
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def get_tables():
+    """
+    Process-wide table, loaded on first use. Never built inside a request: raises
+    TableUnavailableError if it is missing (build it with `python -m utils.sidereal_tables`).
+    """
+    global _tables
+    if _tables is None:
+        with _tables_lock:
+            if _tables is None:
+                tables = load_tables()
+                if tables is None:
+                    raise TableUnavailableError(f"Sidereal table missing in {TABLE_DIR}; run python -m utils.sidereal_tables")
+                _tables = tables
+    return _tables
+
+
+if __name__ == "__main__":
+    table_dir = sys.argv[1] if len(sys.argv) > 1 else TABLE_DIR
+    errors = build_tables(table_dir)
+    print(f"Sidereal table written to {table_dir}")
+    for body, error in errors.items():
+        print(f"   {body:<10} max error {error * 3600:.5f} arcsec")
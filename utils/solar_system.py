@@ -13,18 +13,9 @@ import numpy as np
 import hashlib
 import os
 from pathlib import Path
-from utils.astronomy import eph, sun, ts
-
-planets_map = {
-    "Mercury": eph['mercury'],
-    "Venus": eph['venus'],
-    "Earth": eph['earth'],
-    "Mars": eph['mars'],
-    "Jupiter": eph['jupiter barycenter'],
-    "Saturn": eph['saturn barycenter'],
-    "Uranus": eph['uranus barycenter'],
-    "Neptune": eph['neptune barycenter']
-}
+from utils.grahas import get_graha_snapshot
+
+planets_map = ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune"]
 
 CACHE_DIR = Path("static/solar_systems")
 
@@ -42,19 +33,13 @@ def get_cached_image(cache_key: str):
 def generate_solar_system(utc_dt, output_path, event_title=None):
     """
     Generate a top-down heliocentric view of the solar system.
+    Positions come from the graha snapshot (utils.grahas), shared with the request's angular data.
     """
     # Ensure cache directory exists
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
     
-    t = ts.from_datetime(utc_dt)
-    
-    positions = {}
-    for name, body in planets_map.items():
-        # Get position relative to sun
-        astrometric = sun.at(t).observe(body)
-        from skyfield.framelib import ecliptic_frame
-        pos = astrometric.frame_xyz(ecliptic_frame).au
-        positions[name] = (pos[0], pos[1]) # X, Y coordinates
+    heliocentric = get_graha_snapshot(utc_dt)["heliocentric"]
+    positions = {name: (heliocentric[name.lower()]["x"], heliocentric[name.lower()]["y"]) for name in planets_map}
 
     # Traditional/Approximated names map
     traditional_names = {
@@ -0,0 +1,212 @@
+"""
+Sunrise/Sunset Tables (v6.1)
+Every sunrise and sunset of a whole year at one location from a single find_discrete pass,
+instead of one root search (with a fresh Topos and almanac function) per local day.
+
+A table is a sorted array of (UTC timestamp, sun up after) rows: the first row records whether
+the Sun is up when the table starts, each further row is a sunrise (1) or sunset (0). It does
+not depend on the timezone - local days are cut out of it at lookup time - and whether the Sun
+is up at any instant is a binary search, which is how polar day and polar night are recognised.
+
+Tables are keyed by (lat, lon rounded to SUN_TABLE_DECIMALS, year), kept in an in-memory LRU
+and persisted under SUN_TABLE_DIR so other workers and restarts reuse them. A year pass costs
+about as much as 15-30 single-day searches, so range lookups build tables straight away while
+single-day lookups solve just their day until a location-year has been asked for
+SUN_TABLE_BUILD_AFTER times. Those lookup counts are an LRU of SUN_TABLE_LOOKUP_CACHE_SIZE
+location-years, so one-off locations are forgotten rather than kept forever.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytz
+from skyfield import almanac
+from skyfield.api import Topos
+from skyfield.errors import EphemerisRangeError
+
+from utils.sidereal_tables import TABLE_DIR
+
+SUN_TABLE_DIR = Path(os.environ.get("SUN_TABLE_DIR", TABLE_DIR / "sun"))
+SUN_TABLE_DECIMALS = 3        # ~100 m; sunrise moves by well under a second
+SUN_TABLE_MARGIN_DAYS = 2     # covers every timezone's local days at both ends of the year
+SUN_TABLE_CACHE_SIZE = 512
+SUN_TABLE_BUILD_AFTER = int(os.environ.get("SUN_TABLE_BUILD_AFTER", 20))
+SUN_TABLE_LOOKUP_CACHE_SIZE = 4096
+
+NORMAL = "normal"
+POLAR_DAY = "polar_day"
+POLAR_NIGHT = "polar_night"
+
+_ROW_DTYPE = np.dtype([("time", "<f8"), ("up", "u1")])
+_tables = OrderedDict()
+_lookups = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def _table_path(lat, lon, year):
+    return SUN_TABLE_DIR / f"{lat:+08.3f}_{lon:+09.3f}_{year}.npy"
+
+
+def build_sun_table(lat, lon, start_year, end_year=None):
+    """
+    Solves every sunrise/sunset from start_year to end_year (inclusive) in one find_discrete pass.
+    Returns the rows as a structured array (see module docstring).
+    """
+    from utils.astronomy import ts, eph
+    end_year = end_year or start_year
+    start = datetime(start_year, 1, 1, tzinfo=pytz.utc) - timedelta(days=SUN_TABLE_MARGIN_DAYS)
+    end = datetime(end_year + 1, 1, 1, tzinfo=pytz.utc) + timedelta(days=SUN_TABLE_MARGIN_DAYS)
+    t0, t1 = ts.from_datetime(start), ts.from_datetime(end)
+
+    f = almanac.sunrise_sunset(eph, Topos(latitude_degrees=lat, longitude_degrees=lon))
+    times, events = almanac.find_discrete(t0, t1, f)
+
+    rows = np.empty(len(times) + 1, dtype=_ROW_DTYPE)
+    rows[0] = (start.timestamp(), int(f(t0)))
+    rows["time"][1:] = [t.timestamp() for t in times.utc_datetime()]
+    rows["up"][1:] = events
+    return rows
+
+
+def _key(lat, lon, year):
+    return round(lat, SUN_TABLE_DECIMALS), round(lon, SUN_TABLE_DECIMALS), year
+
+
+def get_sun_table(lat, lon, year, build=True):
+    """
+    One year's table at (lat, lon) rounded to SUN_TABLE_DECIMALS: memory, then disk, then built
+    (or None when it is not cached and build is False).
+    """
+    key = _key(lat, lon, year)
+    with _tables_lock:
+        rows = _tables.get(key)
+        if rows is not None:
+            _tables.move_to_end(key)
+            return rows
+
+    path = _table_path(*key)
+    try:
+        rows = np.load(path)
+    except (OSError, ValueError):
+        if not build:
+            return None
+        rows = build_sun_table(*key)
+        SUN_TABLE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.npy")
+        np.save(tmp, rows)
+        os.replace(tmp, path)
+
+    with _tables_lock:
+        _tables[key] = rows
+        _lookups.pop(key, None)
+        while len(_tables) > SUN_TABLE_CACHE_SIZE:
+            _tables.popitem(last=False)
+    return rows
+
+
+def _solve_day(day, lat, lon, tz):
+    """Direct find_discrete search over one local day, for location-years without a table."""
+    from utils.astronomy import ts, eph
+    start, end = _day_window(day, tz)
+    t0, t1 = ts.from_datetime(start), ts.from_datetime(end - timedelta(seconds=1))
+    f = almanac.sunrise_sunset(eph, Topos(latitude_degrees=lat, longitude_degrees=lon))
+    times, events = almanac.find_discrete(t0, t1, f)
+
+    sunrise = sunset = None
+    for t, event in zip(times, events):
+        if event == 1:
+            sunrise = t.astimezone(tz)
+        else:
+            sunset = t.astimezone(tz)
+    state = NORMAL
+    if sunrise is None and sunset is None:
+        state = POLAR_DAY if f(t0) else POLAR_NIGHT
+    return {"sunrise": sunrise, "sunset": sunset, "state": state}
+
+
+def _day_window(day, tz):
+    start = tz.localize(datetime(day.year, day.month, day.day))
+    end = tz.localize(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+    return start, end
+
+
+def get_sun_day(day, lat, lon, timezone_str):
+    """
+    Sunrise and sunset on a local date, from the year table (see the module notes on when it is built).
+    Returns {'sunrise', 'sunset', 'state'}: local datetimes (None when the event does not happen
+    that day) and NORMAL, POLAR_DAY (Sun up all day) or POLAR_NIGHT (Sun down all day).
+    As with a per-day search, the last sunrise and the last sunset of the day are reported.
+    """
+    tz = pytz.timezone(timezone_str)
+    lat, lon, year = key = _key(lat, lon, day.year)
+    with _tables_lock:
+        _lookups[key] = _lookups.get(key, 0) + 1
+        _lookups.move_to_end(key)
+        build = _lookups[key] > SUN_TABLE_BUILD_AFTER
+        while len(_lookups) > SUN_TABLE_LOOKUP_CACHE_SIZE:
+            _lookups.popitem(last=False)
+    try:
+        rows = get_sun_table(lat, lon, year, build=build)
+    except EphemerisRangeError:
+        rows = None  # the year's margins reach past the ephemeris; the day itself may not
+    if rows is None:
+        return _solve_day(day, lat, lon, tz)
+
+    start, end = _day_window(day, tz)
+    times = rows["time"]
+
+    first = int(np.searchsorted(times, start.timestamp(), side="right"))
+    last = int(np.searchsorted(times, end.timestamp(), side="left"))
+    sunrise = sunset = None
+    for time, up in zip(times[first:last], rows["up"][first:last]):
+        moment = datetime.fromtimestamp(float(time), tz)
+        if up:
+            sunrise = moment
+        else:
+            sunset = moment
+
+    state = NORMAL
+    if sunrise is None and sunset is None:
+        state = POLAR_DAY if rows["up"][first - 1] else POLAR_NIGHT
+    return {"sunrise": sunrise, "sunset": sunset, "state": state}
+
+
+def get_sun_days(start_day, end_day, lat, lon, timezone_str):
+    """
+    Vectorized get_sun_day for every local date in [start_day, end_day].
+    Returns (dates, sunrise timestamps, sunset timestamps, sun-up-at-midnight flags) with NaN for
+    events that do not happen that day; years are served from their cached tables.
+    """
+    tz = pytz.timezone(timezone_str)
+    dates = [start_day + timedelta(days=k) for k in range((end_day - start_day).days + 1)]
+    bounds = np.array([_day_window(d, tz)[0].timestamp() for d in dates] + [_day_window(dates[-1], tz)[1].timestamp()])
+
+    # Stitch the year tables at 1 January UTC: their margins overlap, and only the first table's
+    # leading row is a state rather than an event
+    years = range(start_day.year, end_day.year + 1)
+    parts = []
+    for year in years:
+        rows = get_sun_table(lat, lon, year)
+        keep = np.ones(len(rows), dtype=bool)
+        if year != years[0]:
+            keep &= rows["time"] >= datetime(year, 1, 1, tzinfo=pytz.utc).timestamp()
+        if year != years[-1]:
+            keep &= rows["time"] < datetime(year + 1, 1, 1, tzinfo=pytz.utc).timestamp()
+        parts.append(rows[keep])
+    rows = np.concatenate(parts)
+    times, ups = rows["time"], rows["up"].astype(bool)
+
+    up_at_start = ups[np.searchsorted(times, bounds[:-1], side="right") - 1]
+    sunrises = np.full(len(dates), np.nan)
+    sunsets = np.full(len(dates), np.nan)
+    # Rows inside [bounds[k], bounds[k+1]) belong to day k; later rows of a day overwrite earlier ones
+    day_of_row = np.searchsorted(bounds, times, side="right") - 1
+    inside = (day_of_row >= 0) & (day_of_row < len(dates))
+    for flag, target in ((True, sunrises), (False, sunsets)):
+        selected = inside & (ups == flag)
+        target[day_of_row[selected]] = times[selected]
+    return dates, sunrises, sunsets, up_at_start
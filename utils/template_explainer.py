@@ -0,0 +1,384 @@
+"""
+Template Explanation Engine for the AI Maestro (v6.1)
+Deterministic, offline explanations assembled from precompiled content fragments.
+
+Follows the same Phase I-III hierarchy as PanchangaEngine.get_ai_instructions() and the
+Mayan Scientific Masterclass, but needs no API key or network access and answers in
+well under 10 ms. Used as the instant fallback when no LLM is configured or every model
+fails, and as the default for classroom traffic (AI_DEFAULT_MODE=template).
+"""
+
+import json
+import math
+import re
+
+from data.panchanga_data import TITHIS, PAKSHAS, NAKSHATRAS, MASAS, VARAS, YOGAS, SAMVATSARAS
+from data.explanation_fragments import (
+    MASA_FRAGMENTS, NAKSHATRA_FRAGMENTS, VARA_FRAGMENTS, TZOLKIN_FRAGMENTS, HAAB_FRAGMENTS
+)
+from engines.mayan.engine import MayanEngine
+
+NAKSHATRA_SPAN = 360 / 27
+
+
+def _build_lookup(table):
+    """Maps every localized name (EN/KN/SA) to its index in the canonical list."""
+    lookup = {}
+    for names in table.values():
+        for idx, name in enumerate(names):
+            lookup.setdefault(name, idx)
+    return lookup
+
+
+def _dms(deg):
+    whole = int(deg)
+    minutes = int(round((deg - whole) * 60))
+    return f"{whole}°{minutes:02d}'" if minutes else f"{whole}°"
+
+
+# ------------------------------------------------------------------------------
+# Precompiled per-value notes (built once at import)
+# ------------------------------------------------------------------------------
+
+def _compile_tithi_notes():
+    notes = []
+    for i in range(30):
+        start, end = 12 * i, 12 * (i + 1)
+        mid = math.radians(start + 6)
+        lit = round(50 * (1 - math.cos(mid)))
+        lag_hours = (start + 6) / 15.0
+        if i == 14:
+            sky = "The Moon is opposite the Sun: it rises around sunset and stays up all night."
+        elif i == 29:
+            sky = "The Moon is lost in the Sun's glare; the next New Moon is only hours away."
+        elif i < 15:
+            sky = f"It rises roughly {lag_hours:.0f} hours after the Sun, so look for it in the evening sky after sunset."
+        else:
+            sky = f"It rises roughly {lag_hours:.0f} hours after the Sun, so it is still up in the morning sky after sunrise."
+        notes.append(
+            f"the Moon is between **{start}° and {end}°** ahead of the Sun (tithi {i % 15 + 1} of its paksha), "
+            f"with roughly **{lit}%** of its disk lit. {sky}"
+        )
+    return notes
+
+
+def _compile_nakshatra_notes():
+    notes = []
+    for i, fact in enumerate(NAKSHATRA_FRAGMENTS):
+        start = i * NAKSHATRA_SPAN
+        notes.append(
+            f"**{NAKSHATRAS['EN'][i]}** covers {_dms(start)} to {_dms(start + NAKSHATRA_SPAN)} of the sidereal ecliptic. {fact}"
+        )
+    return notes
+
+
+def _compile_masa_notes():
+    notes = []
+    for i, (nakshatra, star, season) in enumerate(MASA_FRAGMENTS):
+        notes.append(
+            f"**{MASAS['EN'][i]}** is named after the nakshatra **{nakshatra}**: the Full Moon of this month "
+            f"shines near {star}. It falls in {season}."
+        )
+    return notes
+
+
+def _compile_vara_notes():
+    return [
+        f"**{VARAS['EN'][i]}** is named after {body}, {fact}. The 7-day order comes from the 24 'planetary hours' "
+        f"counted through the slowest-to-fastest sequence Saturn, Jupiter, Mars, Sun, Venus, Mercury, Moon."
+        for i, (body, fact) in enumerate(VARA_FRAGMENTS)
+    ]
+
+
+def _compile_yoga_notes():
+    return [
+        f"**{YOGAS['EN'][i]}** is yoga {i + 1} of 27: the Sun's and Moon's sidereal longitudes add up to between "
+        f"{_dms(i * NAKSHATRA_SPAN)} and {_dms((i + 1) * NAKSHATRA_SPAN)} (modulo 360°)."
+        for i in range(27)
+    ]
+
+
+def _compile_samvatsara_notes():
+    return [
+        f"**{SAMVATSARAS['EN'][i]}** is year {i + 1} of the 60-year cycle. Sixty years is almost exactly five orbits of "
+        f"Jupiter (5 x 11.86 = 59.3 years) and two orbits of Saturn (2 x 29.46 = 58.9 years), so the two giants "
+        f"return to nearly the same places among the stars."
+        for i in range(60)
+    ]
+
+
+def _compile_tzolkin_notes():
+    return [
+        f"**{name}** is day sign {i + 1} of 20, {TZOLKIN_FRAGMENTS[i]}."
+        for i, name in enumerate(MayanEngine.TZOLKIN_NAMES)
+    ]
+
+
+def _compile_haab_notes():
+    return [
+        f"**{name}** is month {i + 1} of the Haab', {HAAB_FRAGMENTS[i]}."
+        for i, name in enumerate(MayanEngine.HAAB_MONTHS)
+    ]
+
+
+TITHI_NOTES = _compile_tithi_notes()
+NAKSHATRA_NOTES = _compile_nakshatra_notes()
+MASA_NOTES = _compile_masa_notes()
+VARA_NOTES = _compile_vara_notes()
+YOGA_NOTES = _compile_yoga_notes()
+SAMVATSARA_NOTES = _compile_samvatsara_notes()
+TZOLKIN_NOTES = _compile_tzolkin_notes()
+HAAB_NOTES = _compile_haab_notes()
+
+_TITHI_INDEX = _build_lookup(TITHIS)
+_PAKSHA_INDEX = _build_lookup(PAKSHAS)
+_NAKSHATRA_INDEX = _build_lookup(NAKSHATRAS)
+_MASA_INDEX = _build_lookup(MASAS)
+_VARA_INDEX = _build_lookup(VARAS)
+_YOGA_INDEX = _build_lookup(YOGAS)
+_SAMVATSARA_INDEX = _build_lookup(SAMVATSARAS)
+_TZOLKIN_INDEX = {name: i for i, name in enumerate(MayanEngine.TZOLKIN_NAMES)}
+_HAAB_INDEX = {name: i for i, name in enumerate(MayanEngine.HAAB_MONTHS)}
+
+PANCHANGA_PHASE_I = """## Phase I: The Universal Clock
+
+A calendar is an engineering solution: it keeps three natural rhythms - the **day** (Earth's spin), the **month** (the Moon's phases) and the **year** (Earth's orbit) - in step with each other.
+
+- **The Solar Engine (Western):** the Gregorian calendar follows only Earth's orbit, so it tracks the seasons and ignores the Moon.
+- **The Lunar-Solar Fusion (Panchanga):** the Panchanga follows both the Sun and the Moon and measures them against the background stars (sidereal positions).
+- **The Birthday Drift:** twelve lunar months last about 354 days, roughly 11 days shorter than the solar year. A Panchanga birthday therefore slides earlier each Western year until an **Adhika Masa** (leap month) resets it.
+- **The Great Drift:** Earth's axis wobbles like a spinning top (axial precession), so the equinox point slides backwards through the stars by about 1° every 72 years. That slide is why sidereal signs differ from tropical ones.{ayanamsha}
+
+[[RENDER:ZODIAC_COMPARISON]]
+"""
+
+PANCHANGA_PHASE_II = """## Phase II: The Library of Atoms
+
+- **Samvatsara:** a named year in a 60-year cycle built on the Jupiter-Saturn resonance. [[RENDER:SAMVATSARA_RESONANCE]]
+- **Saka Varsha (The Civil Era):** the Official Indian Civil Calendar, counted from 78 AD (King Shalivahana). It is a purely solar, administrative count, unlike the luni-solar Samvatsara ("Administrative Time" vs "Nature's Time").
+- **Masa (The Cosmic Month):** the *Saura Mana* month starts when the Sun enters a new sign; the *Chandra Mana* month runs New Moon to New Moon (~29.5 days) and is named after the star near that month's Full Moon.
+- **Nakshatra:** one of 27 sectors of 13°20' that act as a "lunar speedometer" for the Moon's 27.3-day orbit. [[RENDER:CONSTELLATION_MAP]]
+- **Tithi:** every 12° of angular separation between the Moon and the Sun. [[RENDER:MOON_PHASE_3D]]
+- **Yoga:** the sum of the Sun's and Moon's longitudes, split into 27 parts.
+- **Karana:** half a tithi - every 6° of separation.
+- **Rashi:** one of 12 equal 30° sectors of the ecliptic, the Sun's apparent yearly path.
+- **Lagna:** the point of the ecliptic rising on the eastern horizon at this moment; it sweeps all 12 sectors in one Earth rotation.
+- **Rahu & Ketu:** the Lunar Nodes, where the Moon's tilted orbit crosses the ecliptic. Eclipses can only happen near them. [[RENDER:PRECESSION_WOBBLE]]
+"""
+
+MAYAN_PHASE_I = """## Phase I: Vigesimal Timekeeping (The Base-20 System)
+
+The Maya counted in base 20. The **Long Count** is a linear cosmic odometer of days since the start of the current creation (13.0.0.0.0 4 Ajaw 8 Kumk'u, 11 August 3114 BCE in the GMT correlation):
+
+| Unit | Days | Rolls over at |
+|------|------|---------------|
+| K'in | 1 | 20 |
+| Winal (Uinal) | 20 | 18 |
+| Tun | 360 | 20 |
+| K'atun | 7,200 | 20 |
+| B'ak'tun | 144,000 | - |
+
+Where our base-10 history counts years from a single epoch, the Long Count counts *days* - and uses 18 instead of 20 in one place so that a Tun stays close to a solar year.
+"""
+
+MAYAN_PHASE_II = """## Phase II: The Calendar Round (Interlocking Gears)
+
+- The **Tzolk'in** meshes 13 numbers with 20 day signs: 13 x 20 = **260 days**.
+- The **Haab'** has 18 months of 20 days plus the 5-day **Wayeb'** = **365 days**, a practical solar year.
+- Both gears return to the same pairing only after the least common multiple of 260 and 365: **18,980 days = 52 Haab' years**, the Calendar Round.
+- With no leap day, the Haab' slips against the seasons by about one day every four years - a drift the Long Count lets astronomers measure precisely.
+"""
+
+MAYAN_PHASE_III = """## Phase III: Archaeoastronomy & Planetary Resonances
+
+- **Venus:** 5 synodic periods of Venus (5 x 584 = 2,920 days) equal 8 Haab' years, and 65 Venus cycles equal two Calendar Rounds (37,960 days). The Dresden Codex tabulates these cycles.
+- **Mars:** the Dresden Codex also contains a 780-day table, three Tzolk'in rounds, matching the synodic period of Mars.
+- **Eclipses:** 3 x 173.3-day eclipse half-years are close to two Tzolk'in rounds, which is why eclipse tables fit the 260-day count so well.
+
+## Cultural Context & Mythology
+
+Time itself was a burden carried by deities: the sun god **K'inich Ajaw** carried the days and **Itzamna** was credited with inventing writing and the calendar. In the **Popol Vuh**, the gods attempt creation several times; the current world era is the **4th Creation**, which began at the Long Count's 13.0.0.0.0.
+"""
+
+
+def detect_civilization(config_data):
+    """Infers the civilization from the shape of the payload."""
+    specific = config_data.get("civilization_specific", config_data) if isinstance(config_data, dict) else {}
+    return "mayan" if isinstance(specific, dict) and "long_count" in specific else "panchanga"
+
+
+def _lookup(index, value):
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value in index:
+        return index[value]
+    # Nakshatra values carry a star suffix: "Rohini (Aldebaran)"
+    base = value.split(" (")[0]
+    return index.get(base)
+
+
+def explain_panchanga(config_data):
+    specific = config_data.get("civilization_specific", config_data)
+    astronomy = config_data.get("astronomy", config_data)
+    coordinates = config_data.get("coordinates", config_data)
+    angular = astronomy.get("angular_data") or {}
+
+    ayanamsha = angular.get("ayanamsha")
+    ayanamsha_txt = f" Right now the gap (Ayanamsa) is **{ayanamsha}°**." if ayanamsha is not None else ""
+
+    lines = ["# 🌌 Your Cosmic Snapshot", "", PANCHANGA_PHASE_I.format(ayanamsha=ayanamsha_txt), PANCHANGA_PHASE_II,
+             "## 🧩 Decoding Your Specific Cosmic Alignment", ""]
+
+    samvatsara_idx = _lookup(_SAMVATSARA_INDEX, specific.get("samvatsara"))
+    if samvatsara_idx is not None:
+        lines.append(f"- **Samvatsara:** {SAMVATSARA_NOTES[samvatsara_idx]}")
+    if specific.get("saka_year"):
+        lines.append(f"- **Saka Varsha:** civil year **{specific['saka_year']}** of the Saka Era.")
+
+    masa_idx = _lookup(_MASA_INDEX, specific.get("masa"))
+    if masa_idx is not None:
+        lines.append(f"- **Masa:** {MASA_NOTES[masa_idx]}")
+
+    tithi_idx = _lookup(_TITHI_INDEX, specific.get("tithi"))
+    paksha_idx = _lookup(_PAKSHA_INDEX, specific.get("paksha"))
+    if tithi_idx is not None:
+        # Tithi names repeat in both pakshas; Purnima (14) and Amavasya (29) are unique
+        if paksha_idx == 1 and tithi_idx < 14:
+            tithi_idx += 15
+        lines.append(f"- **Tithi ({specific.get('paksha', '')} {specific.get('tithi')}):** {TITHI_NOTES[tithi_idx]}")
+
+    nak_idx = _lookup(_NAKSHATRA_INDEX, specific.get("nakshatra"))
+    if nak_idx is not None:
+        lines.append(f"- **Nakshatra:** {NAKSHATRA_NOTES[nak_idx]}")
+
+    yoga_idx = _lookup(_YOGA_INDEX, specific.get("yoga"))
+    if yoga_idx is not None:
+        lines.append(f"- **Yoga:** {YOGA_NOTES[yoga_idx]}")
+
+    if specific.get("karana"):
+        karana = int(specific["karana"])
+        lines.append(f"- **Karana:** half-tithi **{karana} of 60**, i.e. the Moon is {(karana - 1) * 6}°-{karana * 6}° ahead of the Sun.")
+
+    vara_idx = _lookup(_VARA_INDEX, specific.get("vara"))
+    if vara_idx is not None:
+        lines.append(f"- **Vara:** {VARA_NOTES[vara_idx]}")
+
+    rashi = (coordinates.get("rashi") or {}).get("name")
+    lagna = (coordinates.get("lagna") or {}).get("name")
+    if rashi:
+        lines.append(f"- **Rashi:** the Moon is in the 30° ecliptic sector **{rashi}**.")
+    if lagna:
+        lines.append(f"- **Lagna:** the ecliptic sector rising on your eastern horizon is **{lagna}**.")
+
+    if angular:
+        lines += [
+            "",
+            "### 🔭 What You Would See Right Now",
+            "",
+            f"- The Sun sits at **{angular.get('sun_sidereal')}°** and the Moon at **{angular.get('moon_sidereal')}°** of sidereal longitude, "
+            f"**{angular.get('phase_angle')}°** apart.",
+            f"- Rahu (the ascending node) is at **{angular.get('rahu_sidereal')}°** and Ketu exactly opposite at **{angular.get('ketu_sidereal')}°**.",
+        ]
+    if astronomy.get("sunrise") and astronomy.get("sunset"):
+        lines.append(f"- Sunrise was at **{astronomy['sunrise']}** and sunset at **{astronomy['sunset']}** local time.")
+
+    return "\n".join(lines) + "\n"
+
+
+def explain_mayan(config_data):
+    specific = config_data.get("civilization_specific", config_data)
+    long_count = specific.get("long_count") or {}
+    tzolkin = specific.get("tzolkin") or {}
+    haab = specific.get("haab") or {}
+
+    lines = ["# 🌌 Your Mayan Cosmic Snapshot", "", MAYAN_PHASE_I, MAYAN_PHASE_II, MAYAN_PHASE_III,
+             "## 🧩 Decoding Your Specific Cosmic Alignment", ""]
+
+    if long_count:
+        days = specific.get("days_since_epoch")
+        lines.append(
+            f"- **Long Count {long_count.get('formatted')}:** {long_count.get('baktun')} B'ak'tun, {long_count.get('katun')} K'atun, "
+            f"{long_count.get('tun')} Tun, {long_count.get('uinal')} Winal and {long_count.get('kin')} K'in"
+            + (f" = **{days:,} days** since the creation date." if isinstance(days, int) else ".")
+        )
+    tz_idx = _TZOLKIN_INDEX.get(tzolkin.get("name"))
+    if tz_idx is not None:
+        lines.append(f"- **Tzolk'in {tzolkin.get('formatted')}:** number {tzolkin.get('number')} of 13 paired with {TZOLKIN_NOTES[tz_idx]}")
+    haab_idx = _HAAB_INDEX.get(haab.get("month"))
+    if haab_idx is not None:
+        lines.append(f"- **Haab' {haab.get('formatted')}:** day {haab.get('day')} of {HAAB_NOTES[haab_idx]}")
+    if specific.get("julian_day") is not None:
+        lines.append(f"- **Julian Day {specific['julian_day']}:** the same continuous day count astronomers use today, tied to the Maya count by the GMT correlation constant 584283.")
+
+    return "\n".join(lines) + "\n"
+
+
+def explain(config_data, civilization=None):
+    """Returns the Phase I-III markdown report for a calculation payload."""
+    civilization = civilization or detect_civilization(config_data)
+    if civilization == "mayan":
+        return explain_mayan(config_data)
+    return explain_panchanga(config_data)
+
+
+# ------------------------------------------------------------------------------
+# Offline tutor answers (glossary lookup)
+# ------------------------------------------------------------------------------
+
+GLOSSARY = [
+    (("tithi",), "A **Tithi** is every 12° of angular separation between the Moon and the Sun. There are 30 in a lunar month, and because the Moon's speed varies, a tithi lasts anywhere from about 19 to 26 hours."),
+    (("nakshatra",), "A **Nakshatra** is one of 27 equal sectors of 13°20' along the ecliptic. The Moon takes about a day to cross each one, so they work like a lunar speedometer for its 27.3-day orbit."),
+    (("masa", "month"), "A **Masa** is a lunar month from one New Moon to the next (~29.5 days), named after the nakshatra near that month's Full Moon."),
+    (("adhika", "leap"), "**Adhika Masa** is a leap month. Twelve lunar months are ~11 days shorter than the solar year, so roughly every 32.5 months a lunar month passes with no solar ingress and is repeated to catch up."),
+    (("paksha",), "A **Paksha** is half a lunar month: Shukla (waxing, New Moon to Full Moon) and Krishna (waning, Full Moon to New Moon)."),
+    (("yoga",), "A **Yoga** is the sum of the Sun's and Moon's sidereal longitudes divided into 27 parts of 13°20'."),
+    (("karana",), "A **Karana** is half a tithi: every 6° of Sun-Moon separation, 60 per lunar month."),
+    (("vara", "weekday"), "A **Vara** is the weekday, counted from sunrise to sunrise and named after the Sun, Moon and five naked-eye planets."),
+    (("samvatsara", "jupiter", "saturn"), "A **Samvatsara** is a year in the 60-year cycle. Five orbits of Jupiter (59.3 years) and two of Saturn (58.9 years) nearly fit into 60 years, so the giants return to similar positions."),
+    (("rashi", "zodiac", "sign"), "A **Rashi** is one of 12 equal 30° sectors of the ecliptic - a coordinate grid for the Sun's apparent yearly path."),
+    (("lagna", "ascendant"), "The **Lagna** is the ecliptic point rising on the eastern horizon at a given moment and place. Earth's rotation sweeps it through all 12 rashis each day."),
+    (("ayanamsa", "ayanamsha", "precession", "wobble"), "**Ayanamsa** is the angle between the tropical (equinox-based) and sidereal (star-based) zero points. It grows by about 50.3 arcseconds a year because Earth's axis precesses once every ~25,800 years."),
+    (("rahu", "ketu", "node", "eclipse"), "**Rahu and Ketu** are the Lunar Nodes: the two points where the Moon's orbit, tilted by about 5°, crosses the ecliptic. Eclipses only happen when a New or Full Moon falls near a node."),
+    (("sankranti", "ingress"), "A **Sankranti** is the moment the Sun enters a new 30° sidereal sector."),
+    (("vakra", "retrograde"), "**Vakra** (retrograde motion) is the apparent backward drift of a planet when Earth overtakes it - or it overtakes Earth - on the inside track."),
+    (("asta", "combust"), "**Asta** (combustion) is when a planet is so close to the Sun in the sky that it is lost in its glare and cannot be seen."),
+    (("long count", "baktun", "b'ak'tun", "katun"), "The **Long Count** is a base-20 day counter (K'in, Winal, Tun, K'atun, B'ak'tun) measuring days since the Maya creation date in 3114 BCE."),
+    (("tzolkin", "tzolk'in"), "The **Tzolk'in** combines 13 numbers with 20 day signs into a 260-day cycle."),
+    (("haab", "wayeb"), "The **Haab'** is the 365-day Maya year: 18 months of 20 days plus the 5 Wayeb' days."),
+    (("calendar round",), "The **Calendar Round** is the 18,980-day (52-year) cycle after which the Tzolk'in and Haab' gears return to the same combination."),
+]
+
+DIVERSION_REPLY = ("That's a fascinating question, but my eyes are fixed on the physics of the heavens! "
+                   "Ask me about tithis, nakshatras, the lunar nodes, precession or the Maya Calendar Round.")
+
+
+def _find_value(obj, key):
+    if isinstance(obj, dict):
+        if key in obj and not isinstance(obj[key], (dict, list)):
+            return obj[key]
+        for v in obj.values():
+            found = _find_value(v, key)
+            if found is not None:
+                return found
+    return None
+
+
+def answer_question(message, context_text=""):
+    """Deterministic tutor reply built from the glossary, personalised with the session context."""
+    text = (message or "").lower()
+    try:
+        context = json.loads(context_text) if context_text else {}
+    except (TypeError, ValueError):
+        context = {}
+
+    answers = []
+    for keywords, answer in GLOSSARY:
+        hit = next((k for k in keywords if re.search(r"\b" + re.escape(k) + r"\b", text)), None)
+        if hit:
+            value = _find_value(context, keywords[0])
+            if value:
+                answer += f" In your snapshot, the {keywords[0]} is **{value}**."
+            answers.append(answer)
+
+    return "\n\n".join(answers) if answers else DIVERSION_REPLY
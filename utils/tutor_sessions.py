@@ -0,0 +1,147 @@
+"""
+Tutor Session Store for the Astro-Tutor Chat (v6.1)
+Keeps the chat context, the compacted system prompt and the recent turns
+server-side so that clients only send the new message on every turn.
+
+Sessions live in process memory, keyed by a short random ID, with a TTL and
+an LRU cap on both the session count and the approximate memory footprint.
+Under gunicorn each worker holds its own store; a request that lands on a
+worker without the session simply gets `session_expired` and the client
+re-sends its context once.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+
+SESSION_TTL_SECONDS = int(os.environ.get("TUTOR_SESSION_TTL", 1800))
+MAX_SESSIONS = int(os.environ.get("TUTOR_SESSION_MAX", 500))
+MAX_SESSION_BYTES = int(os.environ.get("TUTOR_SESSION_MAX_BYTES", 8 * 1024 * 1024))
+MAX_TURNS = int(os.environ.get("TUTOR_SESSION_TURNS", 6))
+
+# Large payload fields that never help the tutor answer a question
+HEAVY_CONTEXT_KEYS = {
+    "visuals", "sky_shot_base64", "solar_system_base64", "image_data",
+    "report", "report_manual"
+}
+
+
+class SessionExpiredError(Exception):
+    """Raised when a chat turn references an unknown or expired session."""
+    pass
+
+
+def compact_context(context_data):
+    """
+    Reduces a context object to a stable, minimal JSON string.
+    Drops empty values and heavy blobs (images, pre-rendered reports) and sorts keys,
+    so identical contexts always produce an identical prompt prefix.
+    """
+    def _strip(value):
+        if isinstance(value, dict):
+            cleaned = {}
+            for k, v in value.items():
+                if k in HEAVY_CONTEXT_KEYS:
+                    continue
+                v = _strip(v)
+                if v in (None, "", [], {}):
+                    continue
+                cleaned[k] = v
+            return cleaned
+        if isinstance(value, list):
+            return [_strip(v) for v in value]
+        return value
+
+    if isinstance(context_data, str):
+        return context_data.strip()
+    return json.dumps(_strip(context_data or {}), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class TutorSession:
+    __slots__ = ("id", "context_text", "system_prompt", "turns", "last_access")
+
+    def __init__(self, session_id, context_text, system_prompt):
+        self.id = session_id
+        self.context_text = context_text
+        self.system_prompt = system_prompt
+        self.turns = deque(maxlen=MAX_TURNS)
+        self.last_access = time.monotonic()
+
+    @property
+    def size_bytes(self):
+        turn_bytes = sum(len(q) + len(a) for q, a in self.turns)
+        return len(self.context_text) + len(self.system_prompt) + turn_bytes
+
+
+class TutorSessionStore:
+    """
+    Thread-safe LRU store of TutorSession objects with TTL expiry.
+    """
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS, max_sessions=MAX_SESSIONS, max_bytes=MAX_SESSION_BYTES):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, context_data, prompt_builder):
+        """
+        Creates a session from a raw context object.
+        `prompt_builder` turns the compacted context into the system prompt (built once per session).
+        """
+        context_text = compact_context(context_data)
+        session = TutorSession(secrets.token_urlsafe(9), context_text, prompt_builder(context_text))
+        with self._lock:
+            self._sessions[session.id] = session
+            self._evict()
+        return session
+
+    def get(self, session_id):
+        """Returns the live session for `session_id`, or None if unknown/expired."""
+        if not session_id:
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.monotonic() - session.last_access > self.ttl:
+                del self._sessions[session_id]
+                return None
+            session.last_access = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def record_turn(self, session, message, reply):
+        with self._lock:
+            session.turns.append((message, reply))
+            self._evict()
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": sum(s.size_bytes for s in self._sessions.values())
+            }
+
+    def _evict(self):
+        # Caller holds the lock. Expired sessions go first, then least-recently-used.
+        now = time.monotonic()
+        for sid in [sid for sid, s in self._sessions.items() if now - s.last_access > self.ttl]:
+            del self._sessions[sid]
+
+        total = sum(s.size_bytes for s in self._sessions.values())
+        while self._sessions and (len(self._sessions) > self.max_sessions or total > self.max_bytes):
+            _, oldest = self._sessions.popitem(last=False)
+            total -= oldest.size_bytes
+
+
+# Singleton instance for easy import
+tutor_sessions = TutorSessionStore()
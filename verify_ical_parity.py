@@ -0,0 +1,57 @@
+import sys
+import os
+from datetime import datetime, timedelta
+import pytz
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from ics import Calendar, Event
+from utils.ical_gen import create_ical_content
+
+def build_reference(title, occurrences):
+    """The pre-v6.1 ics-library implementation of create_ical_content."""
+    c = Calendar()
+    for occurrence in occurrences:
+        e = Event()
+        e.name = title
+        e.begin = occurrence["datetime"]
+        e.duration = timedelta(hours=1)
+        e.description = occurrence["report"]
+        c.events.add(e)
+    return c.serialize()
+
+def event_set(ical_text):
+    return {
+        (e.name, e.begin.to('utc').isoformat(), e.duration, e.description)
+        for e in Calendar(ical_text).events
+    }
+
+def verify_ical_parity():
+    print("🧪 Verifying streaming iCal writer against the ics library...")
+
+    tz = pytz.timezone("Asia/Kolkata")
+    title = "Ajji's Birthday; Panchanga, v6.1"
+    occurrences = [
+        {
+            "datetime": tz.localize(datetime(2026 + i, 3, 1 + i, 6, 30)),
+            "report": f"\n       HINDU PANCHANGA REPORT\n====\nTithi : Panchami, Shukla\nನಕ್ಷತ್ರ : ರೋಹಿಣಿ {i}\n"
+        }
+        for i in range(25)
+    ]
+
+    reference = event_set(build_reference(title, occurrences))
+    streamed = event_set(create_ical_content(title, occurrences))
+
+    if reference != streamed:
+        print(f"  ❌ Mismatch: {len(reference ^ streamed)} differing events")
+        return False
+
+    print(f"  ✅ {len(streamed)} events parse identically")
+    return True
+
+if __name__ == "__main__":
+    if verify_ical_parity():
+        sys.exit(0)
+    else:
+        sys.exit(1)
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+import pytz
+from utils.lunation_index import get_lunation_index
+from data.panchanga_data import MASAS, SAMVATSARAS
+
+# Checks the built lunation index (python -m utils.lunation_index) against published leap months
+# and Chaitra new years: the Masa and Adhika/Kshaya flags of each lunation, and the Samvatsara
+# switching at the New Moon that opens Chaitra rather than on 1 January.
+
+# New Moons (UTC) opening known lunations; the index must agree within BOUNDARY_TOLERANCE
+BOUNDARY_TOLERANCE = timedelta(minutes=10)
+KNOWN_LUNATIONS = [
+    # (label, opening New Moon, Masa, adhika, Samvatsara)
+    ("Chaitra 2023 (Ugadi)", datetime(2023, 3, 21, 17, 23, tzinfo=pytz.utc), "Chaitra", False, "Shobhakritu"),
+    ("Adhika Shravana 2023", datetime(2023, 7, 17, 18, 32, tzinfo=pytz.utc), "Shravana", True, "Shobhakritu"),
+    ("Nija Shravana 2023", datetime(2023, 8, 16, 9, 38, tzinfo=pytz.utc), "Shravana", False, "Shobhakritu"),
+    ("Chaitra 2026 (Ugadi)", datetime(2026, 3, 19, 1, 23, tzinfo=pytz.utc), "Chaitra", False, "Paridhavi"),
+    ("Adhika Jyeshtha 2026", datetime(2026, 5, 16, 20, 1, tzinfo=pytz.utc), "Jyeshtha", True, "Paridhavi"),
+    ("Nija Jyeshtha 2026", datetime(2026, 6, 15, 2, 54, tzinfo=pytz.utc), "Jyeshtha", False, "Paridhavi"),
+]
+
+# No Kshaya month falls between these years (the last was 1983, the next is due in 2124)
+NO_KSHAYA_YEARS = (1984, 2050)
+
+def _check(label, ok, detail):
+    print(f"   {'✅' if ok else '❌'} {label}: {detail}")
+    return 0 if ok else 1
+
+def verify_known_lunations(index):
+    print("🧪 Verifying leap months and Chaitra new years...")
+    failures = 0
+    for label, new_moon, masa, adhika, samvatsara in KNOWN_LUNATIONS:
+        row = index.lunation(new_moon + timedelta(days=2))
+        got = (MASAS["EN"][row["masa"]], row["adhika"], row["kshaya"], SAMVATSARAS["EN"][row["samvatsara"]])
+        ok = got == (masa, adhika, False, samvatsara) and abs(row["start"] - new_moon) <= BOUNDARY_TOLERANCE
+        failures += _check(label, ok, f"{got}, opens {row['start']:%Y-%m-%d %H:%M} UTC")
+
+        # The Samvatsara changes exactly at the opening of Chaitra, not before it
+        if masa == "Chaitra":
+            before = index.lunation(new_moon - timedelta(days=2))
+            expected = (SAMVATSARAS["EN"].index(samvatsara) - 1) % 60
+            failures += _check(f"{label} eve", before["masa"] == MASAS["EN"].index("Phalguna") and before["samvatsara"] == expected,
+                               f"{MASAS['EN'][before['masa']]}, {SAMVATSARAS['EN'][before['samvatsara']]}")
+    return failures
+
+def verify_leap_year_shape(index):
+    print("🧪 Verifying one Adhika month in 2023 and 2026 and no Kshaya months in modern years...")
+    failures = 0
+    for year in (2023, 2026):
+        start = datetime(year, 1, 1, tzinfo=pytz.utc).timestamp()
+        end = datetime(year + 1, 1, 1, tzinfo=pytz.utc).timestamp()
+        rows = index.lunations[(index.lunations["start"] >= start) & (index.lunations["start"] < end)]
+        failures += _check(f"{year} Adhika count", int(rows["adhika"].sum()) == 1, f"{int(rows['adhika'].sum())} Adhika lunations")
+
+    start = datetime(NO_KSHAYA_YEARS[0], 1, 1, tzinfo=pytz.utc).timestamp()
+    end = datetime(NO_KSHAYA_YEARS[1], 1, 1, tzinfo=pytz.utc).timestamp()
+    rows = index.lunations[(index.lunations["start"] >= start) & (index.lunations["start"] < end)]
+    failures += _check(f"Kshaya months {NO_KSHAYA_YEARS[0]}-{NO_KSHAYA_YEARS[1]}", int(rows["kshaya"].sum()) == 0,
+                       f"{int(rows['kshaya'].sum())} found")
+    return failures
+
+if __name__ == "__main__":
+    try:
+        index = get_lunation_index()
+        failures = verify_known_lunations(index) + verify_leap_year_shape(index)
+        assert failures == 0, f"{failures} lunation index checks failed"
+        print("\n🎉 Lunation Index: VERIFIED SUCCESSFUL")
+    except Exception as e:
+        print(f"\n❌ Verification Failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,66 @@
+import numpy as np
+from engines.mayan.engine import MayanEngine
+
+# Bulk/columnar Mayan conversion (calculate_bulk, calculate_date_range) re-derives the Long Count,
+# Tzolk'in and Haab' offsets with array arithmetic; this checks every day of a span against the
+# scalar path behind calculate_data (calculate_resolved), on both sides of 13.0.0.0.0.
+
+def _scalar_row(engine, jd):
+    result = engine.calculate_resolved({"julian_day": jd})
+    lc = result["long_count"]
+    return (
+        result["days_since_epoch"], lc["baktun"], lc["katun"], lc["tun"], lc["uinal"], lc["kin"],
+        result["tzolkin"]["number"], result["tzolkin"]["name"], result["haab"]["day"], result["haab"]["month"]
+    )
+
+def _bulk_rows(engine, columns):
+    tzolkin_names = np.array(engine.TZOLKIN_NAMES)[columns["tzolkin_name"]]
+    haab_months = np.array(engine.HAAB_MONTHS)[columns["haab_month"]]
+    for i in range(len(columns["days_since_epoch"])):
+        yield (
+            int(columns["days_since_epoch"][i]), int(columns["baktun"][i]), int(columns["katun"][i]),
+            int(columns["tun"][i]), int(columns["uinal"][i]), int(columns["kin"][i]),
+            int(columns["tzolkin_number"][i]), str(tzolkin_names[i]), int(columns["haab_day"][i]), str(haab_months[i])
+        )
+
+def _compare(label, engine, jds, columns):
+    mismatches = 0
+    for jd, bulk in zip(jds, _bulk_rows(engine, columns)):
+        scalar = _scalar_row(engine, jd)
+        if bulk != scalar:
+            if mismatches < 5:
+                print(f"   ❌ JD {jd}: bulk {bulk} != scalar {scalar}")
+            mismatches += 1
+    status = "✅" if mismatches == 0 else "❌"
+    print(f"   {status} {label}: {len(jds)} days, {mismatches} mismatches")
+    return mismatches
+
+def verify_bulk_parity():
+    print("🧪 Verifying vectorized Mayan conversion against calculate_data...")
+    engine = MayanEngine()
+    half_round = engine.CALENDAR_ROUND_DAYS // 2
+    mismatches = 0
+
+    # 1. One Calendar Round centred on 13.0.0.0.0, at several times of day (fractional JDs)
+    for offset in (0.0, 0.25, 0.5, 0.75):
+        jds = [engine.GMT_CORRELATION + day + offset for day in range(-half_round, half_round)]
+        mismatches += _compare(f"Calendar Round around the epoch, JD fraction {offset}", engine, jds,
+                               engine.calculate_bulk(jds))
+
+    # 2. Gregorian date ranges (civil day -> JDN), before the epoch and around today
+    for start in ("-3140-01-01", "2000-01-01"):
+        end = np.datetime64(start, "D") + engine.CALENDAR_ROUND_DAYS - 1
+        columns = engine.calculate_date_range(start, end)
+        jds = columns["julian_day"].tolist()
+        mismatches += _compare(f"Date range from {start}", engine, jds, columns)
+
+    assert mismatches == 0, f"{mismatches} bulk/scalar mismatches"
+
+if __name__ == "__main__":
+    try:
+        verify_bulk_parity()
+        print("\n🎉 Mayan Bulk Parity: VERIFIED SUCCESSFUL")
+    except Exception as e:
+        print(f"\n❌ Verification Failed: {str(e)}")
+        import traceback
+        traceback.print_exc()